@@ -0,0 +1,106 @@
+# analytics_channel.py
+
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+# Unix socket, ahol elérhető; Windows-on helyi TCP port
+DEFAULT_ADDRESS = os.path.join("logs", "analytics.sock") if hasattr(socket, "AF_UNIX") else ("127.0.0.1", 47800)
+
+
+def _family(address):
+    return socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+
+
+class AnalyticsPublisher:
+    """
+    Könnyű helyi IPC csatorna a kereskedési folyamatból az elemző folyamat felé.
+    A publish() csak egy korlátos sorba tesz (túlcsorduláskor a legrégebbi esik ki),
+    a küldést háttérszál végzi; a lassú vagy leszakadt feliratkozót eldobja.
+    Amíg nincs elindítva, a publish() nem csinál semmit.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, max_pending: int = 10_000):
+        self.address = address
+        self._pending = deque(maxlen=max_pending)
+        self._clients = []
+        self._wakeup = threading.Event()
+        self._server = None
+
+    def start(self):
+        if self._server is not None:
+            return self
+        if isinstance(self.address, str):
+            os.makedirs(os.path.dirname(self.address) or ".", exist_ok=True)
+            if os.path.exists(self.address):
+                os.remove(self.address)
+        self._server = socket.socket(_family(self.address), socket.SOCK_STREAM)
+        if not isinstance(self.address, str):
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(self.address)
+        self._server.listen(8)
+        threading.Thread(target=self._accept_loop, name="analytics-accept", daemon=True).start()
+        threading.Thread(target=self._send_loop, name="analytics-send", daemon=True).start()
+        return self
+
+    def publish(self, kind, **fields):
+        if self._server is None or not self._clients:
+            return
+        fields['kind'] = kind
+        fields.setdefault('ts', time.time())
+        self._pending.append(fields)
+        self._wakeup.set()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            conn.settimeout(0.5)
+            self._clients.append(conn)
+
+    def _send_loop(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            lines = []
+            while self._pending:
+                lines.append(json.dumps(self._pending.popleft(), default=float))
+            if not lines:
+                continue
+            payload = ("\n".join(lines) + "\n").encode("utf-8")
+            for conn in list(self._clients):
+                try:
+                    conn.sendall(payload)
+                except OSError:
+                    self._clients.remove(conn)
+                    conn.close()
+
+
+def subscribe(address=DEFAULT_ADDRESS, retry_sec: float = 2.0):
+    # Generátor: a csatorna eseményei dict-ként; kapcsolódási hiba esetén újrapróbál
+    while True:
+        try:
+            with socket.socket(_family(address), socket.SOCK_STREAM) as conn:
+                conn.connect(address)
+                buffer = b""
+                while True:
+                    data = conn.recv(65536)
+                    if not data:
+                        break
+                    buffer += data
+                    *lines, buffer = buffer.split(b"\n")
+                    for line in lines:
+                        if line:
+                            yield json.loads(line)
+        except OSError:
+            pass
+        time.sleep(retry_sec)
+
+
+# Közös példány a kereskedési folyamatban
+analytics = AnalyticsPublisher()
@@ -0,0 +1,77 @@
+# analytics_process.py
+# Külön elemző folyamat: a kereskedési folyamat eseményeit IPC-n olvassa,
+# időnként lefuttatja a feedback_learning elemzést (fejlécmentesen), és igény szerint a GUI-t.
+#   python Analytics_Process.py [--gui] [--learning-interval 600]
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from Analytics_Channel import subscribe, DEFAULT_ADDRESS
+
+
+class LiveStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.symbols = {}   # kulcs: szimbólum, érték: statisztika dict
+
+    def update(self, event):
+        symbol = event.get('symbol')
+        if symbol is None:
+            return
+        with self.lock:
+            s = self.symbols.setdefault(symbol, {'ticks': 0, 'exits': 0, 'wins': 0, 'profit': 0.0, 'price': None})
+            if event['kind'] == 'tick':
+                s['ticks'] += 1
+                s['price'] = event.get('price')
+            elif event['kind'] == 'exit':
+                s['exits'] += 1
+                s['profit'] += event.get('profit', 0.0)
+                s['wins'] += event.get('profit', 0.0) > 0
+
+    def summary(self):
+        with self.lock:
+            return " | ".join(
+                f"{symbol}: ár={s['price']}, zárás={s['exits']}, nyerő={s['wins']}, profit={s['profit']:.4f}"
+                for symbol, s in sorted(self.symbols.items()))
+
+
+def consume(stats, summary_sec):
+    last = time.time()
+    for event in subscribe(DEFAULT_ADDRESS):
+        stats.update(event)
+        if time.time() - last >= summary_sec:
+            print(f"[ANALYTICS] {stats.summary()}")
+            last = time.time()
+
+
+def run_learning(interval_sec):
+    base = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        subprocess.run([sys.executable, os.path.join(base, "feedback_learning.py"), "--headless"])
+        time.sleep(interval_sec)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Elemző folyamat a kereskedő bot mellé")
+    parser.add_argument("--gui", action="store_true")
+    parser.add_argument("--learning-interval", type=float, default=600)
+    parser.add_argument("--summary-interval", type=float, default=60)
+    args = parser.parse_args()
+
+    # Az elemzés sosem vehet el CPU-t a megbízáskezeléstől
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+    stats = LiveStats()
+    threading.Thread(target=consume, args=(stats, args.summary_interval), daemon=True).start()
+    threading.Thread(target=run_learning, args=(args.learning_interval,), daemon=True).start()
+
+    if args.gui:
+        from feedback_gui import run_gui
+        run_gui()
+    else:
+        while True:
+            time.sleep(3600)
@@ -0,0 +1,192 @@
+# history_store.py
+# Oszlopos (Arrow IPC) kereskedési és predikciós előzmények, szimbólum/nap szerint particionálva:
+#   logs/history/{kind}/symbol={SYMBOL}/date={YYYY-MM-DD}/part-*.arrow
+# Meglévő CSV logok egyszeri konvertálása:
+#   python History_Store.py convert
+
+import argparse
+import atexit
+import glob
+import os
+import threading
+import time
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+except ImportError:     # opcionális függőség: nélküle a store kikapcsol
+    pa = None
+
+SCHEMAS = {
+    'trades': [('timestamp', 'timestamp'), ('symbol', 'string'), ('current_price', 'float64'),
+               ('action', 'string'), ('balance', 'float64'), ('quantity', 'float64'), ('profit', 'float64')],
+    'predictions': [('timestamp', 'timestamp'), ('symbol', 'string'), ('current_price', 'float64'),
+                    ('predicted_return', 'float64')],
+    'feedback': [('timestamp', 'timestamp'), ('symbol', 'string'), ('predicted_return', 'float64'),
+                 ('action', 'string'), ('profit', 'float64')],
+}
+
+
+def _arrow_schema(kind):
+    types = {'timestamp': pa.timestamp('ms'), 'string': pa.string(), 'float64': pa.float64()}
+    return pa.schema([(name, types[t]) for name, t in SCHEMAS[kind]])
+
+
+class HistoryStore:
+    """
+    Csak hozzáfűzhető oszlopos tár. Az append() memóriában gyűjt, a háttérszál
+    flush_interval másodpercenként új part fájlt ír partíciónként. A query()
+    szimbólumra és időtartományra szűr (partíció-vágás + predikátum lenyomás),
+    a fájlok memory-mapelten olvashatók.
+    """
+
+    def __init__(self, root: str = "logs/history", flush_interval: float = 300):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.enabled = pa is not None
+        self._buffers = {}      # kulcs: (kind, symbol, nap), érték: sorok listája
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()     # a háttérszál indítása (a pandas import alatt az append nem vár)
+        self._thread = None
+        self._part = 0
+
+    def append(self, kind, row):
+        if not self.enabled:
+            return
+        ts = row['timestamp']
+        if isinstance(ts, str):
+            ts = row['timestamp'] = datetime.strptime(ts, '%Y-%m-%d %H:%M:%S')
+        key = (kind, row['symbol'], ts.strftime('%Y-%m-%d'))
+        with self._lock:
+            self._buffers.setdefault(key, []).append(row)
+        self._ensure_started()
+
+    def _ensure_started(self):
+        # Több SymbolScheduler szál is hívja: a szál és az atexit ürítés pontosan egyszer indul
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            # A pyarrow táblaépítéskor betölti a pandas-t; atexit ürítéskor importálni már nem lehet
+            import pandas
+            thread = threading.Thread(target=self._run, name="history-store", daemon=True)
+            thread.start()
+            atexit.register(self.flush)
+            self._thread = thread
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[HISTORY] Írási hiba: {e}")
+
+    def flush(self):
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+        for (kind, symbol, day), rows in buffers.items():
+            self._write_part(kind, symbol, day, pa.Table.from_pylist(rows, schema=_arrow_schema(kind)))
+
+    def _partition_dir(self, kind, symbol, day):
+        return os.path.join(self.root, kind, f"symbol={symbol}", f"date={day}")
+
+    def _write_part(self, kind, symbol, day, table):
+        directory = self._partition_dir(kind, symbol, day)
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._part += 1
+            part = self._part
+        path = os.path.join(directory, f"part-{int(time.time() * 1000)}-{os.getpid()}-{part}.arrow")
+        with pa.OSFile(path + ".tmp", 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(path + ".tmp", path)
+
+    def compact(self, kind):
+        # Egy partíció sok kis part fájlját egy fájlba fűzi (a mai napot kihagyja)
+        today = datetime.now().strftime('%Y-%m-%d')
+        for directory in glob.glob(os.path.join(self.root, kind, "symbol=*", "date=*")):
+            parts = sorted(glob.glob(os.path.join(directory, "part-*.arrow")))
+            if len(parts) < 2 or directory.endswith(today):
+                continue
+            table = pa.concat_tables(ipc.open_file(pa.memory_map(p)).read_all() for p in parts)
+            symbol = directory.split("symbol=")[1].split(os.sep)[0]
+            self._write_part(kind, symbol, directory.split("date=")[1], table)
+            for p in parts:
+                os.remove(p)
+
+    def query(self, kind, symbols=None, start=None, end=None, columns=None):
+        """pyarrow Table a megadott szimbólumokra és [start, end] időtartományra."""
+        path = os.path.join(self.root, kind)
+        if not self.enabled or not os.path.isdir(path):
+            return None
+        import pandas as pd
+        import pyarrow.dataset as ds     # pandas-t is behúz, ezért csak lekérdezéskor töltődik
+        partitioning = ds.partitioning(pa.schema([('symbol', pa.string()), ('date', pa.string())]), flavor="hive")
+        dataset = ds.dataset(path, format="ipc", partitioning=partitioning, schema=None)
+        condition = None
+
+        def both(a, b):
+            return b if a is None else a & b
+
+        if symbols:
+            condition = both(condition, ds.field('symbol').isin(list(symbols)))
+        if start is not None:
+            start = pd.Timestamp(start)
+            condition = both(condition, ds.field('date') >= start.strftime('%Y-%m-%d'))
+            condition = both(condition, ds.field('timestamp') >= pa.scalar(start.to_pydatetime(), pa.timestamp('ms')))
+        if end is not None:
+            end = pd.Timestamp(end)
+            condition = both(condition, ds.field('date') <= end.strftime('%Y-%m-%d'))
+            condition = both(condition, ds.field('timestamp') <= pa.scalar(end.to_pydatetime(), pa.timestamp('ms')))
+        table = dataset.to_table(columns=columns, filter=condition)
+        if 'timestamp' in table.column_names:
+            table = table.take(pc.sort_indices(table, [('timestamp', 'ascending')]))
+        return table
+
+
+def convert_csv_logs(store, log_dir="logs"):
+    # Meglévő CSV logok egyszeri átírása az oszlopos tárba
+    import pandas as pd
+    sources = {
+        'trades': ("live_trade_log_*.csv", 0),
+        'predictions': ("prediction_log_*.csv", None),
+        'feedback': ("feedback_log_*.csv", 0),
+    }
+    for kind, (pattern, header) in sources.items():
+        for file in glob.glob(os.path.join(log_dir, pattern)):
+            symbol = os.path.basename(file).rsplit("_", 1)[1].replace(".csv", "")
+            # A prediction_log fejléc nélküli, a szimbólum a fájlnévből jön
+            names = [name for name, _ in SCHEMAS[kind] if name != 'symbol'] if header is None else None
+            df = pd.read_csv(file, header=header, names=names)
+            if df.empty:
+                continue
+            df['symbol'] = symbol
+            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+            df = df.dropna(subset=['timestamp'])
+            for day, part in df.groupby(df['timestamp'].dt.strftime('%Y-%m-%d')):
+                table = pa.Table.from_pandas(part[[name for name, _ in SCHEMAS[kind]]], schema=_arrow_schema(kind),
+                                             preserve_index=False)
+                store._write_part(kind, symbol, day, table)
+            print(f"[HISTORY] {file}: {len(df)} sor -> {kind}")
+
+
+# Közös példány a kereskedési ciklusnak
+history_store = HistoryStore()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Oszlopos előzménytár")
+    parser.add_argument("command", choices=["convert", "compact"])
+    parser.add_argument("--logs", default="logs")
+    args = parser.parse_args()
+    if pa is None:
+        raise SystemExit("A pyarrow csomag szükséges: pip install pyarrow")
+    store = HistoryStore(os.path.join(args.logs, "history"))
+    if args.command == "convert":
+        convert_csv_logs(store, args.logs)
+    for kind in SCHEMAS:
+        store.compact(kind)
@@ -0,0 +1,65 @@
+# log_tailer.py
+
+import csv
+import glob
+import os
+
+
+class LogTailer:
+    """
+    Egy glob mintára illeszkedő CSV logokat követ: fájlonként megjegyzi a bájt
+    offsetet, és poll()-kor csak az azóta hozzáfűzött teljes sorokat olvassa be.
+    Forgatás (új inode vagy a fájl rövidebb lett) esetén elölről kezdi.
+    """
+
+    def __init__(self, pattern: str, columns: list = None):
+        self.pattern = pattern
+        self.columns = columns     # fejléc nélküli fájloknál (pl. prediction_log)
+        self._offsets = {}         # kulcs: fájl, érték: offset
+        self._inodes = {}          # kulcs: fájl, érték: st_ino (forgatás felismerése)
+        self._headers = {}
+        self._partial = {}         # félig kiírt utolsó sor
+
+    def poll(self):
+        rows = []
+        for path in sorted(glob.glob(self.pattern)):
+            rows += self._read_new(path)
+        return rows
+
+    def _read_new(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return []
+        size = stat.st_size
+        offset = self._offsets.get(path, 0)
+        # Az azonos vagy nagyobb méretre újraírt fájlt csak az inode váltás árulja el
+        rotated = self._inodes.get(path, stat.st_ino) != stat.st_ino
+        self._inodes[path] = stat.st_ino
+        if rotated or size < offset:
+            offset = 0
+            self._headers.pop(path, None)
+            self._partial.pop(path, None)
+        if size == offset:
+            return []
+
+        with open(path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+            f.seek(offset)
+            chunk = self._partial.pop(path, "") + f.read()
+            self._offsets[path] = f.tell()
+
+        lines = chunk.split("\n")
+        if lines[-1]:
+            self._partial[path] = lines[-1]
+        lines = [line.rstrip("\r") for line in lines[:-1] if line.strip()]
+
+        header = self._headers.get(path, self.columns)
+        if header is None and lines:
+            header = self._headers[path] = lines.pop(0).split(",")
+        source = os.path.basename(path)
+        rows = []
+        for values in csv.reader(lines):
+            row = dict(zip(header, values))
+            row['file'] = source
+            rows.append(row)
+        return rows
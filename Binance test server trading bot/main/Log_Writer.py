@@ -0,0 +1,135 @@
+# log_writer.py
+
+import atexit
+import os
+import queue
+import threading
+import time
+from Metrics import metrics
+
+
+class LogWriter:
+    """
+    Aszinkron napló-nyelő: a write() csak sorba tesz, a fájlba írást egy háttérszál
+    végzi nyitva tartott fájlokkal, kötegelve. Időközönként és leállításkor ürít,
+    méret szerint forgat, és a kereskedési utat sosem blokkolja lemez I/O-val.
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 max_queue: int = 100_000):
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._handles = {}      # kulcs: elérési út, érték: nyitott fájl
+        self._headers = {}      # kulcs: elérési út, érték: fejléc sor (forgatáskor is kell)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def write(self, path, line, header=None):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((path, line, header))
+        except queue.Full:
+            self.dropped += 1
+            metrics.inc("log_dropped_total")
+
+    def flush(self, timeout=5.0):
+        # Megvárja, amíg a háttérszál az eddigi sorokat kiírta
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put((None, done, None))
+        done.wait(timeout)
+
+    def close(self):
+        if self._thread is None or self._stopped.is_set():
+            return
+        self.flush()
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        last_flush = time.time()
+        while not self._stopped.is_set() or not self._queue.empty():
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            # Ami már a sorban van, egy menetben kiírjuk
+            while len(batch) < 1000:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            started = time.perf_counter()
+            waiters = []
+            for path, line, header in batch:
+                if path is None:
+                    waiters.append(line)
+                    continue
+                try:
+                    self._handle(path, header).write(line + "\n")
+                except Exception as e:
+                    print(f"[LOG] Írási hiba ({path}): {e}")
+
+            if waiters or time.time() - last_flush >= self.flush_interval:
+                self._flush_all()
+                last_flush = time.time()
+            if len(batch) > len(waiters):
+                metrics.observe("log_io", time.perf_counter() - started)
+            for done in waiters:
+                done.set()
+        self._flush_all()
+        for f in self._handles.values():
+            f.close()
+        self._handles.clear()
+
+    def _handle(self, path, header):
+        f = self._handles.get(path)
+        if f is not None and f.tell() >= self.max_bytes:
+            f.close()
+            self._rotate(path)
+            f = None
+        if f is None:
+            if header is not None:
+                self._headers[path] = header
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            f = open(path, 'a', encoding='utf-8')
+            if f.tell() == 0 and self._headers.get(path):
+                f.write(self._headers[path] + "\n")
+            self._handles[path] = f
+        return f
+
+    def _rotate(self, path):
+        # path -> path.1 -> path.2 ... a legrégebbi törlődik
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        os.replace(path, f"{path}.1")
+        del self._handles[path]
+
+    def _flush_all(self):
+        for f in self._handles.values():
+            try:
+                f.flush()
+            except Exception:
+                pass
+
+
+# Közös példány a kereskedő, a végrehajtó és a fő ciklus számára
+log_writer = LogWriter()
@@ -0,0 +1,220 @@
+# metrics.py
+
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Késleltetési vödrök felső határai másodpercben (Prometheus "le"): 0.1 ms-tól ~50 s-ig, 1.6-szoros lépéssel
+BUCKETS = tuple(round(0.0001 * 1.6 ** i, 6) for i in range(29))
+
+
+def quantile(counts, q):
+    # Becslés a vödörszámokból, vödrön belüli lineáris interpolációval
+    n = sum(counts)
+    if not n:
+        return None
+    rank = q * n
+    seen = 0
+    for i, c in enumerate(counts):
+        if c and seen + c >= rank:
+            low = BUCKETS[i - 1] if i else 0.0
+            high = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+            return low + (high - low) * (rank - seen) / c
+        seen += c
+    return BUCKETS[-1]
+
+
+class Histogram:
+    __slots__ = ('counts', 'total', 'count', 'lock')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)     # az utolsó a +Inf vödör
+        self.total = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self.lock:
+            self.counts[i] += 1
+            self.total += seconds
+            self.count += 1
+
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'symbol', 'start')
+
+    def __init__(self, metrics, stage, symbol):
+        self.metrics = metrics
+        self.stage = stage
+        self.symbol = symbol
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start, self.symbol)
+        if exc_type is not None:
+            self.metrics.inc("errors_total", stage=self.stage, symbol=self.symbol)
+        return False
+
+
+class Metrics:
+    """
+    Folyamaton belüli mérőszámok: szakaszonkénti (kline letöltés, jellemzők, modell,
+    egyenleg, megbízás, napló I/O) késleltetési hisztogramok szimbólumonként, valamint
+    számlálók (REST súly, hibák) és lekérdezéskor számolt mérőértékek. Egy mérés egy
+    perf_counter pár, egy bisect és egy hisztogramonkénti zár alatti növelés, így éles
+    üzemben is bekapcsolva hagyható. Prometheus szöveges formátumban a start_server()
+    HTTP végpontja adja ki; a summary() az előző összegzés óta eltelt ablakot foglalja össze.
+    """
+
+    def __init__(self, enabled: bool = True, prefix: str = "bot"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._histograms = {}   # kulcs: (szakasz, szimbólum), érték: Histogram
+        self._counters = {}     # kulcs: (név, címkék), érték: szám
+        self._gauges = {}       # kulcs: név, érték: függvény (lekérdezéskor hívódik)
+        self._last_stages = {}
+        self._last_counters = {}
+        self._guard = threading.Lock()
+        self._server = None
+
+    # --- Rögzítés
+
+    def timer(self, stage, symbol=None):
+        return _Timer(self, stage, symbol)
+
+    def observe(self, stage, seconds, symbol=None):
+        if not self.enabled:
+            return
+        histogram = self._histograms.get((stage, symbol))
+        if histogram is None:
+            with self._guard:
+                histogram = self._histograms.setdefault((stage, symbol), Histogram())
+        histogram.observe(seconds)
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((k, v) for k, v in labels.items() if v is not None)))
+        with self._guard:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def gauge(self, name, func):
+        self._gauges[name] = func
+
+    # --- Kiolvasás
+
+    @staticmethod
+    def _labels(pairs):
+        return ",".join(f'{k}="{v}"' for k, v in pairs)
+
+    def render(self):
+        # Prometheus szöveges kiadási formátum
+        lines = [f"# TYPE {self.prefix}_stage_seconds histogram"]
+        for (stage, symbol), h in sorted(self._histograms.items(), key=lambda item: (item[0][0], item[0][1] or "")):
+            with h.lock:
+                counts, total, count = list(h.counts), h.total, h.count
+            labels = self._labels([('stage', stage)] + ([('symbol', symbol)] if symbol else []))
+            cumulative = 0
+            for bound, c in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += c
+                lines.append(f'{self.prefix}_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.prefix}_stage_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"{self.prefix}_stage_seconds_count{{{labels}}} {count}")
+
+        with self._guard:
+            counters = sorted(self._counters.items())
+        typed = set()
+        for (name, pairs), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {self.prefix}_{name} counter")
+            lines.append(f"{self.prefix}_{name}{{{self._labels(pairs)}}} {value}")
+
+        for name, func in sorted(self._gauges.items()):
+            try:
+                value = float(func())
+            except Exception:
+                continue
+            lines.append(f"# TYPE {self.prefix}_{name} gauge")
+            lines.append(f"{self.prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Egysoros összegzés a legutóbbi hívás óta: szakaszonként n, p50, p99; számlálónként a növekmény."""
+        stages = {}
+        for (stage, _), h in list(self._histograms.items()):
+            total = stages.setdefault(stage, [0] * len(h.counts))
+            with h.lock:
+                for i, c in enumerate(h.counts):
+                    total[i] += c
+        parts = []
+        for stage in sorted(stages):
+            counts = stages[stage]
+            last = self._last_stages.get(stage)
+            window = [c - l for c, l in zip(counts, last)] if last else counts
+            self._last_stages[stage] = counts
+            n = sum(window)
+            if n:
+                parts.append(f"{stage} n={n} p50={quantile(window, 0.5) * 1000:.1f}ms p99={quantile(window, 0.99) * 1000:.1f}ms")
+
+        totals = {}
+        with self._guard:
+            for (name, _), value in self._counters.items():
+                totals[name] = totals.get(name, 0) + value
+        for name in sorted(totals):
+            delta = totals[name] - self._last_counters.get(name, 0)
+            self._last_counters[name] = totals[name]
+            if delta:
+                parts.append(f"{name}={delta:g}")
+        return " | ".join(parts)
+
+    # --- Kiadás
+
+    def start_server(self, port: int = 9108, host: str = "127.0.0.1"):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                payload = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"[METRIKA] A végpont nem indult ({host}:{port}): {e}")
+            return self
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"[METRIKA] http://{host}:{self._server.server_address[1]}/metrics")
+        return self
+
+    def start_reporter(self, log_writer, path, every_sec: float = 300):
+        # Időszakos [METRIKA] összegző sor a megadott naplóba
+        def run():
+            while True:
+                time.sleep(every_sec)
+                line = self.summary()
+                if line:
+                    log_writer.write(path, f"[METRIKA] {line}")
+
+        threading.Thread(target=run, name="metrics-reporter", daemon=True).start()
+        return self
+
+
+# Közös példány: minden komponens ide mér
+metrics = Metrics()
@@ -1,20 +1,56 @@
-﻿# strategy_factory.py
-
-from Signal_Generator import SignalGenerator
-from prediction.MI_Strategy import MLStrategy
-
-class StrategyFactory:
-    def __init__(self, strategy_name, client, symbols):
-        self.strategy_name = strategy_name.lower()
-        self.client = client
-        self.symbols = symbols
-
-    def get_strategy(self):
-        if self.strategy_name == "rsi_ma":
-            return SignalGenerator(self.client, self.symbols)
-        elif self.strategy_name == "ml":
-            return MLStrategy(self.client, self.symbols)
-        else:
-            raise ValueError(f"Ismeretlen stratégia: {self.strategy_name}")
-
-
+# strategy_factory.py
+
+import importlib
+import threading
+
+# A stratégiamodulok csak kiválasztáskor töltődnek be: rsi_ma esetén nincs xgboost/sklearn import
+STRATEGIES = {
+    "rsi_ma": ("Signal_Generator", "SignalGenerator"),
+    "ml": ("prediction.MI_Strategy", "MLStrategy"),
+}
+
+# Az első ciklus előtt betöltendő modulok stratégiánként (a stratégiamodul mellett);
+# a kereskedő saját modellje az xgboost-ot az első tanításkor tölti be
+PRELOAD = {
+    "rsi_ma": ("pandas",),
+    "ml": ("pandas", "xgboost"),
+}
+
+
+def _preload(module_names):
+    for module_name in module_names:
+        importlib.import_module(module_name)
+
+
+def preload_strategy(strategy_name):
+    # A stratégia és függőségei háttérszálon töltődnek, amíg a főszál a hálózati inicializálást végzi
+    name = strategy_name.lower()
+    if name not in STRATEGIES:
+        return None
+    thread = threading.Thread(target=_preload, args=(PRELOAD.get(name, ()) + (STRATEGIES[name][0],),),
+                              name="strategy-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+class StrategyFactory:
+    def __init__(self, strategy_name, client, symbols, kline_cache=None, model_scope="symbol", timeframes=None,
+                 auto_tune=True, limit=100):
+        self.strategy_name = strategy_name.lower()
+        self.client = client
+        self.symbols = symbols
+        self.kline_cache = kline_cache
+        self.model_scope = model_scope
+        self.timeframes = timeframes
+        self.auto_tune = auto_tune
+        self.limit = limit
+
+    def get_strategy(self):
+        if self.strategy_name not in STRATEGIES:
+            raise ValueError(f"Ismeretlen stratégia: {self.strategy_name}")
+        module_name, class_name = STRATEGIES[self.strategy_name]
+        strategy_class = getattr(importlib.import_module(module_name), class_name)
+        if self.strategy_name == "ml":
+            return strategy_class(self.client, self.symbols, kline_cache=self.kline_cache, model_scope=self.model_scope,
+                                  timeframes=self.timeframes, auto_tune=self.auto_tune, limit=self.limit)
+        return strategy_class(self.client, self.symbols, kline_cache=self.kline_cache, limit=self.limit)
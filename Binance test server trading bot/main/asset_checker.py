@@ -3,6 +3,7 @@
 
 from binance.client import Client
 import json
+from trade.Account_State import AccountState
 
 # Konfiguráció betöltése
 with open("config.json", "r") as f:
@@ -14,6 +15,7 @@ api_url = config.get("api_url", "https://testnet.binance.vision/api")
 
 client = Client(api_key, api_secret)
 client.API_URL = api_url
+account = AccountState(client)
 
 # Lekérdezhető eszközök
 assets_to_check = ["USDT", "BTC", "ETH", "BNB", "LTC"]
@@ -21,9 +23,8 @@ assets_to_check = ["USDT", "BTC", "ETH", "BNB", "LTC"]
 print("💰 Binance Spot Testnet – Egyenlegellenőrzés:\n")
 for asset in assets_to_check:
     try:
-        balance = client.get_asset_balance(asset=asset)
-        free = float(balance['free'])
-        locked = float(balance['locked'])
+        free = account.balance(asset)
+        locked = account.locked(asset)
         print(f"{asset}: Szabad = {free:.4f}, Lekötött = {locked:.4f}")
     except Exception as e:
         print(f"{asset}: ⚠️ Hiba – {e}")
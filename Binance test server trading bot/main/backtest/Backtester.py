@@ -0,0 +1,214 @@
+# backtester.py
+# Offline backtest tárolt gyertyákon:
+#   python -m backtest.Backtester --strategy rsi_ma --data data/klines --symbols BTCUSDT ETHUSDT
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from backtest.Mock_Client import MockClient
+from market.Indicator_Engine import compute_rsi
+from market.Kline_Cache import klines_to_dataframe, INTERVAL_MS
+
+
+def load_frame(client, symbol, interval):
+    df = klines_to_dataframe(client.klines[(symbol, interval)])
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        df[col] = df[col].astype(float)
+    df['timestamp'] = df['timestamp'].astype(np.int64)
+    return df
+
+
+def add_indicators(df):
+    # Teljes előzményen számolva: a gördülő ablakok miatt azonos a 100 soros élő számítással
+    close = df['close']
+    df['ma5'] = close.rolling(window=5).mean()
+    df['ma10'] = close.rolling(window=10).mean()
+    df['volatility'] = close.rolling(window=5).std()
+    df['rsi'] = compute_rsi(close, window=14)
+    return df
+
+
+def rsi_ma_rules(df, sl_percent, tp_percent):
+    # SignalGenerator + TradeExecutor szabályai
+    entries = ((df['ma5'] > df['ma10']) & (df['rsi'] < 70)).to_numpy()
+    exits = (df['rsi'] > 80).to_numpy()
+    n = len(df)
+    return entries, exits, np.full(n, sl_percent), np.full(n, tp_percent)
+
+
+def trader_rules(df):
+    # trade_symbol szabályai: trend belépés, SL/TP a volatility_sl_tp szerint
+    entries = ((df['ma5'] > df['ma10']) & (df['rsi'] < 70)).to_numpy()
+    exits = np.zeros(len(df), dtype=bool)
+    vol = (df['volatility'] / df['close']).to_numpy()
+    return entries, exits, np.round(vol * 1.2, 5), np.round(vol * 2.0, 5)
+
+
+def replay_signals(strategy, client, timestamps, step_ms):
+    # Nem vektorizálható stratégiák (pl. ML): az eredeti osztály fut a MockClient-en.
+    # A jelek a timestamps idővonalon vannak; szimbólumonként az align_signals igazítja őket.
+    n = len(timestamps)
+    entries = {s: np.zeros(n, dtype=bool) for s in strategy.symbols}
+    exits = {s: np.zeros(n, dtype=bool) for s in strategy.symbols}
+    next_decision = timestamps[0]
+    for i, ts in enumerate(timestamps):
+        if ts < next_decision:
+            continue
+        client.set_time(int(ts))
+        for symbol, signal in strategy.generate_signals().items():
+            entries[symbol][i] = signal == 'BUY'
+            exits[symbol][i] = signal in ('SELL', 'STOP')
+        next_decision = ts + step_ms
+    client.set_time(None)
+    return entries, exits
+
+
+def align_signals(signals, timestamps, open_times):
+    # A közös idővonal jelei a szimbólum saját gyertyáira, nyitási idő szerint; hiányzó
+    # gyertyánál a jel a következő meglévőre esik, az utolsó gyertya utániak elvesznek
+    aligned = np.zeros(len(open_times), dtype=bool)
+    positions = np.searchsorted(open_times, timestamps[np.flatnonzero(signals)])
+    aligned[positions[positions < len(open_times)]] = True
+    return aligned
+
+
+def _first_hit(lows, highs, exits, start, low, high):
+    # Első index start-tól, ahol a gyertyán belül SL/TP teljesül (mélypont/csúcs, mint az élő
+    # TriggerEngine tick-enként), vagy kilépő jel van; blokkokban keres
+    n = len(lows)
+    block = 256
+    while start < n:
+        end = min(n, start + block)
+        hit = (lows[start:end] <= low) | (highs[start:end] >= high) | exits[start:end]
+        if hit.any():
+            return start + int(np.argmax(hit))
+        start = end
+        block *= 2
+    return -1
+
+
+def simulate(df, entries, exits, sl, tp, fee_percent, trade_usd):
+    opens, close = df['open'].to_numpy(), df['close'].to_numpy()
+    lows, highs = df['low'].to_numpy(), df['high'].to_numpy()
+    times = df['timestamp'].to_numpy()
+    valid = entries & ~np.isnan(sl) & ~np.isnan(tp)
+    candidates = np.flatnonzero(valid)
+    trades = []
+    i = 0
+    while True:
+        k = np.searchsorted(candidates, i)
+        if k >= len(candidates):
+            break
+        e = candidates[k]
+        entry = close[e]
+        low, high = entry * (1 - sl[e]), entry * (1 + tp[e])
+        x = _first_hit(lows, highs, exits, e + 1, low, high)
+        # A szintre esik a kilépés, résnél a nyitóáron; ha a gyertya mindkét szintet
+        # érinti, az SL számít (óvatos feltevés)
+        if x < 0:
+            x, reason = len(close) - 1, "END"
+            exit_price = close[x]
+        elif lows[x] <= low:
+            reason, exit_price = "STOP-LOSS", min(opens[x], low)
+        elif highs[x] >= high:
+            reason, exit_price = "TAKE-PROFIT", max(opens[x], high)
+        else:
+            reason, exit_price = "SELL", close[x]
+        quantity = trade_usd / entry
+        fees = quantity * (entry + exit_price) * fee_percent
+        pnl = quantity * (exit_price * (1 - fee_percent) - entry * (1 + fee_percent))
+        trades.append({'entry_time': int(times[e]), 'exit_time': int(times[x]), 'entry': float(entry),
+                       'exit': float(exit_price), 'reason': reason, 'pnl': float(pnl), 'fees': float(fees)})
+        i = x + 1
+    return trades
+
+
+def report(trades):
+    if not trades:
+        return {'trades': 0, 'pnl': 0.0, 'fees': 0.0, 'hit_rate': 0.0, 'max_drawdown': 0.0}
+    trades = sorted(trades, key=lambda t: t['exit_time'])
+    pnl = np.array([t['pnl'] for t in trades])
+    equity = np.cumsum(pnl)
+    drawdown = np.maximum.accumulate(np.maximum(equity, 0)) - equity
+    return {
+        'trades': len(trades),
+        'pnl': float(pnl.sum()),
+        'fees': float(sum(t['fees'] for t in trades)),
+        'hit_rate': float((pnl > 0).mean()),
+        'max_drawdown': float(drawdown.max()),
+    }
+
+
+def run_backtest(client, symbols, strategy="rsi_ma", interval="5m", fee_percent=0.001, trade_usd=10.0,
+                 sl_percent=0.005, tp_percent=0.00001, decision_sec=300):
+    frames = {s: add_indicators(load_frame(client, s, interval)) for s in symbols}
+    results = {}
+    all_trades = []
+
+    if strategy == "ml":
+        from prediction.MI_Strategy import MLStrategy
+        from prediction.Model_Manager import ModelManager
+        # Minden döntésnél újratanít, és nem írja felül az élő modelleket
+        models = ModelManager(model_dir=tempfile.mkdtemp(prefix="backtest_models_"), retrain_sec=0)
+        ml = MLStrategy(client, symbols, model_manager=models, auto_tune=False)
+        # Közös idővonal: a szimbólumok gyertyái eltérő időpontokban kezdődhetnek vagy hiányozhatnak
+        timestamps = np.unique(np.concatenate([frames[s]['timestamp'].to_numpy() for s in symbols]))
+        ml_entries, ml_exits = replay_signals(ml, client, timestamps, decision_sec * 1000)
+
+    for symbol in symbols:
+        df = frames[symbol]
+        if strategy == "rsi_ma":
+            rules = rsi_ma_rules(df, sl_percent, tp_percent)
+        elif strategy == "trader":
+            rules = trader_rules(df)
+        elif strategy == "ml":
+            n, open_times = len(df), df['timestamp'].to_numpy()
+            rules = (align_signals(ml_entries[symbol], timestamps, open_times),
+                     align_signals(ml_exits[symbol], timestamps, open_times),
+                     np.full(n, sl_percent), np.full(n, tp_percent))
+        else:
+            raise ValueError(f"Ismeretlen stratégia: {strategy}")
+        trades = simulate(df, *rules, fee_percent, trade_usd)
+        results[symbol] = report(trades)
+        all_trades += trades
+
+    results['TOTAL'] = report(all_trades)
+    return results
+
+
+if __name__ == "__main__":
+    config = {}
+    if os.path.exists("config.json"):
+        with open("config.json", "r") as f:
+            config = json.load(f)
+
+    parser = argparse.ArgumentParser(description="Offline backtest tárolt gyertyákon")
+    parser.add_argument("--data", default="data/klines")
+    parser.add_argument("--interval", default="5m", choices=sorted(INTERVAL_MS))
+    parser.add_argument("--strategy", default="rsi_ma", choices=["rsi_ma", "trader", "ml"])
+    parser.add_argument("--symbols", nargs="*")
+    parser.add_argument("--fee", type=float, default=config.get("fee_percent", 0.001))
+    parser.add_argument("--trade-usd", type=float, default=config.get("fixed_trade_usd", 10))
+    parser.add_argument("--sl", type=float, default=0.005)
+    parser.add_argument("--tp", type=float, default=0.00001)
+    parser.add_argument("--json", help="eredmények mentése JSON fájlba")
+    args = parser.parse_args()
+
+    client = MockClient(args.data, interval=args.interval, fee_percent=args.fee)
+    symbols = args.symbols or client.symbols
+    started = time.perf_counter()
+    results = run_backtest(client, symbols, args.strategy, args.interval, args.fee, args.trade_usd,
+                           args.sl, args.tp, config.get("interval_sec", 300))
+    elapsed = time.perf_counter() - started
+
+    for symbol, r in results.items():
+        print(f"{symbol:>10} | Kötések: {r['trades']:5d} | PnL: {r['pnl']:10.4f} | Díj: {r['fees']:8.4f} "
+              f"| Találati arány: {r['hit_rate']:.2%} | Max drawdown: {r['max_drawdown']:.4f}")
+    print(f"Futási idő: {elapsed:.2f}s")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,264 @@
+# benchmark.py
+# Hálózat nélküli teljesítménymérés a jel- és kereskedési utakra, MockClient-en:
+#   python -m backtest.Benchmark --sizes 3 50 500 --json logs/bench.json
+#   python -m backtest.Benchmark --json logs/bench_new.json --baseline logs/bench.json --tolerance 0.2
+# --data megadásakor a rögzített gyertyák ({symbol}_{interval}.csv) adják a fixture-t, különben szintetikus.
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from backtest.Mock_Client import MockClient
+from market.Kline_Cache import INTERVAL_MS
+
+CASES = ['signal_generator', 'ml_prepare_features', 'ml_generate_signals', 'trader_prepare_features',
+         'trade_symbol', 'update_trades']
+
+
+def synthetic_klines(n, step_ms, seed, start_ms=1_700_000_000_000, price=100.0):
+    # Geometriai bolyongás reális gyertyaszerkezettel (high >= open/close >= low)
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate([[price], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.uniform(1, 100, n)
+    return [[start_ms + i * step_ms, f"{open_[i]:.8f}", f"{high[i]:.8f}", f"{low[i]:.8f}", f"{close[i]:.8f}",
+             f"{volume[i]:.8f}", start_ms + (i + 1) * step_ms - 1, f"{volume[i] * close[i]:.8f}", 100,
+             f"{volume[i] / 2:.8f}", f"{volume[i] * close[i] / 2:.8f}", "0"] for i in range(n)]
+
+
+def build_fixture(count, interval="5m", candles=400, data_dir=None, seed=42):
+    """MockClient count szimbólummal; rögzített adat esetén a meglévő sorozatok ismétlődnek új néven."""
+    # data_dir nélkül üres MockClient (os.devnull alatt nincs CSV)
+    client = MockClient(data_dir or os.devnull, interval=interval, balances={"USDT": 1e12})
+    recorded = [client.klines[(s, interval)] for s in client.symbols if (s, interval) in client.klines]
+    symbols = [f"B{i:03d}USDT" for i in range(count)]
+    for i, symbol in enumerate(symbols):
+        if recorded:
+            klines = recorded[i % len(recorded)][-candles:]
+        else:
+            klines = synthetic_klines(candles, INTERVAL_MS[interval], seed + i, price=10.0 + 5 * i)
+        client.add_klines(symbol, interval, klines)
+    return client, symbols
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000) if samples else None
+
+
+class Bench:
+    """
+    Egy méretre (szimbólumszámra) felépített környezet: MockClient, KlineCache,
+    számla, exchangeInfo, megbízáskezelő és saját pozíciókönyv. A mérés előtt
+    warmup kör fut (modelltanítás, cache feltöltés), utána minden kör egy gyertyával
+    lépteti a MockClient időkurzorát, így a cache inkrementális frissítése is mérve van.
+    """
+
+    def __init__(self, client, symbols, interval="5m", limit=100):
+        # A kereskedő modulok csak az ideiglenes munkakönyvtárba váltás után töltődnek be
+        from market.Kline_Cache import KlineCache
+        from market.Exchange_Info import ExchangeInfo
+        from trade.Account_State import AccountState
+        from trade.Order_Manager import OrderManager
+        from trade.Position_Book import PositionBook
+        self.client = client
+        self.symbols = symbols
+        self.interval = interval
+        self.limit = limit
+        self.opens = [k[0] for k in client.klines[(symbols[0], interval)]]
+        self.cursor = limit + 20
+        client.set_time(self.opens[self.cursor])
+        self.kline_cache = KlineCache(client, min_refresh_sec=0)
+        self.exchange_info = ExchangeInfo(client).load()
+        self.account = AccountState(client)
+        self.order_manager = OrderManager(client, self.account)
+        self.book = PositionBook(path=os.path.join("positions", str(len(symbols))))
+        self.rng = np.random.default_rng(len(symbols))
+        self._strategies = {}
+
+    def advance(self):
+        self.cursor = min(self.cursor + 1, len(self.opens) - 1)
+        self.client.set_time(self.opens[self.cursor])
+
+    def strategy(self, name):
+        if name not in self._strategies:
+            if name == "ml":
+                from prediction.MI_Strategy import MLStrategy
+                from prediction.Model_Manager import ModelManager
+                self._strategies[name] = MLStrategy(self.client, self.symbols, kline_cache=self.kline_cache,
+                                                    model_manager=ModelManager("models"), auto_tune=False)
+            else:
+                from Signal_Generator import SignalGenerator
+                self._strategies[name] = SignalGenerator(self.client, self.symbols, kline_cache=self.kline_cache)
+        return self._strategies[name]
+
+    def manager(self):
+        if "manager" not in self._strategies:
+            from trade.Multi_trade_Manager import MultiTradeManager
+            self._strategies["manager"] = MultiTradeManager(self.client, self.symbols, max_positions=len(self.symbols),
+                                                            exchange_info=self.exchange_info,
+                                                            order_manager=self.order_manager, book=self.book)
+        return self._strategies["manager"]
+
+    # --- Esetek: mindegyik egy kört futtat és a mért hívásidők listáját adja
+
+    def run(self, case):
+        return getattr(self, case)()
+
+    def _each(self, func, prepare):
+        samples = []
+        for symbol in self.symbols:
+            args = prepare(symbol)
+            started = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    @staticmethod
+    def _once(func, *args):
+        started = time.perf_counter()
+        func(*args)
+        return [time.perf_counter() - started]
+
+    def signal_generator(self):
+        return self._once(self.strategy("rsi_ma").generate_signals)
+
+    def ml_generate_signals(self):
+        return self._once(self.strategy("ml").generate_signals)
+
+    def ml_prepare_features(self):
+        ml = self.strategy("ml")
+        return self._each(ml.prepare_features, lambda s: (ml.fetch_klines(s, self.interval),))
+
+    def trader_prepare_features(self):
+        from trade.Symbol_Trader import prepare_features
+        return self._each(prepare_features,
+                          lambda s: (self.kline_cache.get_dataframe(s, self.interval, self.limit),))
+
+    def trade_symbol(self):
+        from trade.Symbol_Trader import trade_symbol
+        return self._each(trade_symbol, lambda s: (s, self.client, self.kline_cache, self.account, self.exchange_info,
+                                                   self.order_manager))
+
+    def update_trades(self):
+        signals = dict(zip(self.symbols, self.rng.choice(['BUY', 'SELL', 'HOLD'], len(self.symbols))))
+        return self._once(self.manager().update_trades, signals)
+
+
+def run_case(bench, case, repeat, warmup):
+    for _ in range(warmup):
+        bench.run(case)
+        bench.advance()
+    samples = []
+    for _ in range(repeat):
+        samples += bench.run(case)
+        bench.advance()
+    # Csak a mért hívások ideje számít: a bemenet előkészítése (pl. DataFrame) nincs benne
+    elapsed = sum(samples)
+    # Csúcsmemória külön körben: a tracemalloc lassít, a fenti időkbe nem számít bele
+    tracemalloc.start()
+    bench.run(case)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    bench.advance()
+    count = len(bench.symbols)
+    return {
+        'case': case,
+        'symbols': count,
+        'calls': len(samples),
+        'p50_ms': percentile_ms(samples, 50),
+        'p99_ms': percentile_ms(samples, 99),
+        'mean_ms': float(np.mean(samples) * 1000),
+        'symbols_per_sec': count * repeat / elapsed if elapsed else None,
+        'peak_mb': peak / 1024 / 1024,
+    }
+
+
+def run_benchmarks(sizes=(3, 50, 500), cases=CASES, repeat=5, warmup=1, data_dir=None, interval="5m", seed=42):
+    from trade.Position_Book import position_book
+    results = {}
+    for size in sizes:
+        client, symbols = build_fixture(size, interval, candles=100 + 20 + 2 * (repeat + warmup + 1) * len(cases) + 10,
+                                        data_dir=data_dir, seed=seed)
+        bench = Bench(client, symbols, interval)
+        for case in cases:
+            with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+                result = run_case(bench, case, repeat, warmup)
+            results[f"{case}@{size}"] = result
+            print(f"{case:>24} @ {size:4d} | p50: {result['p50_ms']:9.3f} ms | p99: {result['p99_ms']:9.3f} ms "
+                  f"| {result['symbols_per_sec']:10.1f} szimbólum/s | csúcs: {result['peak_mb']:7.2f} MB")
+        # A trade_symbol a közös pozíciókönyvet használja; a következő méret tiszta könyvvel indul
+        for symbol in symbols:
+            position_book.remove(symbol)
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Lassulások listája: (kulcs, mérőszám, alap, új) ahol az új p50/p99 több mint tolerance-szel rosszabb."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if base.get(metric) and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append((key, metric, base[metric], result[metric]))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hálózat nélküli teljesítménymérés")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[3, 50, 500])
+    parser.add_argument("--cases", nargs="*", default=CASES, choices=CASES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--data", help="rögzített gyertyák könyvtára (különben szintetikus fixture)")
+    parser.add_argument("--interval", default="5m", choices=sorted(INTERVAL_MS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="eredmények mentése JSON fájlba")
+    parser.add_argument("--baseline", help="korábbi --json kimenet az összevetéshez")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="megengedett lassulás aránya (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    data_dir = os.path.abspath(args.data) if args.data else None
+    json_path = os.path.abspath(args.json) if args.json else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    # A naplók, modellek és a history store egy ideiglenes könyvtárba kerülnek, az élő fájlokat nem érinti
+    os.chdir(tempfile.mkdtemp(prefix="bench_"))
+
+    results = run_benchmarks(args.sizes, args.cases, args.repeat, args.warmup, data_dir, args.interval, args.seed)
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'repeat': args.repeat,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'fixture': data_dir or "synthetic",
+        },
+        'results': results,
+    }
+    if json_path:
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=4)
+
+    if baseline_path:
+        with open(baseline_path, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for key, metric, old, new in regressions:
+            print(f"[LASSULÁS] {key} {metric}: {old:.3f} -> {new:.3f} ms ({new / old - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"Nincs {args.tolerance:.0%}-nál nagyobb lassulás az alapértékhez képest.")
@@ -0,0 +1,208 @@
+# mock_client.py
+
+import bisect
+import csv
+import glob
+import os
+import requests
+from binance.exceptions import BinanceAPIException
+from market.Kline_Cache import KLINE_COLUMNS
+
+
+def save_klines_csv(path, klines):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(KLINE_COLUMNS)
+        writer.writerows(klines)
+
+
+def klines_from_ticks(times, prices, step_ms):
+    # Nyers gyertyák (Binance formátum) időrendezett árakból; tick nélküli sávból nem lesz gyertya
+    klines = []
+    for t, price in zip(times, prices):
+        open_time = t - t % step_ms
+        if klines and klines[-1][0] == open_time:
+            k = klines[-1]
+            k[2], k[3], k[4] = max(k[2], price), min(k[3], price), price
+            k[8] += 1
+        else:
+            klines.append([open_time, price, price, price, price, 0.0, open_time + step_ms - 1, 0.0, 1, 0.0, 0.0, "0"])
+    return [[k[0], f"{k[1]:.8f}", f"{k[2]:.8f}", f"{k[3]:.8f}", f"{k[4]:.8f}", "0", k[6], "0", k[8], "0", "0", "0"]
+            for k in klines]
+
+
+def load_klines_csv(path):
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [[int(r[0])] + r[1:6] + [int(r[6])] + r[7:8] + [int(r[8])] + r[9:] for r in reader]
+
+
+class MockClient:
+    """
+    A binance Client helyettesítője helyi gyertyafájlokból ({symbol}_{interval}.csv).
+    Egy időkurzor (set_time) határozza meg a "jelent": a get_klines csak az addig
+    megnyitott gyertyákat adja, a megbízások az aktuális záróáron teljesülnek díjjal.
+    Tickekkel (add_ticks) betöltve az ár az utolsó addigi tick, és a még nyitott gyertya
+    is csak az addigi tickekből áll, így a visszajátszás nem lát előre a gyertyán belül.
+    """
+
+    KLINE_INTERVAL_1MINUTE = '1m'
+    KLINE_INTERVAL_5MINUTE = '5m'
+
+    def __init__(self, data_dir: str = "data/klines", interval: str = '5m', fee_percent: float = 0.001,
+                 balances: dict = None, quote_asset: str = "USDT"):
+        self.data_dir = data_dir
+        self.interval = interval
+        self.fee_percent = fee_percent
+        self.quote_asset = quote_asset
+        self.balances = dict(balances or {quote_asset: 10000.0})
+        self.orders = []
+        self.session = requests.Session()
+        self.API_URL = "mock://"
+        self.klines = {}    # kulcs: (symbol, interval), érték: nyers gyertyák
+        self._opens = {}    # kulcs: (symbol, interval), érték: nyitási idők (bisecthez)
+        self.ticks = {}     # kulcs: symbol, érték: (időpontok, árak)
+        for path in glob.glob(os.path.join(data_dir, "*_*.csv")):
+            symbol, kline_interval = os.path.basename(path)[:-4].rsplit("_", 1)
+            self.add_klines(symbol, kline_interval, load_klines_csv(path))
+        self.now_ms = None
+
+    def add_klines(self, symbol, interval, klines):
+        self.klines[(symbol, interval)] = klines
+        self._opens[(symbol, interval)] = [k[0] for k in klines]
+
+    def add_ticks(self, symbol, ticks, intervals=('1m', '5m')):
+        """(ms időbélyeg, ár) párok; a megadott idősíkok gyertyái ezekből épülnek."""
+        from market.Kline_Cache import INTERVAL_MS
+        ticks = sorted(ticks)
+        times, prices = [t for t, _ in ticks], [float(p) for _, p in ticks]
+        self.ticks[symbol] = (times, prices)
+        for interval in intervals:
+            self.add_klines(symbol, interval, klines_from_ticks(times, prices, INTERVAL_MS[interval]))
+
+    @property
+    def symbols(self):
+        return sorted({s for s, _ in self.klines})
+
+    def set_time(self, now_ms):
+        self.now_ms = now_ms
+
+    def _index(self, symbol, interval=None):
+        # Az utolsó, a kurzorig megnyitott gyertya indexe
+        opens = self._opens[(symbol, interval or self.interval)]
+        if self.now_ms is None:
+            return len(opens) - 1
+        return bisect.bisect_right(opens, self.now_ms) - 1
+
+    # --- Piaci adatok
+    def get_klines(self, symbol, interval, limit=500, startTime=None, endTime=None, **kwargs):
+        klines = self.klines[(symbol, interval)]
+        end = self._index(symbol, interval) + 1
+        if endTime is not None:
+            end = min(end, bisect.bisect_right(self._opens[(symbol, interval)], endTime))
+        start = max(0, end - limit)
+        if startTime is not None:
+            # startTime esetén a tőzsde is tőle előre számolva adja a limit gyertyát
+            start = bisect.bisect_left(self._opens[(symbol, interval)], startTime)
+            end = min(end, start + limit)
+        result = [list(k) for k in klines[start:end]]
+        if result and symbol in self.ticks and self.now_ms is not None and result[-1][6] > self.now_ms:
+            result[-1] = self._partial(symbol, result[-1])
+        return result
+
+    def _partial(self, symbol, kline):
+        # A nyitott gyertya csak a kurzorig beérkezett tickekből
+        times, prices = self.ticks[symbol]
+        window = prices[bisect.bisect_left(times, kline[0]):bisect.bisect_right(times, self.now_ms)]
+        if not window:
+            return kline
+        kline[1:5] = [f"{window[0]:.8f}", f"{max(window):.8f}", f"{min(window):.8f}", f"{window[-1]:.8f}"]
+        kline[8] = len(window)
+        return kline
+
+    def get_historical_klines(self, symbol, interval, start_str=None, end_str=None, limit=1000, **kwargs):
+        # start_str/end_str ms időbélyegként (a python-binance dátumszövegeit nem értelmezi);
+        # mint a python-binance, end <= start esetén üres listát ad
+        if start_str is not None and end_str is not None and int(end_str) <= int(start_str):
+            return []
+        opens = self._opens[(symbol, interval)]
+        start = bisect.bisect_left(opens, int(start_str)) if start_str is not None else 0
+        end = self._index(symbol, interval) + 1
+        if end_str is not None:
+            end = min(end, bisect.bisect_right(opens, int(end_str)))
+        return [list(k) for k in self.klines[(symbol, interval)][start:end]]
+
+    def price(self, symbol):
+        if symbol in self.ticks:
+            times, prices = self.ticks[symbol]
+            i = len(times) - 1 if self.now_ms is None else bisect.bisect_right(times, self.now_ms) - 1
+            return prices[max(i, 0)]
+        return float(self.klines[(symbol, self.interval)][self._index(symbol)][4])
+
+    def get_symbol_ticker(self, symbol):
+        return {'symbol': symbol, 'price': str(self.price(symbol))}
+
+    def get_orderbook_tickers(self, **kwargs):
+        return [{'symbol': s, 'bidPrice': str(self.price(s)), 'askPrice': str(self.price(s))} for s in self.symbols]
+
+    def get_symbol_info(self, symbol):
+        return {
+            'symbol': symbol,
+            'filters': [
+                {'filterType': 'LOT_SIZE', 'stepSize': '0.00000100', 'minQty': '0.00000100', 'maxQty': '9000000'},
+                {'filterType': 'PRICE_FILTER', 'tickSize': '0.01000000', 'minPrice': '0.01', 'maxPrice': '0'},
+                {'filterType': 'NOTIONAL', 'minNotional': '5.0'},
+            ]
+        }
+
+    def get_exchange_info(self):
+        return {'symbols': [self.get_symbol_info(s) for s in self.symbols]}
+
+    # --- Számla
+    def get_asset_balance(self, asset, **kwargs):
+        return {'asset': asset, 'free': str(self.balances.get(asset, 0.0)), 'locked': '0'}
+
+    def get_account(self, **kwargs):
+        return {'balances': [{'asset': a, 'free': str(v), 'locked': '0'} for a, v in self.balances.items()]}
+
+    # --- Megbízások
+    def _fill(self, symbol, side, quantity=None, client_order_id=None, quote_quantity=None):
+        price = self.price(symbol)
+        quantity = float(quantity) if quantity is not None else float(quote_quantity) / price
+        base = symbol[:-len(self.quote_asset)]
+        quote = quantity * price
+        commission = quote * self.fee_percent
+        if side == "BUY":
+            if self.balances.get(self.quote_asset, 0.0) < quote + commission:
+                raise ValueError("Account has insufficient balance for requested action.")
+            self.balances[self.quote_asset] = self.balances.get(self.quote_asset, 0.0) - quote - commission
+            self.balances[base] = self.balances.get(base, 0.0) + quantity
+        else:
+            if self.balances.get(base, 0.0) < quantity - 1e-12:
+                raise ValueError("Account has insufficient balance for requested action.")
+            self.balances[base] = self.balances.get(base, 0.0) - quantity
+            self.balances[self.quote_asset] = self.balances.get(self.quote_asset, 0.0) + quote - commission
+        order = {
+            'symbol': symbol, 'orderId': len(self.orders) + 1,
+            'clientOrderId': client_order_id or f"mock{len(self.orders) + 1}",
+            'transactTime': self.now_ms, 'side': side, 'type': 'MARKET', 'status': 'FILLED',
+            'origQty': str(quantity), 'executedQty': str(quantity), 'cummulativeQuoteQty': str(quote),
+            'fills': [{'price': str(price), 'qty': str(quantity), 'commission': str(commission),
+                       'commissionAsset': self.quote_asset}],
+        }
+        self.orders.append(order)
+        return order
+
+    def order_market_buy(self, symbol, quantity=None, newClientOrderId=None, quoteOrderQty=None, **kwargs):
+        return self._fill(symbol, "BUY", quantity, newClientOrderId, quoteOrderQty)
+
+    def order_market_sell(self, symbol, quantity=None, newClientOrderId=None, quoteOrderQty=None, **kwargs):
+        return self._fill(symbol, "SELL", quantity, newClientOrderId, quoteOrderQty)
+
+    def get_order(self, symbol, orderId=None, origClientOrderId=None, **kwargs):
+        for order in reversed(self.orders):
+            if order['symbol'] == symbol and (order['orderId'] == orderId or order['clientOrderId'] == origClientOrderId):
+                return {k: v for k, v in order.items() if k != 'fills'}
+        raise BinanceAPIException(None, 400, '{"code": -2013, "msg": "Order does not exist."}')
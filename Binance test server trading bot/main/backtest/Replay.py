@@ -0,0 +1,207 @@
+# replay.py
+# Determinisztikus tick-visszajátszás a teljes élő kereskedési úton, szimulált tőzsdével:
+#   python main.py --replay                      (tickek a logs/ prediction_log és live_trade_log fájljaiból)
+#   python main.py --replay --replay-data data/klines   (letöltött gyertyákból)
+
+import csv
+import heapq
+import json
+import os
+import time
+from datetime import datetime
+from backtest.Mock_Client import MockClient, load_klines_csv
+from market.Kline_Cache import INTERVAL_MS
+
+LOG_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _log_ms(text):
+    return int(datetime.strptime(text, LOG_TIME_FORMAT).timestamp() * 1000)
+
+
+def load_log_ticks(log_dir, symbols):
+    """
+    Percenkénti árak a korábbi futások naplóiból: logs/prediction_log_{symbol}.csv
+    (fejléc nélkül: időpont, ár, predikció) és live_trade_log_{symbol}.csv (fejléccel).
+    Az azonos időpontú sorok egyszer számítanak.
+    """
+    ticks = {}
+    for symbol in symbols:
+        prices = {}
+        for path in (os.path.join(log_dir, f"prediction_log_{symbol}.csv"),
+                     os.path.join(log_dir, f"live_trade_log_{symbol}.csv")):
+            if not os.path.exists(path):
+                continue
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.reader(f):
+                    try:
+                        prices[_log_ms(row[0])] = float(row[1])
+                    except (ValueError, IndexError):
+                        continue    # fejléc vagy csonka sor
+        if prices:
+            ticks[symbol] = sorted(prices.items())
+    return ticks
+
+
+def load_kline_ticks(data_dir, symbols, interval="1m"):
+    # Letöltött gyertyákból ({symbol}_{interval}.csv) gyertyánként négy tick: nyitó, két szélső, záró
+    ticks = {}
+    step = INTERVAL_MS[interval]
+    for symbol in symbols:
+        path = os.path.join(data_dir, f"{symbol}_{interval}.csv")
+        if not os.path.exists(path):
+            continue
+        series = []
+        for k in load_klines_csv(path):
+            o, h, l, c = (float(v) for v in k[1:5])
+            first, second = (l, h) if c >= o else (h, l)
+            series += [(k[0], o), (k[0] + step // 3, first), (k[0] + 2 * step // 3, second), (k[0] + step - 1, c)]
+        ticks[symbol] = series
+    return ticks
+
+
+def available_kline_interval(data_dir, symbols):
+    # A legfinomabb idősík, amely minden szimbólumra megvan
+    for interval in sorted(INTERVAL_MS, key=INTERVAL_MS.get):
+        if all(os.path.exists(os.path.join(data_dir, f"{s}_{interval}.csv")) for s in symbols):
+            return interval
+    return None
+
+
+def first_tick(client):
+    return min(times[0] for times, _ in client.ticks.values())
+
+
+class ReplayClock:
+    """
+    Szimulált idő. Az install() a time.time-ot cseréli, így a KlineCache frissítési
+    ütemezése, a ModelManager újratanítási ideje, a számlaállapot kora és a naplók
+    időbélyegei a visszajátszott időt követik; a szálak várakozása (monotonic) valós marad.
+    Az uninstall() (vagy a with blokk vége) az eredeti time.time-ot állítja vissza.
+    """
+
+    def __init__(self, now_ms=0):
+        self.now_ms = now_ms
+        self._original = None
+
+    def time(self):
+        return self.now_ms / 1000.0
+
+    def set(self, now_ms):
+        self.now_ms = now_ms
+
+    def install(self):
+        if self._original is None:
+            self._original = time.time
+            time.time = self.time
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            time.time = self._original
+            self._original = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+
+def build_client(symbols, intervals, log_dir=None, data_dir=None, fee_percent=0.001, balances=None):
+    """MockClient a visszajátszandó tickekkel; data_dir esetén gyertyákból, különben a naplókból."""
+    if data_dir:
+        ticks = load_kline_ticks(data_dir, symbols, available_kline_interval(data_dir, symbols) or "1m")
+    else:
+        ticks = load_log_ticks(log_dir, symbols)
+    missing = [s for s in symbols if s not in ticks]
+    if missing:
+        raise ValueError(f"Nincs visszajátszható ár: {missing}")
+    client = MockClient(os.devnull, fee_percent=fee_percent, balances=balances)
+    for symbol, series in ticks.items():
+        client.add_ticks(symbol, series, intervals)
+    return client
+
+
+class Replay:
+    """
+    A fő ciklus szimulált időben, alvás nélkül: minden tick az on_price_update-en át
+    (SL/TP), price_check_sec szimulált másodpercenként egy scheduler ciklus
+    (trade_symbol minden szimbólumra), decision_sec-enként stratégiai döntés és
+    update_trades. A tickek időrendben, szimbólumok között összefésülve érkeznek.
+    A futás végén (hiba esetén is) a clock visszaadja a valós time.time-ot.
+    """
+
+    def __init__(self, client, clock, scheduler, strategy, trade_manager, on_tick=None, price_check_sec=60,
+                 decision_sec=300, log=None):
+        self.client = client
+        self.clock = clock
+        self.scheduler = scheduler
+        self.strategy = strategy
+        self.trade_manager = trade_manager
+        self.on_tick = on_tick
+        self.price_check_ms = int(price_check_sec * 1000)
+        self.decision_ms = int(decision_sec * 1000)
+        self.log = log or (lambda line: None)
+        self.stats = {'ticks': 0, 'cycles': 0, 'decisions': 0, 'errors': 0}
+
+    def ticks(self):
+        streams = [[(t, symbol, price) for t, price in zip(*self.client.ticks[symbol])] for symbol in self.client.ticks]
+        return heapq.merge(*streams)
+
+    def run(self, start_ms=None, end_ms=None):
+        started = time.perf_counter()
+        try:
+            self._run(start_ms, end_ms)
+        finally:
+            self.clock.uninstall()
+        self.stats['wall_sec'] = time.perf_counter() - started
+        return self.summary()
+
+    def _run(self, start_ms, end_ms):
+        next_cycle = next_decision = None
+        for t, symbol, price in self.ticks():
+            if start_ms is not None and t < start_ms:
+                continue
+            if end_ms is not None and t > end_ms:
+                break
+            self.clock.set(t)
+            self.client.set_time(t)
+            self.stats['ticks'] += 1
+            if self.on_tick is not None:
+                self.on_tick(symbol, price)
+            if next_cycle is None:
+                next_cycle = next_decision = t
+            try:
+                if t >= next_cycle:
+                    self.scheduler.run_cycle()
+                    self.stats['cycles'] += 1
+                    next_cycle = t + self.price_check_ms
+                if t >= next_decision:
+                    signals = self.strategy.generate_signals()
+                    self.log(f"[DÖNTÉS] {signals}")
+                    self.trade_manager.update_trades(signals)
+                    self.stats['decisions'] += 1
+                    next_decision = t + self.decision_ms
+            except Exception as e:
+                self.stats['errors'] += 1
+                self.log(f"[HIBA] {e}")
+
+    def summary(self):
+        client = self.client
+        equity = client.balances.get(client.quote_asset, 0.0)
+        for symbol in client.ticks:
+            equity += client.balances.get(symbol[:-len(client.quote_asset)], 0.0) * client.price(symbol)
+        wall = self.stats.get('wall_sec') or 0.0
+        return dict(self.stats,
+                    orders=len(client.orders),
+                    fees=sum(float(f['commission']) for o in client.orders for f in o['fills']),
+                    balances={a: v for a, v in client.balances.items() if v},
+                    equity=equity,
+                    ticks_per_sec=self.stats['ticks'] / wall if wall else None,
+                    cycles_per_sec=self.stats['cycles'] / wall if wall else None)
+
+
+def save_summary(summary, path="replay_summary.json"):
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=4)
@@ -1,151 +1,238 @@
-﻿# feedback_gui.py – Bővítve live_trade_log elemzéssel + mainből is futtatható
-
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-import glob
-import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import sys
-
-def run_gui():
-    root = tk.Tk()
-    app = FeedbackAnalyzerApp(root)
-    root.mainloop()
-
-class FeedbackAnalyzerApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title(" Kereskedési visszacsatolás + live trade elemző")
-        self.root.geometry("1100x650")
-
-        self.frame = ttk.Frame(root)
-        self.frame.pack(fill=tk.BOTH, expand=True)
-
-        self.notebook = ttk.Notebook(self.frame)
-        self.feedback_tab = ttk.Frame(self.notebook)
-        self.live_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.feedback_tab, text="Feedback logok")
-        self.notebook.add(self.live_tab, text="Live trade logok")
-        self.notebook.pack(fill=tk.BOTH, expand=True)
-
-        # Feedback log tábla
-        self.tree_feedback = ttk.Treeview(self.feedback_tab, columns=("timestamp", "symbol", "predicted_return", "action", "profit"), show="headings")
-        for col in self.tree_feedback["columns"]:
-            self.tree_feedback.heading(col, text=col)
-            self.tree_feedback.column(col, width=100)
-        self.tree_feedback.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar1 = ttk.Scrollbar(self.feedback_tab, orient="vertical", command=self.tree_feedback.yview)
-        self.tree_feedback.configure(yscroll=scrollbar1.set)
-        scrollbar1.pack(side=tk.LEFT, fill=tk.Y)
-
-        # Live trade log tábla
-        self.tree_live = ttk.Treeview(self.live_tab, columns=("timestamp", "symbol", "action", "price", "quantity", "profit"), show="headings")
-        for col in self.tree_live["columns"]:
-            self.tree_live.heading(col, text=col)
-            self.tree_live.column(col, width=100)
-        self.tree_live.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar2 = ttk.Scrollbar(self.live_tab, orient="vertical", command=self.tree_live.yview)
-        self.tree_live.configure(yscroll=scrollbar2.set)
-        scrollbar2.pack(side=tk.LEFT, fill=tk.Y)
-
-        # Gombok
-        self.button_frame = ttk.Frame(root)
-        self.button_frame.pack(fill=tk.X)
-        ttk.Button(self.button_frame, text=" Feedback log betöltés", command=self.load_feedback_logs).pack(side=tk.LEFT, padx=10, pady=5)
-        ttk.Button(self.button_frame, text=" Live trade log betöltés", command=self.load_live_logs).pack(side=tk.LEFT, padx=10, pady=5)
-        ttk.Button(self.button_frame, text=" Feedback grafikon", command=self.show_feedback_plot).pack(side=tk.LEFT, padx=10, pady=5)
-        ttk.Button(self.button_frame, text=" Live profit eloszlás", command=self.show_live_profit_plot).pack(side=tk.LEFT, padx=10, pady=5)
-
-        self.feedback_data = pd.DataFrame()
-        self.live_data = pd.DataFrame()
-
-    def load_feedback_logs(self):
-        pattern = os.path.join("logs", "feedback_log_*.csv")
-        files = glob.glob(pattern)
-        all_data = []
-        for file in files:
-            df = pd.read_csv(file)
-            df['file'] = os.path.basename(file)
-            all_data.append(df)
-
-        if not all_data:
-            messagebox.showerror("Hiba", "Nem található feedback log.")
-            return
-
-        self.feedback_data = pd.concat(all_data, ignore_index=True)
-        self.feedback_data['timestamp'] = pd.to_datetime(self.feedback_data['timestamp'], errors='coerce')
-        self.feedback_data['profit'] = pd.to_numeric(self.feedback_data['profit'], errors='coerce')
-        self.feedback_data['predicted_return'] = pd.to_numeric(self.feedback_data['predicted_return'], errors='coerce')
-
-        for row in self.tree_feedback.get_children():
-            self.tree_feedback.delete(row)
-        for _, row in self.feedback_data.iterrows():
-            self.tree_feedback.insert("", "end", values=(row['timestamp'], row['symbol'], f"{row['predicted_return']:.4f}", row['action'], f"{row['profit']:.4f}"))
-
-    def load_live_logs(self):
-        pattern = os.path.join("logs", "live_trade_log_*.csv")
-        files = glob.glob(pattern)
-        all_data = []
-        for file in files:
-            df = pd.read_csv(file)
-            df['file'] = os.path.basename(file)
-            df['symbol'] = df['file'].str.replace("live_trade_log_", "").str.replace(".csv", "")
-            all_data.append(df)
-
-        if not all_data:
-            messagebox.showerror("Hiba", "Nem található live trade log.")
-            return
-
-        self.live_data = pd.concat(all_data, ignore_index=True)
-        self.live_data['timestamp'] = pd.to_datetime(self.live_data['timestamp'], errors='coerce')
-
-        for row in self.tree_live.get_children():
-            self.tree_live.delete(row)
-        for _, row in self.live_data.iterrows():
-            self.tree_live.insert("", "end", values=(row['timestamp'], row['symbol'], row['action'], row.get('current_price', 'N/A'), row['quantity'], f"{row['profit']:.4f}"))
-
-    def show_feedback_plot(self):
-        if self.feedback_data.empty:
-            messagebox.showinfo("Figyelem", "Előbb tölts be feedback logokat!")
-            return
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.scatter(self.feedback_data['predicted_return'], self.feedback_data['profit'], alpha=0.5, c=(self.feedback_data['profit'] > 0), cmap='bwr')
-        ax.axhline(0, color='gray', linestyle='--')
-        ax.set_xlabel('Predicted Return')
-        ax.set_ylabel('Profit')
-        ax.set_title('Predikció és Profit kapcsolata')
-        ax.grid(True)
-
-        plot_window = tk.Toplevel(self.root)
-        plot_window.title(" Feedback grafikon")
-        canvas = FigureCanvasTkAgg(fig, master=plot_window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-    def show_live_profit_plot(self):
-        if self.live_data.empty:
-            messagebox.showinfo("Figyelem", "Előbb tölts be live trade logokat!")
-            return
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        for symbol in self.live_data['symbol'].unique():
-            symbol_data = self.live_data[self.live_data['symbol'] == symbol]
-            ax.hist(symbol_data['profit'], bins=30, alpha=0.5, label=symbol)
-
-        ax.set_xlabel("Profit")
-        ax.set_ylabel("Gyakoriság")
-        ax.set_title(" Profit eloszlás szimbólumonként")
-        ax.legend()
-        ax.grid(True)
-
-        plot_window = tk.Toplevel(self.root)
-        plot_window.title(" Live trade profit eloszlás")
-        canvas = FigureCanvasTkAgg(fig, master=plot_window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-if __name__ == "__main__":
-    run_gui()
+# feedback_gui.py – Bővítve live_trade_log elemzéssel + mainből is futtatható
+
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import pandas as pd
+import glob
+import os
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import sys
+import queue
+import threading
+from Log_Tailer import LogTailer
+
+PAGE_SIZE = 200
+REFRESH_MS = 500
+POLL_SEC = 2.0
+
+def run_gui():
+    root = tk.Tk()
+    app = FeedbackAnalyzerApp(root)
+    root.mainloop()
+
+class PagedTable:
+    """
+    Lapozott Treeview: a sorok memóriában vannak, a Tk csak az aktuális lapot rajzolja.
+    Követés módban mindig az utolsó lapot mutatja.
+    """
+
+    def __init__(self, parent, columns):
+        self.rows = []
+        self.page = 0
+        self.follow = True
+        self.tree = ttk.Treeview(parent, columns=columns, show="headings")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        controls = ttk.Frame(parent)
+        controls.pack(side=tk.BOTTOM, fill=tk.X)
+        ttk.Button(controls, text="<", width=3, command=lambda: self.show(self.page - 1)).pack(side=tk.LEFT)
+        ttk.Button(controls, text=">", width=3, command=lambda: self.show(self.page + 1)).pack(side=tk.LEFT)
+        self.label = ttk.Label(controls, text="")
+        self.label.pack(side=tk.LEFT, padx=10)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscroll=scrollbar.set)
+        scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+
+    def last_page(self):
+        return max(0, (len(self.rows) - 1) // PAGE_SIZE)
+
+    def extend(self, rows):
+        first_new = len(self.rows)
+        self.rows.extend(rows)
+        if self.follow:
+            if first_new // PAGE_SIZE == self.page and self.page == self.last_page():
+                # Csak az új sorok kerülnek be, ha ugyanazon a lapon maradunk
+                for values in rows:
+                    self.tree.insert("", "end", values=values)
+                self.tree.yview_moveto(1.0)
+                self._update_label()
+            else:
+                self.show(self.last_page())
+        else:
+            self._update_label()
+
+    def show(self, page):
+        page = min(max(0, page), self.last_page())
+        self.page = page
+        self.follow = page == self.last_page()
+        self.tree.delete(*self.tree.get_children())
+        for values in self.rows[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]:
+            self.tree.insert("", "end", values=values)
+        self._update_label()
+
+    def _update_label(self):
+        self.label.config(text=f"{self.page + 1}. / {self.last_page() + 1} lap – {len(self.rows)} sor")
+
+class FeedbackAnalyzerApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title(" Kereskedési visszacsatolás + live trade elemző")
+        self.root.geometry("1100x650")
+
+        self.frame = ttk.Frame(root)
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+        self.notebook = ttk.Notebook(self.frame)
+        self.feedback_tab = ttk.Frame(self.notebook)
+        self.live_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.feedback_tab, text="Feedback logok")
+        self.notebook.add(self.live_tab, text="Live trade logok")
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+
+        # Feedback és live trade log táblák (lapozva)
+        self.table_feedback = PagedTable(self.feedback_tab, ("timestamp", "symbol", "predicted_return", "action", "profit"))
+        self.table_live = PagedTable(self.live_tab, ("timestamp", "symbol", "action", "price", "quantity", "profit"))
+
+        # Gombok
+        self.button_frame = ttk.Frame(root)
+        self.button_frame.pack(fill=tk.X)
+        ttk.Button(self.button_frame, text=" Feedback log betöltés", command=self.load_feedback_logs).pack(side=tk.LEFT, padx=10, pady=5)
+        ttk.Button(self.button_frame, text=" Live trade log betöltés", command=self.load_live_logs).pack(side=tk.LEFT, padx=10, pady=5)
+        ttk.Button(self.button_frame, text=" Feedback grafikon", command=self.show_feedback_plot).pack(side=tk.LEFT, padx=10, pady=5)
+        ttk.Button(self.button_frame, text=" Live profit eloszlás", command=self.show_live_profit_plot).pack(side=tk.LEFT, padx=10, pady=5)
+
+        # Háttérszál olvassa a logok új sorait, a Tk szál csak a sorból vesz ki
+        self.tailers = {
+            'feedback': LogTailer(os.path.join("logs", "feedback_log_*.csv")),
+            'live': LogTailer(os.path.join("logs", "live_trade_log_*.csv")),
+        }
+        self.active = set()    # a betöltés gombok kapcsolják be a követést
+        self.rows = {'feedback': [], 'live': []}
+        self.updates = queue.Queue()
+        self.stop_event = threading.Event()
+        threading.Thread(target=self._poll_logs, daemon=True).start()
+        self.root.after(REFRESH_MS, self._drain_updates)
+        self.root.protocol("WM_DELETE_WINDOW", self._close)
+
+    @property
+    def feedback_data(self):
+        data = pd.DataFrame(self.rows['feedback'])
+        if not data.empty:
+            data['timestamp'] = pd.to_datetime(data['timestamp'], errors='coerce')
+            data['profit'] = pd.to_numeric(data['profit'], errors='coerce')
+            data['predicted_return'] = pd.to_numeric(data['predicted_return'], errors='coerce')
+        return data
+
+    @property
+    def live_data(self):
+        data = pd.DataFrame(self.rows['live'])
+        if not data.empty:
+            data['timestamp'] = pd.to_datetime(data['timestamp'], errors='coerce')
+            data['profit'] = pd.to_numeric(data['profit'], errors='coerce')
+        return data
+
+    def _poll_logs(self):
+        while not self.stop_event.is_set():
+            for kind in list(self.active):
+                try:
+                    rows = self.tailers[kind].poll()
+                except Exception as e:
+                    print(f"[GUI] Log olvasási hiba: {e}")
+                    continue
+                if rows:
+                    self.updates.put((kind, rows))
+            self.stop_event.wait(POLL_SEC)
+
+    def _drain_updates(self):
+        # Egy körben korlátozott mennyiséget dolgozunk fel, hogy a Tk reszponzív maradjon
+        for _ in range(20):
+            try:
+                kind, rows = self.updates.get_nowait()
+            except queue.Empty:
+                break
+            self.rows[kind].extend(rows)
+            if kind == 'feedback':
+                self.table_feedback.extend([self._feedback_values(r) for r in rows])
+            else:
+                self.table_live.extend([self._live_values(r) for r in rows])
+        self.root.after(REFRESH_MS, self._drain_updates)
+
+    @staticmethod
+    def _number(value):
+        try:
+            return f"{float(value):.4f}"
+        except (TypeError, ValueError):
+            return value
+
+    def _feedback_values(self, row):
+        return (row.get('timestamp'), row.get('symbol'), self._number(row.get('predicted_return')), row.get('action'), self._number(row.get('profit')))
+
+    def _live_values(self, row):
+        symbol = row['file'].replace("live_trade_log_", "").replace(".csv", "")
+        row['symbol'] = symbol
+        return (row.get('timestamp'), symbol, row.get('action'), row.get('current_price', 'N/A'), row.get('quantity'), self._number(row.get('profit')))
+
+    def _close(self):
+        self.stop_event.set()
+        self.root.destroy()
+
+    def load_feedback_logs(self):
+        if not glob.glob(os.path.join("logs", "feedback_log_*.csv")):
+            messagebox.showerror("Hiba", "Nem található feedback log.")
+            return
+        self.active.add('feedback')
+
+    def load_live_logs(self):
+        if not glob.glob(os.path.join("logs", "live_trade_log_*.csv")):
+            messagebox.showerror("Hiba", "Nem található live trade log.")
+            return
+        self.active.add('live')
+
+    def show_feedback_plot(self):
+        data = self.feedback_data
+        if data.empty:
+            messagebox.showinfo("Figyelem", "Előbb tölts be feedback logokat!")
+            return
+
+        fig, ax = plt.subplots(figsize=(8, 4))
+        ax.scatter(data['predicted_return'], data['profit'], alpha=0.5, c=(data['profit'] > 0), cmap='bwr')
+        ax.axhline(0, color='gray', linestyle='--')
+        ax.set_xlabel('Predicted Return')
+        ax.set_ylabel('Profit')
+        ax.set_title('Predikció és Profit kapcsolata')
+        ax.grid(True)
+
+        plot_window = tk.Toplevel(self.root)
+        plot_window.title(" Feedback grafikon")
+        canvas = FigureCanvasTkAgg(fig, master=plot_window)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+    def show_live_profit_plot(self):
+        data = self.live_data
+        if data.empty:
+            messagebox.showinfo("Figyelem", "Előbb tölts be live trade logokat!")
+            return
+
+        fig, ax = plt.subplots(figsize=(8, 4))
+        for symbol in data['symbol'].unique():
+            symbol_data = data[data['symbol'] == symbol]
+            ax.hist(symbol_data['profit'], bins=30, alpha=0.5, label=symbol)
+
+        ax.set_xlabel("Profit")
+        ax.set_ylabel("Gyakoriság")
+        ax.set_title(" Profit eloszlás szimbólumonként")
+        ax.legend()
+        ax.grid(True)
+
+        plot_window = tk.Toplevel(self.root)
+        plot_window.title(" Live trade profit eloszlás")
+        canvas = FigureCanvasTkAgg(fig, master=plot_window)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+if __name__ == "__main__":
+    run_gui()
@@ -1,32 +1,78 @@
-﻿
+
 # main.py
 
 import time
-import json
-import subprocess
-import os
-from feedback_gui import run_gui
-import threading
 
-# GUI és tanulási script automatikus indítása
-base = os.path.dirname(__file__)
-gui_path = os.path.join(base, "feedback_gui.py")
-learning_path = os.path.join(base, "feedback_learning.py")
+# --- Indítási időmérés: szakaszonkénti idők a [START] logsorba
+startup_begin = time.perf_counter()
+startup_stages = []
 
 
-threading.Thread(target=run_gui, daemon=True).start()
-subprocess.Popen(["python", learning_path])
+def mark(stage):
+    elapsed = time.perf_counter() - startup_begin - sum(t for _, t in startup_stages)
+    startup_stages.append((stage, elapsed))
 
 
+import atexit
+import json
+import subprocess
+import sys
+import os
+import threading
 from datetime import datetime, timedelta
 from binance.client import Client
-from Strategy_Factory import StrategyFactory
+from Strategy_Factory import StrategyFactory, preload_strategy
+from market.Kline_Cache import KlineCache
+from market.Kline_Archive import KlineArchive, backfill
+from market.Market_Stream import MarketStream
+from trade.Symbol_Trader import on_price_update, configure
+from trade.Account_State import AccountState
+from market.Exchange_Info import ExchangeInfo
+from market.Rest_Gateway import RestGateway
+from Log_Writer import log_writer
+from Analytics_Channel import analytics
 from trade.Multi_trade_Manager import MultiTradeManager
-from trade.Symbol_Trader import trade_symbol
+from trade.Symbol_Scheduler import SymbolScheduler
+from trade.Order_Manager import OrderManager
+from trade.Position_Book import position_book
+from Metrics import metrics
+mark("importok")
 
 # --- Konfiguráció betöltése fájlból
 with open("config.json", "r") as f:
     config = json.load(f)
+configure(config)
+
+
+def arg_value(name, default=None):
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv[:-1] else default
+
+
+def stop_process(process, timeout=5):
+    # Leálláskor a gyerekfolyamat is leáll, különben árván tovább futna
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# --- Visszajátszás (--replay): rögzített tickek szimulált tőzsdén és időben, alvás nélkül
+replay = "--replay" in sys.argv or config.get("replay", False)
+
+# A kiválasztott stratégia és függőségei (Strategy_Factory.PRELOAD) a hálózati inicializálással párhuzamosan
+preload_strategy(config["strategy"])
+# --- Elemzés (GUI, feedback_learning) külön folyamatban; --headless esetén egyáltalán nem indul
+headless = "--headless" in sys.argv or config.get("headless", False) or replay
+if not headless:
+    analytics.start()
+    analytics_cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Analytics_Process.py")]
+    if config.get("gui", True):
+        analytics_cmd.append("--gui")
+    analytics_process = subprocess.Popen(analytics_cmd)
+    atexit.register(stop_process, analytics_process)
+mark("config")
 
 api_key = config["api_key"]
 api_secret = config["api_secret"]
@@ -37,54 +83,179 @@ price_check_interval = 60  # 1 perc
 decision_interval = config.get("interval_sec", 300)
 min_usdt_balance = config.get("min_usdt_balance", 10)  # minimum USDT figyelmeztetés
 
-# --- Binance kliens inicializálása
-testnet_url = config.get("api_url", 'https://testnet.binance.vision/api')
-client = Client(api_key, api_secret)
-client.API_URL = testnet_url
+if replay:
+    # MockClient tickekkel (logs/ naplókból vagy --replay-data gyertyáiból); a kimenet külön futáskönyvtárba kerül
+    from backtest.Replay import ReplayClock, build_client, first_tick
+    replay_data = arg_value("--replay-data", config.get("replay_data"))
+    client = build_client(symbols, {"1m", "5m", config.get("base_interval") or "5m", *(config.get("ml_timeframes") or [])},
+                          log_dir=os.path.abspath("logs"), data_dir=replay_data and os.path.abspath(replay_data),
+                          fee_percent=config.get("fee_percent", 0.001),
+                          balances={"USDT": config.get("replay_balance", 10000.0)})
+    replay_dir = os.path.join("logs", "replay", datetime.now().strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(replay_dir, exist_ok=True)
+    os.chdir(replay_dir)
+    replay_clock = ReplayClock(first_tick(client)).install()
+    atexit.register(replay_clock.uninstall)     # indítási hiba esetén is; a Replay.run maga is visszaállítja
+    client.set_time(replay_clock.now_ms)
+else:
+    # --- Binance kliens inicializálása
+    testnet_url = config.get("api_url", 'https://testnet.binance.vision/api')
+    client = Client(api_key, api_secret, requests_params={"timeout": config.get("rest_timeout_sec", 10)})
+    client.API_URL = testnet_url
+
+    # --- Minden REST hívás a közös kapun át: súlykeret, megbízás-elsőbbség, 429/418 visszavétel
+    client = RestGateway(client, weight_limit=config.get("rest_weight_limit", 6000))
+mark("kliens")
+
+# --- Lemezes gyertya-archívum: a hiányzó lezárt gyertyák az indulás után, háttérszálon töltődnek le,
+# utána az élő ciklus fűzi. Amíg a pótlás tart, a cache a szokásos REST lekéréssel indul.
+archive = None
+if config.get("kline_archive", True) and not replay:
+    archive = KlineArchive(config.get("archive_dir", "data/archive"))
+mark("archívum")
+
+# --- Közös gyertya cache: egy lekérés szolgálja ki a kereskedőt és a stratégiát
+# base_interval (pl. "1m") esetén a magasabb idősíkok ebből újramintázva, külön letöltés nélkül
+kline_cache = KlineCache(client, window=config.get("kline_window", 500), base_interval=config.get("base_interval"),
+                         archive=archive)
+
+# --- Szimbólum szűrők (LOT_SIZE, PRICE_FILTER, MIN_NOTIONAL) egyszeri betöltése, háttérfrissítéssel
+exchange_info = ExchangeInfo(client, refresh_sec=config.get("exchange_info_refresh_sec", 3600))
+try:
+    exchange_info.load().start()
+except Exception as e:
+    print(f" Nem sikerült betölteni az exchangeInfo-t: {e}")
+    exchange_info = None
+mark("exchangeInfo")
+
+# --- Számlaállapot: ciklusonként egy get_account a szimbólumonkénti egyenleglekérések helyett
+account = AccountState(client)
+
+# --- Megbízások egyedi clientOrderId-vel, tényleges kötésárral és időtúllépés utáni egyeztetéssel
+order_manager = OrderManager(client, account)
+
+# --- Közös pozíciókönyv: összeomlás utáni visszaállítás pillanatképből + journalból
+position_book.max_positions = max_positions
+position_book.trail_pct = config.get("trailing_stop_pct")
+position_book.load()
+print(f" Visszaállított pozíciók: {[p.symbol for p in position_book.positions()]}")
 
 # --- USDT ellenőrzés induláskor
 try:
-    usdt_balance = float(client.get_asset_balance(asset='USDT')['free'])
+    usdt_balance = account.balance('USDT')
     print(f" Elérhető USDT egyenleg: {usdt_balance}")
     if usdt_balance < min_usdt_balance:
         print(f" FIGYELEM: Az USDT egyenleg alacsony (< {min_usdt_balance} USDT). A bot nem biztos, hogy tud kereskedni.")
 except Exception as e:
     print(f" Nem sikerült lekérdezni az USDT egyenleget: {e}")
+mark("számla")
+
+# --- WebSocket piaci adatok (REST tartalékkal); SL/TP minden árfrissítésre
+market_stream = None
+if config.get("market_stream", False) and not replay:
+    market_stream = MarketStream(client, symbols, interval=config.get("base_interval") or "5m",
+                                 ws_url=config.get("ws_url", "wss://stream.testnet.binance.vision"),
+                                 kline_cache=kline_cache, account=account)
+    market_stream.add_listener(lambda symbol, price: on_price_update(symbol, price, client, account, exchange_info,
+                                                                                 order_manager))
+    market_stream.start()
+mark("stream")
 
 # --- Stratégiabetöltés + kereskedéskezelő
-strategy = StrategyFactory(strategy_name, client, symbols).get_strategy()
-trade_manager = MultiTradeManager(client, symbols, max_positions=max_positions)
+strategy = StrategyFactory(strategy_name, client, symbols, kline_cache=kline_cache,
+                           model_scope=config.get("ml_model_scope", "symbol"),
+                           timeframes=config.get("ml_timeframes"), auto_tune=not replay,
+                           # strategy_limit: szimbólumonként ennyi gyertya (archívummal több ezer is)
+                           limit=config.get("strategy_limit", 100)).get_strategy()
+trade_manager = MultiTradeManager(client, symbols, max_positions=max_positions,
+                                  market_stream=market_stream, exchange_info=exchange_info,
+                                  order_manager=order_manager)
+scheduler = SymbolScheduler(client, symbols,
+                            # Visszajátszáskor egy szál: a kötések sorrendje így determinisztikus
+                            max_workers=1 if replay else config.get("max_workers", 8),
+                            deadline_sec=config.get("symbol_deadline_sec", 45),
+                            kline_cache=kline_cache,
+                            account=account,
+                            exchange_info=exchange_info,
+                            order_manager=order_manager)
+mark("stratégia")
 
 # --- Fő ciklus
 log_file = "logs/bot_activity_log.txt"
-if not os.path.exists("logs"): os.makedirs("logs")
+log_writer.max_bytes = config.get("log_max_bytes", 10 * 1024 * 1024)
 
-with open(log_file, 'a') as log:
-  log.write(f"[START] Kereskedési bot elindítva – stratégia: {strategy_name.upper()}\n")
+# --- Mérőszámok: Prometheus végpont (metrics_port) és időszakos [METRIKA] sor a tevékenységnaplóba
+metrics.enabled = config.get("metrics", True)
+if metrics.enabled:
+    if not replay:
+        metrics.gauge("rest_used_weight", lambda: client.used_weight)
+        metrics.gauge("rest_tokens", lambda: client.tokens)
+        metrics.gauge("rest_waited_seconds", lambda: client.stats['waited_sec'])
+    metrics.gauge("log_queue_depth", lambda: log_writer._queue.qsize())
+    metrics.gauge("open_positions", position_book.count)
+    if config.get("metrics_port", 9108) and not replay:
+        metrics.start_server(config.get("metrics_port", 9108))
+    metrics.start_reporter(log_writer, log_file, config.get("metrics_summary_sec", 300))
+log_writer.write(log_file, f"[START] Kereskedési bot elindítva – stratégia: {strategy_name.upper()}")
+startup_report = ", ".join(f"{stage} {t * 1000:.0f} ms" for stage, t in startup_stages)
+log_writer.write(log_file, f"[START] Indítási idő: {(time.perf_counter() - startup_begin) * 1000:.0f} ms ({startup_report})")
+print(f"[START] Indítási idő: {(time.perf_counter() - startup_begin) * 1000:.0f} ms ({startup_report})")
+
+
+def backfill_archive():
+    # A kereskedő és a stratégiák alapidősíkja 5m; a letöltés a RestGateway súlykeretén belül marad
+    intervals = sorted({"5m", config.get("base_interval") or "5m", *(config.get("ml_timeframes") or [])})
+    try:
+        backfill(client, archive, symbols, intervals, candles=config.get("archive_candles", 5000),
+                 max_workers=config.get("archive_workers", 4),
+                 log=lambda line: log_writer.write(log_file, line))
+    except Exception as e:
+        log_writer.write(log_file, f"[ARCHÍVUM] Nem sikerült feltölteni a gyertya-archívumot: {e}")
+
+
+if archive is not None:
+    threading.Thread(target=backfill_archive, name="archive-backfill", daemon=True).start()
+
+if replay:
+    from backtest.Replay import Replay, save_summary
+    summary = Replay(client, replay_clock, scheduler, strategy, trade_manager,
+                     on_tick=lambda symbol, price: on_price_update(symbol, price, client, account, exchange_info,
+                                                                   order_manager),
+                     price_check_sec=price_check_interval, decision_sec=decision_interval,
+                     log=lambda line: log_writer.write(log_file, line)).run()
+    log_writer.write(log_file, f"[REPLAY] {summary}")
+    log_writer.write(log_file, f"[METRIKA] {metrics.summary()}")
+    save_summary(summary)
+    trade_manager.summary()
+    print(f"[REPLAY] {summary['ticks']} tick, {summary['cycles']} ciklus, {summary['decisions']} döntés, "
+          f"{summary['orders']} megbízás, tőke: {summary['equity']:.2f} USDT, {summary['wall_sec']:.1f} s "
+          f"({summary['ticks_per_sec']:.0f} tick/s) -> {os.getcwd()}")
+    scheduler.shutdown()
+    sys.exit(0)
 
 next_decision_time = datetime.now()
 
 while True:
     try:
-        with open(log_file, 'a') as log:
-            now = datetime.now()
-
-        for symbol in symbols:
-            trade_symbol(symbol, client)
+        now = datetime.now()
+        with metrics.timer("cycle"):
+            scheduler.run_cycle()
 
         if now >= next_decision_time:
-            signals = strategy.generate_signals()
-            log.write(f"[DÖNTÉS]", signals)
-            trade_manager.update_trades(signals)
+            with metrics.timer("generate_signals"):
+                signals = strategy.generate_signals()
+            log_writer.write(log_file, f"[DÖNTÉS] {signals}")
+            analytics.publish("decision", signals=signals)
+            with metrics.timer("update_trades"):
+                trade_manager.update_trades(signals)
             trade_manager.summary()
             next_decision_time = now + timedelta(seconds=decision_interval)
         else:
-            log.write(f"[VIZSGÁLAT] Árfolyamfigyelés folyamatban... ({now.strftime('%H:%M:%S')})")
+            log_writer.write(log_file, f"[VIZSGÁLAT] Árfolyamfigyelés folyamatban... ({now.strftime('%H:%M:%S')})")
 
-        log.write("\n")
         time.sleep(price_check_interval)
 
     except Exception as e:
-     with open(log_file, 'a') as log:
-      log.write(f"[HIBA] {e}\n")
-    time.sleep(60)
+        metrics.inc("errors_total", stage="main_loop")
+        log_writer.write(log_file, f"[HIBA] {e}")
+        time.sleep(60)
@@ -0,0 +1,101 @@
+# exchange_info.py
+
+import math
+import threading
+from decimal import Decimal
+from binance.client import Client
+
+
+def step_precision(step_str):
+    # "0.00100000" -> 3
+    exponent = Decimal(step_str).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+def floor_to_step(value, step, precision):
+    if step <= 0:
+        return value
+    # A kis epszilon a lebegőpontos osztás hibáját (pl. 0.3 / 0.1 = 2.999...) szűri
+    return round(math.floor(value / step + 1e-9) * step, precision)
+
+
+class SymbolFilters:
+    __slots__ = ('symbol', 'step_size', 'min_qty', 'max_qty', 'qty_precision',
+                 'tick_size', 'min_price', 'max_price', 'price_precision', 'min_notional')
+
+    def __init__(self, symbol_info):
+        self.symbol = symbol_info['symbol']
+        self.step_size = self.min_qty = self.tick_size = self.min_price = self.min_notional = 0.0
+        self.max_qty = self.max_price = math.inf
+        self.qty_precision = self.price_precision = 8
+        for f in symbol_info['filters']:
+            kind = f['filterType']
+            if kind == 'LOT_SIZE':
+                self.step_size = float(f['stepSize'])
+                self.min_qty = float(f['minQty'])
+                self.max_qty = float(f['maxQty'])
+                self.qty_precision = step_precision(f['stepSize'])
+            elif kind == 'PRICE_FILTER':
+                self.tick_size = float(f['tickSize'])
+                self.min_price = float(f['minPrice'])
+                self.max_price = float(f['maxPrice']) or math.inf
+                self.price_precision = step_precision(f['tickSize'])
+            elif kind in ('MIN_NOTIONAL', 'NOTIONAL'):
+                self.min_notional = float(f.get('minNotional', 0))
+
+    def round_quantity(self, quantity):
+        return min(floor_to_step(quantity, self.step_size, self.qty_precision), self.max_qty)
+
+    def is_tradable(self, quantity, price):
+        return quantity >= self.min_qty and quantity * price >= self.min_notional
+
+
+class ExchangeInfo:
+    """
+    Indításkor egyszer tölti le az exchangeInfo-t, és szimbólumonként indexeli a
+    LOT_SIZE, PRICE_FILTER és MIN_NOTIONAL szűrőket. Háttérszálon frissül,
+    így a kereskedési ciklusban nincs get_symbol_info hívás.
+    """
+
+    def __init__(self, client: Client, refresh_sec: float = 3600):
+        self.client = client
+        self.refresh_sec = refresh_sec
+        self._filters = {}  # kulcs: szimbólum, érték: SymbolFilters
+        self._stop = threading.Event()
+
+    def load(self):
+        info = self.client.get_exchange_info()
+        # Az új indexet egyben cseréljük, az olvasóknak nem kell zár
+        self._filters = {s['symbol']: SymbolFilters(s) for s in info['symbols']}
+        return self
+
+    def start(self):
+        threading.Thread(target=self._refresh_loop, name="exchange-info", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_sec):
+            try:
+                self.load()
+            except Exception as e:
+                print(f"[EXCHANGE-INFO] Frissítés sikertelen: {e}")
+
+    def get(self, symbol):
+        filters = self._filters.get(symbol)
+        if filters is None:
+            # Új szimbólum a következő teljes frissítésig
+            info = self.client.get_symbol_info(symbol)
+            if info is None:
+                raise ValueError(f"Ismeretlen szimbólum: {symbol}")
+            filters = self._filters[symbol] = SymbolFilters(info)
+        return filters
+
+    def round_quantity(self, symbol, quantity):
+        return self.get(symbol).round_quantity(quantity)
+
+    def is_tradable(self, symbol, quantity, price):
+        # LOT_SIZE minimum és MIN_NOTIONAL: az ez alatti megbízást a tőzsde elutasítaná
+        return self.get(symbol).is_tradable(quantity, price)
@@ -0,0 +1,128 @@
+# fake_rest_server.py
+# Helyi REST csonk a RestGateway teszteléséhez: ping/time/klines/ticker/userDataStream végpontok
+# X-MBX-USED-WEIGHT-1M fejléccel; a perces keret túllépésekor 429-et ad Retry-After-rel.
+# Tesztekben az inject() a következő kérésekre kényszerít 429/418 választ.
+#   python -m market.Fake_Rest_Server --port 8766 --weight-limit 1200
+# majd config.json: "api_url": "http://localhost:8766/api"
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from market.Kline_Cache import INTERVAL_MS
+
+WEIGHTS = {'/api/v3/ping': 1, '/api/v3/time': 1, '/api/v3/klines': 2, '/api/v3/ticker/price': 2,
+           '/api/v3/userDataStream': 2}
+
+
+class FakeRestServer:
+    def __init__(self, port: int = 8766, weight_limit: int = 1200, latency_sec: float = 0.0,
+                 retry_after: float = None):
+        self.weight_limit = weight_limit
+        self.latency_sec = latency_sec
+        self.retry_after = retry_after      # None: a perces ablak végéig
+        self.used = 0
+        self.window = int(time.time() // 60)
+        self.hits = {}          # kulcs: útvonal, érték: kérések száma
+        self.injected = []      # a következő kérések kényszerített státuszai (429/418)
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.port = self.httpd.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def inject(self, status, count=1):
+        with self.lock:
+            self.injected += [status] * count
+
+    def _charge(self, path):
+        with self.lock:
+            window = int(time.time() // 60)
+            if window != self.window:
+                self.window, self.used = window, 0
+            self.hits[path] = self.hits.get(path, 0) + 1
+            self.used += WEIGHTS.get(path, 1)
+            return self.used, self.injected.pop(0) if self.injected else None
+
+    def _body(self, method, path, query):
+        price = 100.0
+        if path == '/api/v3/time':
+            return {'serverTime': int(time.time() * 1000)}
+        if path == '/api/v3/userDataStream':
+            return {'listenKey': "fake-listen-key"} if method == 'POST' else {}
+        if path == '/api/v3/ticker/price':
+            return {'symbol': query.get('symbol', 'BTCUSDT'), 'price': f"{price:.8f}"}
+        if path == '/api/v3/klines':
+            step = INTERVAL_MS[query.get('interval', '5m')]
+            limit = int(query.get('limit', 500))
+            end = int(time.time() * 1000) // step * step
+            return [[t, "100", "101", "99", "100", "1", t + step - 1, "100", 1, "0.5", "50", "0"]
+                    for t in range(end - (limit - 1) * step, end + 1, step)]
+        return {}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                self._respond('POST')
+
+            def do_PUT(self):
+                self._respond('PUT')
+
+            def do_DELETE(self):
+                self._respond('DELETE')
+
+            def _respond(self, method):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    query.update({k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()})
+                used, status = server._charge(url.path)
+                if server.latency_sec:
+                    time.sleep(server.latency_sec)
+                if status is None and used > server.weight_limit:
+                    status = 429
+                if status in (429, 418):
+                    body = {'code': -1003, 'msg': "Too many requests" if status == 429 else "IP banned"}
+                    retry_after = str(server.retry_after if server.retry_after is not None
+                                      else 60 - int(time.time()) % 60)
+                else:
+                    status, body, retry_after = 200, server._body(method, url.path, query), None
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("X-MBX-USED-WEIGHT-1M", str(used))
+                if retry_after:
+                    self.send_header("Retry-After", retry_after)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Helyi Binance REST csonk")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--weight-limit", type=int, default=1200)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeRestServer(args.port, args.weight_limit, args.latency)
+    print(f"[FAKE REST] http://localhost:{server.port}/api (súlykeret: {args.weight_limit}/perc)")
+    server.httpd.serve_forever()
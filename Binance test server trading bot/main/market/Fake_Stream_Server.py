@@ -0,0 +1,96 @@
+# fake_stream_server.py
+# Helyi WebSocket szerver a MarketStream teszteléséhez: a logs/prediction_log_*.csv
+# árait játssza vissza Binance combined stream formátumban (kline + bookTicker).
+#   python -m market.Fake_Stream_Server --port 8765 --speed 60
+# majd config.json: "ws_url": "ws://localhost:8765"
+
+import argparse
+import asyncio
+import csv
+import glob
+import json
+import os
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs
+import websockets
+from market.Kline_Cache import INTERVAL_MS
+
+
+def load_ticks(log_dir="logs"):
+    ticks = []
+    for file in glob.glob(os.path.join(log_dir, "prediction_log_*.csv")):
+        symbol = os.path.basename(file).replace("prediction_log_", "").replace(".csv", "")
+        with open(file, newline="") as f:
+            for row in csv.reader(f):
+                try:
+                    ts = int(datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S").timestamp() * 1000)
+                    ticks.append((ts, symbol, float(row[1])))
+                except (ValueError, IndexError):
+                    continue   # fejléc vagy hibás sor
+    ticks.sort()
+    return ticks
+
+
+def build_messages(ticks, interval="5m"):
+    # Időrendben (ts, symbol, [üzenetek]) hármasokat ad; a gyertyákat a tickekből építi
+    step = INTERVAL_MS[interval]
+    candles = {}
+    for ts, symbol, price in ticks:
+        open_time = ts - ts % step
+        c = candles.get(symbol)
+        messages = []
+        if c is not None and c['t'] != open_time:
+            c['x'] = True
+            messages.append(_kline_message(symbol, interval, ts, c))
+            c = None
+        if c is None:
+            c = candles[symbol] = {'t': open_time, 'T': open_time + step - 1, 'o': price, 'h': price,
+                                   'l': price, 'c': price, 'n': 0, 'x': False}
+        c['h'] = max(c['h'], price)
+        c['l'] = min(c['l'], price)
+        c['c'] = price
+        c['n'] += 1
+        messages.append(_kline_message(symbol, interval, ts, c))
+        messages.append({'stream': f"{symbol.lower()}@bookTicker",
+                         'data': {'u': ts, 's': symbol, 'b': f"{price:.8f}", 'B': "1", 'a': f"{price:.8f}", 'A': "1"}})
+        yield ts, symbol, messages
+
+
+def _kline_message(symbol, interval, ts, c):
+    k = {'t': c['t'], 'T': c['T'], 's': symbol, 'i': interval,
+         'o': str(c['o']), 'c': str(c['c']), 'h': str(c['h']), 'l': str(c['l']),
+         'v': "0", 'n': c['n'], 'x': c['x'], 'q': "0", 'V': "0", 'Q': "0", 'B': "0"}
+    return {'stream': f"{symbol.lower()}@kline_{interval}", 'data': {'e': 'kline', 'E': ts, 's': symbol, 'k': k}}
+
+
+async def _handler(ws, ticks, speed):
+    query = parse_qs(urlparse(ws.request.path).query)
+    streams = query.get('streams', [""])[0].split("/")
+    symbols = {s.split("@")[0].upper() for s in streams if s}
+    interval = next((s.split("@kline_")[1] for s in streams if "@kline_" in s), "5m")
+    previous = None
+    for ts, symbol, messages in build_messages(ticks, interval):
+        if symbol not in symbols:
+            continue
+        if speed > 0 and previous is not None:
+            await asyncio.sleep((ts - previous) / 1000 / speed)
+        previous = ts
+        for message in messages:
+            await ws.send(json.dumps(message))
+
+
+async def serve(host="localhost", port=8765, speed=60.0, log_dir="logs"):
+    ticks = load_ticks(log_dir)
+    print(f"[FAKE-WS] {len(ticks)} tick betöltve, ws://{host}:{port}")
+    async with websockets.serve(lambda ws: _handler(ws, ticks, speed), host, port):
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Helyi Binance stream szimulátor")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", type=float, default=60.0, help="gyorsítás (0 = késleltetés nélkül)")
+    parser.add_argument("--logs", default="logs")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.speed, args.logs))
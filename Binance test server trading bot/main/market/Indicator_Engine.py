@@ -0,0 +1,313 @@
+# indicator_engine.py
+
+import bisect
+import math
+from collections import deque
+
+FEATURES = ['close', 'return', 'ma5', 'ma10', 'volatility', 'rsi',
+            'macd', 'bollinger_middle', 'bollinger_upper', 'bollinger_lower',
+            'stochastic_k', 'ema20', 'momentum']
+
+NAN = float('nan')
+
+# A MACD (12, 26) és az EMA20 ewm(span, adjust=False) simítási tényezői
+EWM_SPANS = (12, 26, 20)
+EWM_ALPHAS = tuple(2.0 / (span + 1) for span in EWM_SPANS)
+
+# Az ablak hányadik sorától érvényes egy gördülő jellemző a pandas számításban (az RSI a rsi_window-ból)
+WARMUP = {'return': 1, 'ma5': 4, 'ma10': 9, 'volatility': 4, 'bollinger_middle': 19, 'bollinger_std': 19,
+          'bollinger_upper': 19, 'bollinger_lower': 19, 'stochastic_k': 13, 'momentum': 10}
+
+
+def compute_rsi(series, window=14):
+    # Vektorizált referencia (egyszerű mozgóátlagos RSI), a streaming motor ezzel egyezik
+    delta = series.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def _rsi(g_mean, l_mean, g_nonzero, l_nonzero):
+    # RSI: pandas szemantika (0/0 -> NaN, x/0 -> 100); a nullaság a nem nulla elemek számából, kerekítés nélkül
+    if g_mean != g_mean or l_mean != l_mean:
+        return NAN
+    if not l_nonzero:
+        return 100.0 if g_nonzero else NAN
+    return 100 - 100 / (1 + max(g_mean, 0.0) / l_mean)
+
+
+class RollingStats:
+    # Futó összeg és négyzetösszeg fix ablakon; eltolt értékekkel a pontosság miatt
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.shift = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nonzero = 0
+        self.updates = 0
+
+    def _added(self, x):
+        # (összeg, négyzetösszeg, darab, nem nulla darab) x hozzáadása után
+        d = x - self.shift if self.shift is not None else 0.0
+        total, total_sq, count, nonzero = self.total + d, self.total_sq + d * d, len(self.values) + 1, self.nonzero + (x != 0)
+        if count > self.window:
+            old = self.values[0]
+            od = old - self.shift
+            total, total_sq, count, nonzero = total - od, total_sq - od * od, count - 1, nonzero - (old != 0)
+        return total, total_sq, count, nonzero
+
+    def push(self, x):
+        if self.shift is None:
+            self.shift = x
+        self.total, self.total_sq, _, self.nonzero = self._added(x)
+        self.values.append(x)
+        if len(self.values) > self.window:
+            self.values.popleft()
+        self.updates += 1
+        if self.updates % (self.window * 8) == 0:
+            # Kerekítési hiba kiszűrése időnként (amortizáltan O(1))
+            self.total = sum(v - self.shift for v in self.values)
+            self.total_sq = sum((v - self.shift) ** 2 for v in self.values)
+
+    def mean(self, x=None):
+        total, _, count, _ = self._added(x) if x is not None else (self.total, self.total_sq, len(self.values), self.nonzero)
+        if count < self.window:
+            return NAN
+        return total / count + self.shift
+
+    def std(self, x=None):
+        total, total_sq, count, _ = self._added(x) if x is not None else (self.total, self.total_sq, len(self.values), self.nonzero)
+        if count < self.window:
+            return NAN
+        var = (total_sq - total * total / count) / (count - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def has_nonzero(self, x=None):
+        return self.nonzero_count(x) > 0
+
+    def nonzero_count(self, x=None):
+        return self._added(x)[3] if x is not None else self.nonzero
+
+
+class MonotonicWindow:
+    # Gördülő minimum/maximum monoton sorral
+    def __init__(self, window, mode='min'):
+        self.window = window
+        self.better = (lambda a, b: a <= b) if mode == 'min' else (lambda a, b: a >= b)
+        self.items = deque()   # (index, érték)
+        self.index = -1
+
+    def push(self, x):
+        self.index += 1
+        while self.items and self.better(x, self.items[-1][1]):
+            self.items.pop()
+        self.items.append((self.index, x))
+        if self.items[0][0] <= self.index - self.window:
+            self.items.popleft()
+
+    def value(self, x=None):
+        if x is None:
+            if self.index + 1 < self.window:
+                return NAN
+            return self.items[0][1]
+        if self.index + 2 < self.window:
+            return NAN
+        # A kieső legrégebbi elemet kihagyjuk, az új elemet hozzávesszük
+        oldest = self.index + 1 - self.window
+        best = x
+        for i, v in self.items:
+            if i > oldest:
+                best = v if self.better(v, best) else best
+                break
+        return best
+
+
+class IndicatorEngine:
+    """
+    Streaming indikátor motor egy (symbol, interval) párra. Minden lezárt gyertya
+    O(1) időben frissíti az MA5/MA10, volatilitás, RSI, MACD, Bollinger, %K, EMA20
+    és momentum értékeket; a még nyitott gyertyát a peek() állapotváltozás nélkül számolja.
+    A sync_view() és a frame() eredménye a pandas alapú prepare_features eredményével
+    egyezik ugyanarra az ablakra: az EWM-ek (MACD, EMA20) a 0-ról indított, normálatlan
+    S_t = a*x_t + (1-a)*S_(t-1) összegekből az ablak első gyertyájára újraindítva
+    számolódnak, E_t = S_t - (1-a)^(t-s) * (S_s - x_s), ami O(1) soronként; az ablak
+    elején a gördülő jellemzők (WARMUP) NaN-ok, mint a pandas-ban. Az update() és a
+    peek() sorai a motor teljes előzményéből számolnak.
+    """
+
+    def __init__(self, history: int = 500, rsi_window: int = 14):
+        self.history = deque(maxlen=history)   # lezárt gyertyák jellemző sorai
+        self.rsi_window = rsi_window
+        self.warmup = dict(WARMUP, rsi=rsi_window - 1)
+        self.last_open = None
+        self.prev_close = None
+        self.closes = deque(maxlen=11)
+        self.ma5 = RollingStats(5)
+        self.ma10 = RollingStats(10)
+        self.boll = RollingStats(20)
+        self.gains = RollingStats(rsi_window)
+        self.losses = RollingStats(rsi_window)
+        self.low14 = MonotonicWindow(14, 'min')
+        self.high14 = MonotonicWindow(14, 'max')
+        self.ema12 = None
+        self.ema26 = None
+        self.ema20 = None
+        self._count = 0                                 # a lezárt gyertyák sorszáma
+        self._ewm_sums = (0.0,) * len(EWM_SPANS)
+
+    @staticmethod
+    def _ema(prev, x, span):
+        if prev is None:
+            return x
+        alpha = 2.0 / (span + 1)
+        return alpha * x + (1 - alpha) * prev
+
+    def _row(self, open_time, high, low, close, commit):
+        if self.prev_close is None:
+            ret = NAN
+            delta = 0.0     # pandas: where(delta > 0, 0) a NaN-t is 0-ra cseréli
+        else:
+            delta = close - self.prev_close
+            ret = delta / self.prev_close
+
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        x = None if commit else close
+        sums = tuple(a * close + (1 - a) * s for a, s in zip(EWM_ALPHAS, self._ewm_sums))
+
+        if commit:
+            self.gains.push(gain)
+            self.losses.push(loss)
+            self.ma5.push(close)
+            self.ma10.push(close)
+            self.boll.push(close)
+            self.low14.push(low)
+            self.high14.push(high)
+            self.ema12 = self._ema(self.ema12, close, 12)
+            self.ema26 = self._ema(self.ema26, close, 26)
+            self.ema20 = self._ema(self.ema20, close, 20)
+            self.closes.append(close)
+            ema12, ema26, ema20 = self.ema12, self.ema26, self.ema20
+            g_mean, l_mean = self.gains.mean(), self.losses.mean()
+            l_nonzero, g_nonzero = self.losses.nonzero_count(), self.gains.nonzero_count()
+            low14, high14 = self.low14.value(), self.high14.value()
+            back10 = self.closes[0] if len(self.closes) == 11 else NAN
+        else:
+            ema12 = self._ema(self.ema12, close, 12)
+            ema26 = self._ema(self.ema26, close, 26)
+            ema20 = self._ema(self.ema20, close, 20)
+            g_mean, l_mean = self.gains.mean(gain), self.losses.mean(loss)
+            l_nonzero, g_nonzero = self.losses.nonzero_count(loss), self.gains.nonzero_count(gain)
+            low14, high14 = self.low14.value(low), self.high14.value(high)
+            back10 = self.closes[-10] if len(self.closes) >= 10 else NAN
+
+        rsi = _rsi(g_mean, l_mean, g_nonzero, l_nonzero)
+
+        mid = self.boll.mean(x)
+        bstd = self.boll.std(x)
+        if high14 != high14 or low14 != low14 or high14 == low14:
+            stoch = NAN
+        else:
+            stoch = 100 * (close - low14) / (high14 - low14)
+
+        row = {
+            'timestamp': open_time, 'high': high, 'low': low, 'close': close, 'return': ret,
+            'ma5': self.ma5.mean(x), 'ma10': self.ma10.mean(x), 'volatility': self.ma5.std(x),
+            'rsi': rsi, 'macd': ema12 - ema26,
+            'bollinger_middle': mid, 'bollinger_std': bstd,
+            'bollinger_upper': mid + 2 * bstd, 'bollinger_lower': mid - 2 * bstd,
+            'stochastic_k': stoch, 'ema20': ema20, 'momentum': close - back10,
+            '_n': self._count, '_ewm': sums, '_rsi': (g_mean, l_mean, g_nonzero, l_nonzero, gain, loss),
+        }
+        if commit:
+            self._count += 1
+            self._ewm_sums = sums
+            self.prev_close = close
+            self.last_open = open_time
+            self.history.append(row)
+        return row
+
+    @staticmethod
+    def _public(row):
+        # A '_' kezdetű mezők (sorszám, EWM összegek) csak az ablakos újraindításhoz kellenek
+        return {name: value for name, value in row.items() if name[0] != '_'}
+
+    def update(self, open_time, high, low, close):
+        return self._public(self._row(open_time, float(high), float(low), float(close), commit=True))
+
+    def peek(self, open_time, high, low, close):
+        return self._public(self._row(open_time, float(high), float(low), float(close), commit=False))
+
+    def sync(self, klines):
+        # Csak az új lezárt gyertyákat tölti be; az utolsó (nyitott) gyertyát peek-eli
+        for k in klines[:-1]:
+            if self.last_open is None or k[0] > self.last_open:
+                self.update(k[0], k[2], k[3], k[4])
+        if not klines:
+            return None
+        last = klines[-1]
+        return self.peek(last[0], last[2], last[3], last[4])
+
+    def sync_view(self, view):
+        # sync() egy KlineView tömbjeire, a nyitott gyertya EWM-jei az ablak elejétől számolva
+        provisional = self._sync_view(view)
+        if provisional is None:
+            return None
+        return self._windowed([provisional], self._window_start(len(view), provisional))[0]
+
+    def _sync_view(self, view):
+        # Csak az új lezárt gyertyák sorai válnak Python értékké; a nyitott gyertya nyers sora a visszatérési érték
+        n = len(view)
+        if not n:
+            return None
+        opens = view.open_time.tolist()
+        start = 0 if self.last_open is None else bisect.bisect_right(opens, self.last_open, 0, n - 1)
+        highs, lows, closes = (a[start:].tolist() for a in (view.high, view.low, view.close))
+        for i in range(n - 1 - start):
+            self._row(opens[start + i], highs[i], lows[i], closes[i], commit=True)
+        return self._row(opens[-1], highs[-1], lows[-1], closes[-1], commit=False)
+
+    def _window_start(self, n, provisional):
+        # Az n gyertyás ablak első sora: n - 1 lezárt sor az előzményből, majd a nyitott gyertya
+        if n == 1 or not self.history:
+            return provisional
+        return self.history[-min(n - 1, len(self.history))]
+
+    def _windowed(self, rows, start):
+        # Az ablak első gyertyájától számolt sorok: MACD és EMA20 ewm(adjust=False) szerint, bemelegedés NaN-nal
+        out = []
+        for row in rows:
+            row = dict(row)
+            k = row.pop('_n') - start['_n']     # a sor helye az ablakban
+            e12, e26, e20 = (s - (1 - a) ** k * (s0 - start['close'])
+                             for s, s0, a in zip(row.pop('_ewm'), start['_ewm'], EWM_ALPHAS))
+            row['macd'], row['ema20'] = e12 - e26, e20
+            g_mean, l_mean, g_nonzero, l_nonzero, _, _ = row.pop('_rsi')
+            if k == self.rsi_window - 1:
+                # Az első RSI érték ablakában a pandas az ablak első sorának változását 0-nak veszi
+                _, _, _, _, gain, loss = start['_rsi']
+                row['rsi'] = _rsi(g_mean - gain / self.rsi_window, l_mean - loss / self.rsi_window,
+                                  g_nonzero - (gain != 0), l_nonzero - (loss != 0))
+            for name, first in self.warmup.items():
+                if k < first:
+                    row[name] = NAN
+            out.append(row)
+        return out
+
+    def frame(self, view, columns=FEATURES):
+        """
+        A prepare_features kimenetével azonos szerkezetű DataFrame a megadott
+        gyertyákra (KlineView): target oszloppal, a hiányos sorok nélkül.
+        """
+        import pandas as pd
+        provisional = self._sync_view(view)
+        if provisional is None:
+            return pd.DataFrame()
+        rows = list(self.history)[-(len(view) - 1):] if len(view) > 1 else []
+        rows.append(provisional)
+        df = pd.DataFrame(self._windowed(rows, rows[0]))
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df['target'] = (df['close'].shift(-1) - df['close']) / df['close']
+        return df.dropna(subset=list(columns) + ['target'])
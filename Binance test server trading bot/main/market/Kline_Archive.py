@@ -0,0 +1,267 @@
+# kline_archive.py
+# Lemezes gyertya-archívum és tömeges letöltő:
+#   python -m market.Kline_Archive --intervals 5m 1h --candles 20000
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from market.Kline_Buffer import KlineBuffer, PRICE_FIELDS, TIME_FIELDS
+from market.Kline_Cache import INTERVAL_MS, MAX_KLINES_PER_REQUEST
+
+try:
+    import fcntl
+except ImportError:     # Windows: msvcrt.locking
+    fcntl = None
+    import msvcrt
+
+# Egy lezárt gyertya a fájlban: 56 bájtos, fix hosszú rekord (little-endian)
+RECORD = np.dtype([(name, '<i8') for name in TIME_FIELDS] + [(name, '<f8') for name in PRICE_FIELDS])
+
+
+def to_records(klines):
+    records = np.empty(len(klines), dtype=RECORD)
+    if len(klines):
+        records['open_time'] = [k[0] for k in klines]
+        records['close_time'] = [k[6] for k in klines]
+        prices = np.array([k[1:6] for k in klines], dtype=np.float64)
+        for i, name in enumerate(PRICE_FIELDS):
+            records[name] = prices[:, i]
+    return records
+
+
+class _FileLock:
+    # Folyamatok közötti kizárólagos zár egy {path}.lock mellékfájlon (a bot és a Tuner is írhat)
+    def __init__(self, path):
+        self.path = path + ".lock"
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'a+b')
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:     # LK_LOCK kb. 10 s után feladja: tovább várunk
+                    continue
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if fcntl is None:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        self._file.close()     # flock: a lezárás elengedi a zárat
+        self._file = None
+
+
+class KlineArchive:
+    """
+    Lezárt gyertyák szimbólumonként és idősíkonként egy-egy fájlban
+    ({root}/{symbol}_{interval}.ohlcv), nyitási idő szerint rendezve, RECORD
+    rekordokként. Olvasáskor a fájl memóriába képezve (np.memmap) nyílik, és csak a
+    kért utolsó N rekord másolódik egy KlineBuffer-be, így több ezer gyertya is
+    ezredmásodpercek alatt betöltődik. Az élő ciklus új lezárt gyertyái a fájl végére
+    fűződnek; a hézagok pótlása (write) összefésül és a fájlt atomian cseréli. Az írások
+    folyamatok között is sorba állnak (_FileLock), így a csere nem veszít el egy másik
+    folyamat közben hozzáfűzött gyertyáit.
+    """
+
+    def __init__(self, root: str = "data/archive"):
+        self.root = root
+        self._last_open = {}    # kulcs: (symbol, interval), érték: az archívum utolsó nyitási ideje
+        self._locks = {}
+        self._guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, f"{symbol}_{interval}.ohlcv")
+
+    def _lock_file(self, symbol, interval):
+        return _FileLock(self.path(symbol, interval))
+
+    def _records(self, symbol, interval):
+        path = self.path(symbol, interval)
+        if not os.path.exists(path) or os.path.getsize(path) < RECORD.itemsize:
+            return np.empty(0, dtype=RECORD)
+        # Csonka (megszakadt írású) utolsó rekord nélkül
+        return np.memmap(path, dtype=RECORD, mode='r', shape=(os.path.getsize(path) // RECORD.itemsize,))
+
+    def count(self, symbol, interval):
+        path = self.path(symbol, interval)
+        return os.path.getsize(path) // RECORD.itemsize if os.path.exists(path) else 0
+
+    def _read_last_open(self, symbol, interval):
+        records = self._records(symbol, interval)
+        last = int(records['open_time'][-1]) if len(records) else None
+        del records
+        return last
+
+    def last_open(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self._last_open:
+            self._last_open[key] = self._read_last_open(symbol, interval)
+        return self._last_open[key]
+
+    # --- Olvasás
+
+    def load(self, symbol, interval, limit=None, capacity=None):
+        """Az utolsó limit lezárt gyertya egy KlineBuffer-ben (capacity alapértéke a limit)."""
+        with self._lock((symbol, interval)):
+            records = self._records(symbol, interval)
+            tail = records[-limit:] if limit else records
+            buffer = KlineBuffer(capacity or max(limit or len(tail), 1))
+            buffer.extend_arrays(np.stack([tail[name] for name in TIME_FIELDS]),
+                                 np.stack([tail[name] for name in PRICE_FIELDS]))
+            del records, tail   # Windows: a leképezés elengedése a későbbi fájlcsere előtt
+        return buffer
+
+    def gaps(self, symbol, interval, start_ms, end_ms):
+        """
+        A [start_ms, end_ms] nyitási idők közül hiányzók, (első, utolsó) nyitási idő
+        párokként: a fájl előtti és utáni rész, valamint a belső hézagok. A tőzsde által
+        sosem kiadott sávok (karbantartás) minden ellenőrzéskor újra hézagnak látszanak.
+        """
+        step = INTERVAL_MS[interval]
+        start_ms -= start_ms % step
+        with self._lock((symbol, interval)):
+            records = self._records(symbol, interval)
+            opens = np.array(records['open_time'])
+            del records
+        opens = opens[(opens >= start_ms) & (opens <= end_ms)]
+        if not len(opens):
+            return [(start_ms, end_ms)] if start_ms <= end_ms else []
+        ranges = []
+        if opens[0] > start_ms:
+            ranges.append((start_ms, int(opens[0]) - step))
+        for i in np.flatnonzero(np.diff(opens) > step):
+            ranges.append((int(opens[i]) + step, int(opens[i + 1]) - step))
+        if opens[-1] + step <= end_ms:
+            ranges.append((int(opens[-1]) + step, end_ms))
+        return ranges
+
+    # --- Írás
+
+    def append(self, symbol, interval, klines, now_ms=None):
+        """
+        Az élő ciklus gyertyái közül a lezártak, amelyek az archívum végénél újabbak;
+        a korábbiak (hézag) pótlása a backfill dolga. Az új rekordok száma a visszatérési érték.
+        """
+        now_ms = time.time() * 1000 if now_ms is None else now_ms
+        last = self.last_open(symbol, interval)
+        rows = [k for k in klines if k[6] < now_ms and (last is None or k[0] > last)]
+        if not rows:
+            return 0
+        path = self.path(symbol, interval)
+        with self._lock((symbol, interval)), self._lock_file(symbol, interval):
+            # A fájl végét újraolvassa: más folyamat (pl. a Tuner) is fűzhetett hozzá
+            last = self._read_last_open(symbol, interval)
+            rows = [k for k in rows if last is None or k[0] > last]
+            if rows:
+                # Megszakadt írás csonka rekordja levágva, különben minden későbbi rekord elcsúszna
+                size = os.path.getsize(path) if os.path.exists(path) else 0
+                if size % RECORD.itemsize:
+                    os.truncate(path, size - size % RECORD.itemsize)
+                with open(path, 'ab') as f:
+                    f.write(to_records(rows).tobytes())
+                self._last_open[(symbol, interval)] = rows[-1][0]
+        return len(rows)
+
+    def write(self, symbol, interval, klines, now_ms=None):
+        # Tetszőleges időpontú lezárt gyertyák beolvasztása: a vég utániak hozzáfűzve, a többi összefésülve
+        now_ms = time.time() * 1000 if now_ms is None else now_ms
+        klines = sorted((k for k in klines if k[6] < now_ms), key=lambda k: k[0])
+        last = self.last_open(symbol, interval)
+        if not klines or last is None or klines[0][0] > last:
+            return self.append(symbol, interval, klines, now_ms)
+        key = (symbol, interval)
+        path = self.path(symbol, interval)
+        with self._lock(key), self._lock_file(symbol, interval):
+            records = self._records(symbol, interval)
+            before = len(records)
+            merged = np.concatenate([to_records(klines), records])
+            del records
+            # Azonos nyitási időnél az új rekord marad; a np.unique egyben rendez is
+            _, index = np.unique(merged['open_time'], return_index=True)
+            merged = merged[index]
+            with open(path + ".tmp", 'wb') as f:
+                f.write(merged.tobytes())
+            os.replace(path + ".tmp", path)
+            self._last_open[key] = int(merged['open_time'][-1])
+        return len(merged) - before
+
+
+def _pages(start_ms, end_ms, step):
+    # Lekérésenként legfeljebb MAX_KLINES_PER_REQUEST gyertya
+    span = step * MAX_KLINES_PER_REQUEST
+    return [(t, min(t + span - step, end_ms)) for t in range(start_ms, end_ms + 1, span)]
+
+
+def backfill(client, archive, symbols, intervals, candles=5000, max_workers=4, now_ms=None, log=print):
+    """
+    Az archívum feltöltése szimbólumonként és idősíkonként az utolsó candles lezárt
+    gyertyáig. Csak a hiányzó szakaszok töltődnek le, legfeljebb 1000 gyertyás
+    get_klines lapokban, max_workers szálon párhuzamosan. A súlykeretet a
+    hívó kliense tartja: a main.py-ban ez a RestGateway, így a letöltés nem szorítja ki
+    a megbízásokat. A visszatérési érték: {(symbol, interval): új gyertyák száma}.
+    """
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    tasks = []
+    for symbol in symbols:
+        for interval in intervals:
+            step = INTERVAL_MS[interval]
+            end = now_ms - now_ms % step - step     # az utolsó lezárt gyertya nyitása
+            for first, last in archive.gaps(symbol, interval, end - (candles - 1) * step, end):
+                tasks += [(symbol, interval, a, b) for a, b in _pages(first, last, step)]
+
+    def fetch(task):
+        # Közvetlen get_klines: a get_historical_klines egy extra (a kapun kívüli) kezdőidő-lekérést
+        # végez, és egygyertyás lapra (start == end) üres listát ad. Az endTime a lap utolsó
+        # gyertyájának nyitásától a következő nyitásig bármi lehet; step - 1 mindkét értelmezéssel jó.
+        symbol, interval, start, end = task
+        return client.get_klines(symbol=symbol, interval=interval, startTime=start,
+                                 endTime=end + INTERVAL_MS[interval] - 1, limit=MAX_KLINES_PER_REQUEST)
+
+    downloaded = {}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backfill") as pool:
+        for (symbol, interval, _, _), future in zip(tasks, [pool.submit(fetch, t) for t in tasks]):
+            try:
+                downloaded.setdefault((symbol, interval), []).extend(future.result())
+            except Exception as e:
+                log(f"[ARCHÍVUM] {symbol} {interval} letöltési hiba: {e}")
+
+    added = {key: archive.write(*key, klines, now_ms) for key, klines in downloaded.items()}
+    log(f"[ARCHÍVUM] {len(tasks)} lap, {sum(added.values())} új gyertya, "
+        f"{time.perf_counter() - started:.1f} s")
+    return added
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from binance.client import Client
+    from market.Rest_Gateway import RestGateway
+
+    parser = argparse.ArgumentParser(description="Gyertya-archívum feltöltése")
+    parser.add_argument("--symbols", nargs="*")
+    parser.add_argument("--intervals", nargs="*", default=["5m"], choices=sorted(INTERVAL_MS))
+    parser.add_argument("--candles", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with open("config.json", "r") as f:
+        config = json.load(f)
+    client = Client(config.get("api_key", ""), config.get("api_secret", ""))
+    client.API_URL = config.get("api_url", 'https://testnet.binance.vision/api')
+    client = RestGateway(client, weight_limit=config.get("rest_weight_limit", 6000))
+    backfill(client, KlineArchive(config.get("archive_dir", "data/archive")), args.symbols or config["symbols"],
+             args.intervals, args.candles, args.workers)
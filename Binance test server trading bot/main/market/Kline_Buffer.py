@@ -0,0 +1,153 @@
+# kline_buffer.py
+
+import numpy as np
+
+# A nyers Binance gyertyából megtartott mezők (pozíció a payloadban)
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume')     # 1..5, float64
+TIME_FIELDS = ('open_time', 'close_time')                      # 0 és 6, int64
+
+
+class KlineView:
+    """
+    Egy KlineBuffer ablakának másolás nélküli nézete: minden mező egy folytonos
+    NumPy szelet. A nézet pillanatkép: a puffer későbbi írásai (a nyitott gyertya
+    felülírása is) nem módosítják, de nem is jelennek meg benne.
+    """
+    __slots__ = ('open_time', 'close_time', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, times, prices):
+        self.open_time, self.close_time = times
+        self.open, self.high, self.low, self.close, self.volume = prices
+
+    def __len__(self):
+        return len(self.open_time)
+
+    def klines(self):
+        # Binance formátumú sorok (a buffer által nem tárolt mezők nullák)
+        return [[t, o, h, l, c, v, ct, 0.0, 0, 0.0, 0.0, "0"] for t, ct, o, h, l, c, v in
+                zip(self.open_time.tolist(), self.close_time.tolist(), self.open.tolist(), self.high.tolist(),
+                    self.low.tolist(), self.close.tolist(), self.volume.tolist())]
+
+    def to_dataframe(self):
+        # Típusos oszlopok, string feldolgozás nélkül
+        import pandas as pd
+        return pd.DataFrame({'timestamp': self.open_time, 'open': self.open, 'high': self.high, 'low': self.low,
+                             'close': self.close, 'volume': self.volume, 'close_time': self.close_time})
+
+
+class KlineBuffer:
+    """
+    Fix kapacitású gyertya gyűrűpuffer típusos NumPy tömbökben (float64 OHLCV, int64
+    időbélyegek, oszloponként folytonosan). A nyers payload közvetlenül a tömbökbe
+    parszolódik, a window() pedig másolás nélküli nézetet ad a jellemzőszámításhoz.
+    A tömb a kapacitásnál negyeddel hosszabb: a végére érve az utolsó capacity sor
+    egy új tömb elejére kerül (amortizáltan O(1)). Ha egy írás (merge, pop utáni
+    append, clear) már kiadott nézet sorait írná felül, a megmaradó sorok szintén új
+    tömbbe másolódnak, így a nézetek sosem íródnak felül. Egy 500 gyertyás szimbólum ~35 KB, a nyers stringlistás
+    tárolás töredéke.
+    """
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self._times = np.empty((len(TIME_FIELDS), capacity + max(capacity // 4, 1)), dtype=np.int64)
+        self._prices = np.empty((len(PRICE_FIELDS), self._times.shape[1]), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+        self._exposed = 0       # a kiadott nézetek által látott sorok vége a jelenlegi tömbben
+
+    @classmethod
+    def from_klines(cls, klines, capacity=None):
+        buffer = cls(capacity or max(len(klines), 1))
+        buffer.extend(klines)
+        return buffer
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def maxlen(self):
+        return self.capacity
+
+    @property
+    def last_open(self):
+        return int(self._times[0, self._end - 1]) if self._end > self._start else None
+
+    # --- Írás
+
+    def _reserve(self, n):
+        if self._end + n <= self._times.shape[1] and self._end >= self._exposed:
+            return
+        # Új tömb: a régi nézetek a régi tömbre mutatnak és érvényesek maradnak
+        keep = min(len(self), self.capacity - n)
+        times, prices = np.empty_like(self._times), np.empty_like(self._prices)
+        times[:, :keep] = self._times[:, self._end - keep:self._end]
+        prices[:, :keep] = self._prices[:, self._end - keep:self._end]
+        self._times, self._prices = times, prices
+        self._start, self._end, self._exposed = 0, keep, 0
+
+    def extend(self, klines):
+        rows = klines[-self.capacity:]
+        if not rows:
+            return
+        self.extend_arrays(np.array([(k[0], k[6]) for k in rows], dtype=np.int64).T,
+                           np.array([k[1:6] for k in rows], dtype=np.float64).T)
+
+    def extend_arrays(self, times, prices):
+        # Már típusos oszlopok: times (2, n) int64, prices (5, n) float64 (pl. a lemezes archívumból)
+        times, prices = times[:, -self.capacity:], prices[:, -self.capacity:]
+        n = times.shape[1]
+        if not n:
+            return
+        self._reserve(n)
+        end = self._end + n
+        self._times[:, self._end:end] = times
+        self._prices[:, self._end:end] = prices
+        self._end = end
+        self._start = max(self._start, self._end - self.capacity)
+
+    def append(self, kline):
+        self.extend([kline])
+
+    def merge(self, klines):
+        # Az első új gyertya nyitásától kezdve felülír (a nyitott gyertya frissítése), utána hozzáfűz
+        if not klines:
+            return
+        self._end = self._start + int(np.searchsorted(self._times[0, self._start:self._end], klines[0][0]))
+        self.extend(klines)
+
+    def pop(self):
+        row = self.row(-1)
+        self._end -= 1
+        return row
+
+    def clear(self):
+        self._start = self._end = 0
+
+    # --- Olvasás
+
+    def _view(self, limit=None):
+        start = self._start if limit is None else max(self._start, self._end - limit)
+        return KlineView(self._times[:, start:self._end], self._prices[:, start:self._end])
+
+    def window(self, limit=None):
+        # A kiadott sorokat a későbbi visszaíró írások (merge, pop) már nem írhatják felül
+        self._exposed = max(self._exposed, self._end)
+        return self._view(limit)
+
+    def klines(self, limit=None):
+        # Listamásolat: a nézet nem kerül ki, a buffer tovább írhat helyben
+        return self._view(limit).klines()
+
+    def since(self, open_time):
+        # A megadott nyitási időnél nem korábbi gyertyák (Binance formátumban)
+        view = self._view()
+        return self._view(len(view) - int(np.searchsorted(view.open_time, open_time))).klines()
+
+    def row(self, i):
+        i = self._end + i if i < 0 else self._start + i
+        t, ct = self._times[:, i].tolist()
+        o, h, l, c, v = self._prices[:, i].tolist()
+        return [t, o, h, l, c, v, ct, 0.0, 0, 0.0, 0.0, "0"]
+
+    def last(self):
+        return self.row(-1)
@@ -0,0 +1,191 @@
+# kline_cache.py
+
+import threading
+import time
+from market.Indicator_Engine import IndicatorEngine, FEATURES
+from market.Kline_Buffer import KlineBuffer
+from market.Resampler import Resampler
+from Metrics import metrics
+
+KLINE_COLUMNS = [
+    'timestamp', 'open', 'high', 'low', 'close', 'volume',
+    'close_time', 'quote_asset_volume', 'num_trades',
+    'taker_buy_base_volume', 'taker_buy_quote_volume', 'ignore'
+]
+
+INTERVAL_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000
+}
+
+# A Binance /klines egy kérésre legfeljebb ennyi gyertyát ad
+MAX_KLINES_PER_REQUEST = 1000
+
+
+def klines_to_dataframe(klines):
+    import pandas as pd
+    return pd.DataFrame(klines, columns=KLINE_COLUMNS)
+
+
+class KlineCache:
+    """
+    Közös gyertya tár (symbol, interval) kulcsra. Egy gördülő ablakot tart,
+    és frissítéskor csak az utolsó lezárt gyertyánál újabbakat kéri le,
+    így a Symbol_Trader, az MLStrategy és a SignalGenerator egy lekérést oszt meg.
+    Ha base_interval meg van adva (pl. "1m"), a többszörös idősíkok (5m, 15m, 1h)
+    egyszeri kezdő letöltés után az alapsorozatból, memóriában újramintázva frissülnek.
+    A gyertyák kulcsonként egy típusos KlineBuffer-ben élnek; a get_arrays() másolás
+    nélküli NumPy nézetet ad, a get_klines() Binance formátumú listát.
+    KlineArchive megadásakor a kezdő előzmény a lemezről töltődik (a hálózatról csak az
+    azóta nyílt gyertyák), és a frissítések lezárt gyertyái az archívumba is íródnak.
+    """
+
+    def __init__(self, client, window: int = 500, min_refresh_sec: float = 5, base_interval: str = None,
+                 archive=None):
+        self.client = client
+        self.window = window
+        self.min_refresh_sec = min_refresh_sec
+        self.base_interval = base_interval
+        self.archive = archive
+        self._resamplers = {}   # kulcs: (symbol, interval), érték: Resampler
+        self._seed_limits = {}  # kulcs: (symbol, interval), érték: a kezdő letöltés mérete
+        self._store = {}        # kulcs: (symbol, interval), érték: KlineBuffer
+        self._engines = {}      # kulcs: (symbol, interval), érték: IndicatorEngine
+        self._last_fetch = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get_klines(self, symbol, interval, limit=100):
+        key = (symbol, interval)
+        with self._lock(key):
+            return self._buffer(key, limit).klines(limit)
+
+    def get_arrays(self, symbol, interval, limit=100):
+        # KlineView: open_time/close_time (int64) és OHLCV (float64) nézetek, másolás nélkül
+        key = (symbol, interval)
+        with self._lock(key):
+            return self._buffer(key, limit).window(limit)
+
+    def get_dataframe(self, symbol, interval, limit=100):
+        return self.get_arrays(symbol, interval, limit).to_dataframe()
+
+    def get_features(self, symbol, interval, limit=100, columns=FEATURES):
+        # prepare_features-szel egyező DataFrame, inkrementálisan számolt indikátorokkal
+        key = (symbol, interval)
+        with self._lock(key):
+            view = self._buffer(key, limit).window(limit)
+            with metrics.timer("features", symbol):
+                return self._engine(key).frame(view, columns)
+
+    def get_indicators(self, symbol, interval, limit=100):
+        # A legutolsó (nyitott) gyertya indikátorai
+        key = (symbol, interval)
+        with self._lock(key):
+            view = self._buffer(key, limit).window(limit)
+            return self._engine(key).sync_view(view)
+
+    def _engine(self, key):
+        engine = self._engines.get(key)
+        if engine is None:
+            store = self._resamplers[key].klines if key in self._resamplers else self._store[key]
+            engine = self._engines[key] = IndicatorEngine(history=store.capacity)
+        return engine
+
+    def is_derived(self, interval):
+        if not self.base_interval or interval == self.base_interval:
+            return False
+        base, step = INTERVAL_MS.get(self.base_interval), INTERVAL_MS.get(interval)
+        return bool(base and step and step > base and step % base == 0)
+
+    def _buffer(self, key, limit):
+        # A hívó tartja a key zárját
+        symbol, interval = key
+        if not self.is_derived(interval):
+            self._refresh(key, limit)
+            return self._store[key]
+
+        step = INTERVAL_MS[interval]
+        base_key = (symbol, self.base_interval)
+        with self._lock(base_key):
+            # Az alapsornak legalább egy célgyertyányit le kell fednie a kezdő újraépítéshez
+            self._refresh(base_key, min(1000, max(100, step // INTERVAL_MS[self.base_interval] + 1)))
+            base = self._store[base_key]
+            resampler = self._resamplers.get(key)
+            stale = resampler is not None and resampler.klines and \
+                base.last_open - resampler.klines.last_open > step * limit
+            if resampler is None or limit > self._seed_limits[key] or stale:
+                # Egyszeri letöltés a célidősíkon, utána csak az alapsorból frissül
+                resampler = self._resamplers[key] = Resampler(interval, step, max(self.window, limit))
+                self._seed_limits[key] = limit
+                resampler.seed(self._download(key, limit).klines(), base.klines())
+                self._engines.pop(key, None)
+            else:
+                newer = base.since(resampler.last_base_open) if resampler.last_base_open is not None else base.klines()
+                for k in newer:
+                    resampler.update(k)
+        return resampler.klines
+
+    def _download(self, key, limit):
+        # Kezdő előzmény: az archívum lezárt gyertyái és az azóta nyíltak, vagy egyetlen REST lekérés
+        symbol, interval = key
+        capacity = max(self.window, limit)
+        step = INTERVAL_MS.get(interval)
+        if self.archive is not None and step:
+            store = self.archive.load(symbol, interval, capacity)
+            fresh = store and time.time() * 1000 - store.last_open < step * MAX_KLINES_PER_REQUEST
+            if fresh and len(store) >= min(limit, MAX_KLINES_PER_REQUEST):
+                with metrics.timer("kline_fetch", symbol):
+                    klines = self.client.get_klines(symbol=symbol, interval=interval, startTime=store.last_open,
+                                                    limit=MAX_KLINES_PER_REQUEST)
+                store.merge(klines)
+                self._archive(key, klines)
+                return store
+        with metrics.timer("kline_fetch", symbol):
+            klines = self.client.get_klines(symbol=symbol, interval=interval, limit=min(limit, MAX_KLINES_PER_REQUEST))
+        self._archive(key, klines)
+        return KlineBuffer.from_klines(klines, capacity)
+
+    def _archive(self, key, klines):
+        if self.archive is not None:
+            self.archive.append(*key, klines)
+
+    def _refresh(self, key, limit):
+        symbol, interval = key
+        store = self._store.get(key)
+        now = time.time()
+        # A REST egy kérésre legfeljebb 1000 gyertyát ad; a többit csak az archívum pótolhatja
+        need = min(limit, MAX_KLINES_PER_REQUEST)
+
+        if store is not None and len(store) >= need and now - self._last_fetch.get(key, 0) < self.min_refresh_sec:
+            return
+
+        # Teljes letöltés, ha nincs elég adat vagy túl nagy a lyuk
+        step = INTERVAL_MS.get(interval)
+        stale = store and step and (now * 1000 - store.last_open) > step * limit
+        if store is None or len(store) < need or stale:
+            store = self._store[key] = self._download(key, limit)
+            self._engines.pop(key, None)
+        else:
+            # Az utolsó (még nyitott) gyertyától kérünk: ez felülírja azt és hozza az újakat
+            with metrics.timer("kline_fetch", symbol):
+                klines = self.client.get_klines(symbol=symbol, interval=interval, startTime=store.last_open, limit=need)
+            store.merge(klines)
+            self._archive(key, klines)
+
+        self._last_fetch[key] = now
+
+    def apply_stream_kline(self, symbol, interval, kline):
+        # WebSocket gyertya beolvasztása; ha a tár friss, a REST frissítés elmarad
+        key = (symbol, interval)
+        with self._lock(key):
+            store = self._store.get(key)
+            if not store or kline[0] < store.last_open or kline[0] - store.last_open > INTERVAL_MS.get(interval, kline[0]):
+                return
+            store.merge([kline])
+            self._archive(key, [kline])
+            self._last_fetch[key] = time.time()
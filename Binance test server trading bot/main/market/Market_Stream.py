@@ -0,0 +1,181 @@
+# market_stream.py
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import websockets
+
+
+def stream_kline_to_rest(k):
+    # WebSocket kline -> a get_klines által visszaadott lista formátum
+    return [k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'],
+            k['q'], k['n'], k['V'], k['Q'], k.get('B', '0')]
+
+
+class MarketStream:
+    """
+    Kline és bookTicker streamekre iratkozik fel az összes szimbólumra, és a
+    legfrissebb árat / gyertyát memóriában tartja. Kapcsolat megszakadásakor
+    REST lekérdezésre vált, és visszalépéssel újracsatlakozik.
+    Minden árfrissítésnél meghívja a regisztrált listenereket (symbol, price), de nem
+    a stream szálán: a hívások listener_workers szálon futnak, szimbólumonként
+    egyszerre egy, és a futás közben érkezett árak közül csak a legfrissebb kerül
+    sorra. Így egy lassú (pl. REST megbízást küldő) listener nem tartja fel az
+    üzenetfeldolgozást, és nem váltja ki a stale_sec szerinti újracsatlakozást.
+    """
+
+    def __init__(self, client, symbols: list, interval: str = "5m", ws_url: str = "wss://stream.testnet.binance.vision",
+                 kline_cache=None, account=None, poll_sec: float = 5, stale_sec: float = 30, listener_workers: int = 4):
+        self.client = client
+        self.symbols = symbols
+        self.interval = interval
+        self.ws_url = ws_url.rstrip("/")
+        self.kline_cache = kline_cache
+        self.account = account
+        self.listen_key = None
+        self.poll_sec = poll_sec
+        self.stale_sec = stale_sec
+        self.connected = False
+        self._prices = {}       # kulcs: szimbólum, érték: (ár, időbélyeg)
+        self._books = {}        # kulcs: szimbólum, érték: (bid, ask)
+        self._candles = {}      # kulcs: szimbólum, érték: utolsó gyertya (REST formátum)
+        self._listeners = []
+        self._pending = {}      # kulcs: szimbólum, érték: a listenerekre váró legfrissebb ár
+        self._pending_lock = threading.Lock()
+        self._workers = ThreadPoolExecutor(max_workers=listener_workers, thread_name_prefix="listener")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def url(self):
+        streams = []
+        for symbol in self.symbols:
+            s = symbol.lower()
+            streams += [f"{s}@kline_{self.interval}", f"{s}@bookTicker"]
+        if self.listen_key:
+            streams.append(self.listen_key)   # user-data stream a számlaállapothoz
+        return f"{self.ws_url}/stream?streams={'/'.join(streams)}"
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="market-stream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._workers.shutdown(wait=False, cancel_futures=True)
+
+    # --- Lekérdezések
+    def price(self, symbol):
+        entry = self._prices.get(symbol)
+        if entry is not None and time.time() - entry[1] < self.stale_sec:
+            return entry[0]
+        price = float(self.client.get_symbol_ticker(symbol=symbol)['price'])
+        self._set_price(symbol, price, notify=False)
+        return price
+
+    def book(self, symbol):
+        return self._books.get(symbol)
+
+    def candle(self, symbol):
+        return self._candles.get(symbol)
+
+    # --- Belső
+    def _set_price(self, symbol, price, notify=True):
+        self._prices[symbol] = (price, time.time())
+        if not notify or not self._listeners:
+            return
+        with self._pending_lock:
+            busy = symbol in self._pending
+            self._pending[symbol] = price
+        if not busy:
+            try:
+                self._workers.submit(self._notify, symbol)
+            except RuntimeError:    # stop() után
+                with self._pending_lock:
+                    self._pending.pop(symbol, None)
+
+    def _notify(self, symbol):
+        # Addig fut, amíg a futás közben érkezett legfrissebb ár is feldolgozásra nem került
+        while True:
+            with self._pending_lock:
+                price = self._pending[symbol]
+            for callback in self._listeners:
+                try:
+                    callback(symbol, price)
+                except Exception as e:
+                    print(f"[{symbol}] Listener hiba: {e}")
+            with self._pending_lock:
+                if self._pending[symbol] == price:
+                    del self._pending[symbol]
+                    return
+
+    def handle_message(self, raw):
+        msg = json.loads(raw)
+        data = msg.get('data', msg)
+        if data.get('e') == 'kline':
+            k = data['k']
+            symbol = data['s']
+            kline = stream_kline_to_rest(k)
+            self._candles[symbol] = kline
+            if self.kline_cache is not None:
+                self.kline_cache.apply_stream_kline(symbol, k['i'], kline)
+            self._set_price(symbol, float(k['c']))
+        elif data.get('e') == 'outboundAccountPosition':
+            if self.account is not None:
+                self.account.apply_account_event(data)
+        elif 'b' in data and 'a' in data:
+            symbol = data['s']
+            bid, ask = float(data['b']), float(data['a'])
+            self._books[symbol] = (bid, ask)
+            self._set_price(symbol, (bid + ask) / 2)
+
+    def _poll_rest(self):
+        for symbol in self.symbols:
+            try:
+                self._set_price(symbol, float(self.client.get_symbol_ticker(symbol=symbol)['price']))
+            except Exception as e:
+                print(f"[{symbol}] REST ár lekérés sikertelen: {e}")
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                asyncio.run(self._listen())
+                backoff = 1
+            except Exception as e:
+                print(f"[STREAM] Kapcsolat megszakadt: {e}")
+            self.connected = False
+            if self._stop.is_set():
+                break
+            # REST tartalék a visszalépés idejére
+            deadline = time.time() + backoff
+            while time.time() < deadline and not self._stop.is_set():
+                self._poll_rest()
+                self._stop.wait(min(self.poll_sec, max(0, deadline - time.time())))
+            backoff = min(backoff * 2, 60)
+
+    async def _listen(self):
+        if self.account is not None:
+            try:
+                self.listen_key = self.client.stream_get_listen_key()
+            except Exception as e:
+                print(f"[STREAM] listenKey nem kérhető, számla REST-ből frissül: {e}")
+                self.listen_key = None
+        keepalive_at = time.time() + 30 * 60
+        async with websockets.connect(self.url(), ping_interval=20) as ws:
+            self.connected = True
+            print(f"[STREAM] Csatlakozva: {len(self.symbols)} szimbólum")
+            while not self._stop.is_set():
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), timeout=self.stale_sec)
+                except asyncio.TimeoutError:
+                    raise ConnectionError("nincs adat a streamen")
+                self.handle_message(raw)
+                if self.listen_key and time.time() > keepalive_at:
+                    self.client.stream_keepalive(self.listen_key)
+                    keepalive_at = time.time() + 30 * 60
@@ -0,0 +1,66 @@
+# resampler.py
+
+from market.Kline_Buffer import KlineBuffer
+
+
+def merge_kline(agg, k, open_time, step):
+    # Két gyertya összevonása Binance nyers formátumban (agg lehet None)
+    if agg is None:
+        return [open_time, float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]),
+                open_time + step - 1, float(k[7]), int(k[8]), float(k[9]), float(k[10]), "0"]
+    return [open_time, agg[1], max(agg[2], float(k[2])), min(agg[3], float(k[3])), float(k[4]),
+            agg[5] + float(k[5]), open_time + step - 1, agg[7] + float(k[7]), agg[8] + int(k[8]),
+            agg[9] + float(k[9]), agg[10] + float(k[10]), "0"]
+
+
+class Resampler:
+    """
+    Egy magasabb idősík gyertyái egy alap (pl. 1m) sorozatból, inkrementálisan.
+    Az aktuális sávban a lezárt alapgyertyák összesítése és a legutóbbi (még nyitott)
+    alapgyertya külön marad, így egy frissítés O(1): a nyitott gyertya ismételt
+    frissítése nem számol kétszer.
+    """
+
+    def __init__(self, interval, step_ms: int, window: int = 500):
+        self.interval = interval
+        self.step = step_ms
+        self.klines = KlineBuffer(window)
+        self.last_base_open = None
+        self._closed = None     # az aktuális sáv lezárt alapgyertyáinak összesítése
+        self._base = None       # az aktuális sáv legutóbbi alapgyertyája
+
+    def seed(self, klines, base_klines=()):
+        """
+        Kezdő előzmény (egyszeri REST lekérés a célidősíkon). Az utolsó, még nyitott
+        gyertyát az alapsorozatból építi újra, ha az lefedi a sávját.
+        """
+        self.klines.clear()
+        self.klines.extend(klines)
+        self._closed = self._base = self.last_base_open = None
+        if self.klines and base_klines and base_klines[0][0] <= self.klines.last_open:
+            bucket = self.klines.pop()[0]
+            for k in base_klines:
+                if k[0] >= bucket:
+                    self.update(k)
+        elif base_klines:
+            # Nem lefedett sáv: csak az ezután nyíló alapgyertyák folytatják
+            self.last_base_open = base_klines[-1][0]
+
+    def update(self, k):
+        open_time = k[0]
+        if self.last_base_open is not None and open_time < self.last_base_open:
+            return
+        bucket = open_time - open_time % self.step
+        if not self.klines or bucket > self.klines.last_open:
+            self._closed = None
+            self._base = k
+            self.klines.append(merge_kline(None, k, bucket, self.step))
+        else:
+            if self._base is None:
+                # Az alapsor által nem lefedett, REST-ből kapott nyitott gyertya folytatása
+                self._closed = merge_kline(None, self.klines.last(), bucket, self.step)
+            elif open_time != self.last_base_open:
+                self._closed = merge_kline(self._closed, self._base, bucket, self.step)
+            self._base = k
+            self.klines.merge([merge_kline(self._closed, k, bucket, self.step)])
+        self.last_base_open = open_time
@@ -0,0 +1,191 @@
+# rest_gateway.py
+
+import threading
+import time
+from concurrent.futures import Future
+from binance.exceptions import BinanceAPIException
+from Metrics import metrics
+
+# Becsült kérés-súlyok (Binance spot REST); a pontos értéket a válasz X-MBX-USED-WEIGHT-1M fejléce adja
+WEIGHTS = {
+    'get_klines': 2, 'get_historical_klines': 2, 'get_symbol_ticker': 2, 'get_orderbook_ticker': 2,
+    'get_orderbook_tickers': 4, 'get_ticker': 2, 'get_exchange_info': 20, 'get_symbol_info': 20,
+    'get_account': 20, 'get_asset_balance': 20, 'get_order': 4, 'get_open_orders': 6,
+    'get_all_orders': 20, 'get_my_trades': 20, 'ping': 1, 'get_server_time': 1, 'get_all_tickers': 4,
+    'get_system_status': 1, 'stream_get_listen_key': 2, 'stream_keepalive': 2, 'stream_close': 2,
+    'create_test_order': 1, 'cancel_order': 1,
+}
+DEFAULT_WEIGHT = 2      # táblában nem szereplő kérés (megbízásnál 1)
+
+# Megbízás-műveletek: elsőbbséget élveznek és sosem vonódnak össze
+ORDER_PREFIXES = ('order_', 'create_order', 'cancel_order', 'create_test_order')
+
+# Csak az olvasó kérések vonódnak össze; az írók (pl. stream_keepalive) mindig külön futnak
+READ_PREFIXES = ('get_', 'ping')
+
+# A Client nem REST kérést végző nyilvános metódusai: változatlanul továbbadva. A ws_* a websocket
+# API (külön keret), az *_iter / *_generator lapozók pedig a belső Client-en hívnak; ezek súlyát
+# a válaszfejléc szerinti igazítás követi.
+LOCAL_METHODS = {'close_connection', 'convert_to_dict', 'encode_uri_component', 'uuid22'}
+LOCAL_PREFIXES = ('ws_',)
+LOCAL_SUFFIXES = ('_iter', '_generator')
+
+
+def is_order_call(name):
+    return name.startswith(ORDER_PREFIXES)
+
+
+def is_request(name):
+    return not (name.startswith('_') or name in LOCAL_METHODS or name.startswith(LOCAL_PREFIXES)
+                or name.endswith(LOCAL_SUFFIXES))
+
+
+class RestGateway:
+    """
+    A Client köré tett közös REST kapu. A perces súlykeretet token-bucket követi,
+    amit minden válasz X-MBX-USED-WEIGHT-1M fejléce a szerver szerinti értékre igazít.
+    A megbízások számára a keret reserve része fenntartva marad, és várakozó megbízás
+    előtt nem indul piaci adatlekérés. Azonos, épp futó olvasó kérések egyetlen hívásra
+    vonódnak össze. 429-re Retry-After szerint visszavesz és újrapróbál, 418 (IP tiltás)
+    esetén a tiltás lejártáig minden kérés vár.
+    Minden kérést végző metódus a kapun megy át (súly a WEIGHTS táblából, alapértéke
+    DEFAULT_WEIGHT); a többi attribútumot változatlanul a becsomagolt Client-től adja vissza.
+    """
+
+    def __init__(self, client, weight_limit: int = 6000, order_reserve: float = 0.1, max_retries: int = 3):
+        self._client = client
+        self.weight_limit = weight_limit
+        self.reserve = weight_limit * order_reserve
+        self.max_retries = max_retries
+        self.tokens = float(weight_limit)
+        self.used_weight = 0            # a szerver által utoljára jelentett perces súly
+        self.blocked_until = 0.0
+        self.stats = {'requests': 0, 'coalesced': 0, 'rate_limited': 0, 'banned': 0, 'waited_sec': 0.0}
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._orders_waiting = 0
+        self._inflight = {}             # kulcs: (név, paraméterek), érték: Future
+        client.session.hooks.setdefault('response', []).append(self._on_response)
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or not is_request(name):
+            return attr
+
+        def call(*args, **kwargs):
+            return self.request(name, *args, **kwargs)
+        return call
+
+    def __setattr__(self, name, value):
+        # A Client saját attribútumai (pl. API_URL) a becsomagolt példányon állítódnak
+        if not name.startswith('_') and name not in self.__dict__ and hasattr(self._client, name):
+            setattr(self._client, name, value)
+        else:
+            object.__setattr__(self, name, value)
+
+    # --- Súlykeret
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.weight_limit, self.tokens + (now - self._updated) * self.weight_limit / 60.0)
+        self._updated = now
+
+    def _on_response(self, response, *args, **kwargs):
+        used = response.headers.get('X-MBX-USED-WEIGHT-1M')
+        if used is not None:
+            with self._cond:
+                self.used_weight = int(used)
+                self._refill()
+                self.tokens = min(self.tokens, self.weight_limit - self.used_weight)
+        return response
+
+    def _acquire(self, weight, order):
+        start = time.monotonic()
+        with self._cond:
+            if order:
+                self._orders_waiting += 1
+            try:
+                while True:
+                    self._refill()
+                    now = time.monotonic()
+                    floor = 0 if order else self.reserve
+                    if now >= self.blocked_until and self.tokens - weight >= floor \
+                            and (order or self._orders_waiting == 0):
+                        self.tokens -= weight
+                        self.stats['requests'] += 1
+                        break
+                    wait = max(self.blocked_until - now, (weight + floor - self.tokens) * 60.0 / self.weight_limit)
+                    self._cond.wait(timeout=min(max(wait, 0.01), 1.0))
+            finally:
+                if order:
+                    self._orders_waiting -= 1
+                    self._cond.notify_all()
+                self.stats['waited_sec'] += time.monotonic() - start
+
+    def _backoff(self, e, attempt):
+        retry_after = e.response.headers.get('Retry-After') if e.response is not None else None
+        delay = float(retry_after) if retry_after else min(60.0, 2.0 ** attempt)
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            self.tokens = 0.0
+        return delay
+
+    # --- Kérések
+
+    def request(self, name, *args, **kwargs):
+        order = is_order_call(name)
+        if order or not name.startswith(READ_PREFIXES):
+            return self._execute(name, args, kwargs, order)
+
+        key = (name, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            # Nem hashelhető paraméter (pl. lista): összevonás nélkül fut
+            return self._execute(name, args, kwargs, order)
+        with self._cond:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats['coalesced'] += 1
+        if not leader:
+            return future.result()
+        try:
+            result = self._execute(name, args, kwargs, order)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._cond:
+                self._inflight.pop(key, None)
+
+    def _execute(self, name, args, kwargs, order):
+        method = getattr(self._client, name)
+        weight = WEIGHTS.get(name, 1 if order else DEFAULT_WEIGHT)
+        attempt = 0
+        while True:
+            self._acquire(weight, order)
+            metrics.inc("rest_requests_total", method=name)
+            metrics.inc("rest_weight_total", weight, method=name)
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                status = getattr(e, 'status_code', None) or type(e).__name__
+                metrics.inc("rest_errors_total", method=name, status=status)
+                if not isinstance(e, BinanceAPIException):
+                    raise
+                if e.status_code == 418:
+                    self.stats['banned'] += 1
+                    delay = self._backoff(e, attempt)
+                    print(f"[REST] IP tiltás (418), {delay:.0f} s szünet")
+                    raise
+                if e.status_code != 429 or attempt >= self.max_retries:
+                    raise
+                self.stats['rate_limited'] += 1
+                delay = self._backoff(e, attempt)
+                print(f"[REST] Súlykorlát (429) – {name}, újrapróbálás {delay:.1f} s múlva")
+                attempt += 1
@@ -0,0 +1,169 @@
+# batch_features.py
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+from market.Indicator_Engine import FEATURES
+
+# Árszintű jellemzők: közös (pooled) modellnél a záróárral normáljuk őket
+PRICE_FEATURES = ['close', 'ma5', 'ma10', 'volatility', 'macd', 'bollinger_middle',
+                  'bollinger_upper', 'bollinger_lower', 'ema20', 'momentum']
+
+# Magasabb idősíkból átvett, skálafüggetlen jellemzők (oszlopnév: "{idősík}_{név}")
+CROSS_FEATURES = ['return', 'rsi', 'trend']
+
+
+def cross_feature_names(timeframes):
+    return [f"{tf}_{name}" for tf in timeframes for name in CROSS_FEATURES]
+
+
+def stack_arrays(views, limit, step=None):
+    """
+    Szimbólumonkénti KlineView-kból (symbol x time) tömbök, nyitási idő szerint
+    igazítva a legfrissebb közös idősávra. A hiányzó gyertyák NaN-ok. A step az
+    idősík hossza ms-ben; ha nincs megadva, a gyertyákból olvassuk ki. Ha egyik
+    szimbólumnak sincs (elég) gyertyája, minden érték NaN.
+    """
+    S = len(views)
+    close, high, low = (np.full((S, limit), np.nan) for _ in range(3))
+    last_open = max((int(v.open_time[-1]) for v in views if len(v)), default=None)
+    if step is None:
+        step = min((int(v.open_time[-1] - v.open_time[-2]) for v in views if len(v) > 1), default=None)
+    if last_open is None or not step:
+        return np.zeros(limit, dtype=np.int64), close, high, low
+    first_open = last_open - (limit - 1) * step
+    for s, v in enumerate(views):
+        t = (v.open_time - first_open) // step
+        keep = (t >= 0) & (t < limit)
+        t = t[keep]
+        high[s, t], low[s, t], close[s, t] = v.high[keep], v.low[keep], v.close[keep]
+    timestamps = first_open + step * np.arange(limit, dtype=np.int64)
+    return timestamps, _ffill(close), _ffill(high), _ffill(low)
+
+
+def _ffill(x):
+    # Köztes lyukak kitöltése az előző értékkel; a kezdő és záró NaN-ok (a szimbólum
+    # megfigyelt sávján kívül) maradnak, különben egy lemaradt szimbólum régi ára frissnek látszana
+    observed = ~np.isnan(x)
+    idx = np.where(observed, np.arange(x.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    out = x[np.arange(x.shape[0])[:, None], idx]
+    last = x.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    out[np.arange(x.shape[1]) > last[:, None]] = np.nan
+    return out
+
+
+def _rolling_mean(x, window):
+    # Kumulatív összeggel; ahol az ablakban NaN van, ott NaN (mint a pandas)
+    nan = np.isnan(x)
+    c = np.cumsum(np.pad(np.where(nan, 0.0, x), ((0, 0), (1, 0))), axis=1)
+    n = np.cumsum(np.pad(nan, ((0, 0), (1, 0))), axis=1)
+    out = np.full_like(x, np.nan)
+    full = (n[:, window:] - n[:, :-window]) == 0
+    out[:, window - 1:] = np.where(full, (c[:, window:] - c[:, :-window]) / window, np.nan)
+    return out
+
+
+def _rolling_std(x, window):
+    # Eltolt értékekkel (az első megfigyelt értékhez képest) számolt mintaszórás (ddof=1), mint a pandas rolling().std()
+    first = x[np.arange(x.shape[0]), np.argmax(~np.isnan(x), axis=1)]
+    shifted = x - first[:, None]
+    mean = _rolling_mean(shifted, window)
+    mean_sq = _rolling_mean(shifted * shifted, window)
+    var = (mean_sq - mean * mean) * window / (window - 1)
+    return np.sqrt(np.maximum(var, 0))
+
+
+def _ewm(x, span):
+    # ewm(span, adjust=False) minden szimbólumra egyszerre, az első értékkel indítva
+    alpha = 2.0 / (span + 1)
+    b, a = [alpha], [1, -(1 - alpha)]
+    first = np.argmax(~np.isnan(x), axis=1)
+    if not first.any():
+        out, _ = lfilter(b, a, x, axis=1, zi=(1 - alpha) * x[:, :1])
+        return out
+    # Rövidebb előzményű szimbólumok: az első érvényes gyertyától indul
+    out = np.full_like(x, np.nan)
+    for s, f in enumerate(first):
+        out[s, f:], _ = lfilter(b, a, x[s, f:], zi=(1 - alpha) * x[s, f:f + 1])
+    return out
+
+
+def _shift(x, n):
+    out = np.full_like(x, np.nan)
+    out[:, n:] = x[:, :-n]
+    return out
+
+
+def compute_features(close, high, low):
+    """
+    A 13 MLStrategy jellemző (symbol x time x feature) tömbben, egy vektorizált
+    menetben minden szimbólumra, plusz a target (következő hozam).
+    """
+    S, T = close.shape
+    F = np.empty((S, T, len(FEATURES)))
+    prev = _shift(close, 1)
+    delta = close - prev
+    rsi = _rsi(delta)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        low14 = np.full_like(close, np.nan)
+        high14 = np.full_like(close, np.nan)
+        low14[:, 13:] = sliding_window_view(low, 14, axis=1).min(axis=-1)
+        high14[:, 13:] = sliding_window_view(high, 14, axis=1).max(axis=-1)
+        stoch = 100 * (close - low14) / (high14 - low14)
+    mid = _rolling_mean(close, 20)
+    bstd = _rolling_std(close, 20)
+    columns = {
+        'close': close,
+        'return': delta / prev,
+        'ma5': _rolling_mean(close, 5),
+        'ma10': _rolling_mean(close, 10),
+        'volatility': _rolling_std(close, 5),
+        'rsi': rsi,
+        'macd': _ewm(close, 12) - _ewm(close, 26),
+        'bollinger_middle': mid,
+        'bollinger_upper': mid + 2 * bstd,
+        'bollinger_lower': mid - 2 * bstd,
+        'stochastic_k': stoch,
+        'ema20': _ewm(close, 20),
+        'momentum': close - _shift(close, 10),
+    }
+    for i, name in enumerate(FEATURES):
+        F[:, :, i] = columns[name]
+    target = np.full_like(close, np.nan)
+    target[:, :-1] = (close[:, 1:] - close[:, :-1]) / close[:, :-1]
+    valid = np.isfinite(F).all(axis=2) & np.isfinite(target)
+    return F, target, valid
+
+
+def _rsi(delta, window=14):
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = _rolling_mean(gain, window) / _rolling_mean(loss, window)
+        return 100 - 100 / (1 + rs)
+
+
+def cross_timeframe_features(timestamps, base_step, views, step, limit):
+    """
+    Egy magasabb idősík CROSS_FEATURES jellemzői (symbol x time x 3) az alap idősávra
+    igazítva: minden alapgyertya a nála nem később záródó utolsó magasabb gyertyát látja,
+    így a még nyitott magasabb gyertya nem szivárogtat jövőbeli adatot.
+    """
+    times, close, _, _ = stack_arrays(views, limit, step)
+    prev = _shift(close, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        H = np.stack([(close - prev) / prev, _rsi(close - prev), close / _rolling_mean(close, 10) - 1], axis=-1)
+    j = np.searchsorted(times + step, timestamps + base_step, side='right') - 1
+    out = np.full((close.shape[0], len(timestamps), len(CROSS_FEATURES)), np.nan)
+    out[:, j >= 0] = H[:, j[j >= 0]]
+    return out
+
+
+def normalize_prices(F):
+    # Skálafüggetlen jellemzők a közös modellhez: árszintű oszlopok / close
+    F = F.copy()
+    close = F[..., FEATURES.index('close')].copy()
+    for name in PRICE_FEATURES:
+        F[..., FEATURES.index(name)] /= close
+    return F
@@ -1,122 +1,171 @@
-﻿# ml_strategy.py
-
-import pandas as pd
-import numpy as np
-from xgboost import XGBRegressor
-from binance.client import Client
-from collections import Counter
-from sklearn.model_selection import GridSearchCV
-from sklearn.model_selection import TimeSeriesSplit
-import json
-import os
-
-class MLStrategy:
-    def __init__(self, client: Client, symbols: list):
-        self.client = client
-        self.symbols = symbols
-        self.timeframes = [Client.KLINE_INTERVAL_5MINUTE]
-        self.limit = 100
-        self.param_dir = "params"
-        os.makedirs(self.param_dir, exist_ok=True)
-
-    def fetch_klines(self, symbol, interval):
-        klines = self.client.get_klines(symbol=symbol, interval=interval, limit=self.limit)
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'num_trades',
-            'taker_buy_base_volume', 'taker_buy_quote_volume', 'ignore'])
-        df['close'] = df['close'].astype(float)
-        df['high'] = df['high'].astype(float)
-        df['low'] = df['low'].astype(float)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
-
-    def prepare_features(self, df):
-        df['return'] = df['close'].pct_change()
-        df['ma5'] = df['close'].rolling(window=5).mean()
-        df['ma10'] = df['close'].rolling(window=10).mean()
-        df['volatility'] = df['close'].rolling(window=5).std()
-        df['rsi'] = self.compute_rsi(df['close'], window=14)
-
-        # MACD
-        ema12 = df['close'].ewm(span=12, adjust=False).mean()
-        ema26 = df['close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = ema12 - ema26
-
-        # Bollinger szalag
-        df['bollinger_middle'] = df['close'].rolling(window=20).mean()
-        df['bollinger_std'] = df['close'].rolling(window=20).std()
-        df['bollinger_upper'] = df['bollinger_middle'] + 2 * df['bollinger_std']
-        df['bollinger_lower'] = df['bollinger_middle'] - 2 * df['bollinger_std']
-
-        # Stochastic Oscillator
-        low14 = df['low'].rolling(window=14).min()
-        high14 = df['high'].rolling(window=14).max()
-        df['stochastic_k'] = 100 * ((df['close'] - low14) / (high14 - low14))
-
-        # Új indikátorok
-        df['ema20'] = df['close'].ewm(span=20, adjust=False).mean()
-        df['momentum'] = df['close'] - df['close'].shift(10)
-
-        df['target'] = (df['close'].shift(-1) - df['close']) / df['close']
-        return df.dropna()
-
-    def compute_rsi(self, series, window=14):
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
-
-    def dynamic_sl_tp(self, price, volatility):
-        sl = volatility * 1.2
-        tp = volatility * 2.0
-        return round(sl, 5), round(tp, 5)
-
-    def generate_signals(self):
-        signals = {}
-        for symbol in self.symbols:
-            df = self.fetch_klines(symbol, self.timeframes[0])
-            df = self.prepare_features(df)
-            features = ['close', 'return', 'ma5', 'ma10', 'volatility', 'rsi',
-                        'macd', 'bollinger_middle', 'bollinger_upper', 'bollinger_lower',
-                        'stochastic_k', 'ema20', 'momentum']
-            X = df[features].values
-            y = df['target'].values
-
-            if len(X) < 20:
-                signals[symbol] = 'HOLD'
-                continue
-
-            param_file = os.path.join(self.param_dir, f"best_params_{symbol}.json")
-            if os.path.exists(param_file):
-                with open(param_file, 'r') as f:
-                    best_params = json.load(f)
-                print(f"[{symbol}] Betöltött hiperparaméterek: {best_params}")
-                model = XGBRegressor(**best_params)
-                model.fit(X[:-1], y[:-1])
-            else:
-                param_grid = {
-                    'n_estimators': [50, 100],
-                    'max_depth': [3, 4, 5],
-                    'learning_rate': [0.03, 0.05, 0.1]
-                }
-                tscv = TimeSeriesSplit(n_splits=3)
-                search = GridSearchCV(XGBRegressor(), param_grid, cv=tscv, scoring='neg_mean_squared_error', verbose=0)
-                search.fit(X[:-1], y[:-1])
-                model = search.best_estimator_
-                best_params = search.best_params_
-                print(f"[{symbol}] Legjobb hiperparaméterek: {best_params}")
-                with open(param_file, 'w') as f:
-                    json.dump(best_params, f, indent=4)
-
-            prediction = model.predict([X[-1]])[0]
-
-            if prediction > 0.0005:
-                signals[symbol] = 'BUY'
-            elif prediction < -0.0005:
-                signals[symbol] = 'SELL'
-            else:
-                signals[symbol] = 'HOLD'
-
-        return signals
+# ml_strategy.py
+
+import pandas as pd
+import numpy as np
+from xgboost import XGBRegressor
+from binance.client import Client
+from collections import Counter
+import json
+import os
+import subprocess
+import sys
+from market.Kline_Cache import INTERVAL_MS
+from market.Kline_Buffer import KlineBuffer
+from Metrics import metrics
+from market.Indicator_Engine import compute_rsi, FEATURES
+from prediction.Model_Manager import ModelManager
+from trade.Trigger_Engine import volatility_sl_tp
+from prediction.Tuning_Store import TuningStore
+from prediction.Batch_Features import stack_arrays, compute_features, normalize_prices, cross_timeframe_features
+
+DEFAULT_PARAMS = {'n_estimators': 50, 'max_depth': 3, 'learning_rate': 0.05}
+_tuning_started = set()
+
+class MLStrategy:
+    def __init__(self, client: Client, symbols: list, kline_cache=None, model_manager=None, auto_tune=True, model_scope="symbol",
+                 timeframes=None, limit=100):
+        self.client = client
+        self.symbols = symbols
+        self.kline_cache = kline_cache
+        # Az első a döntési idősík, a többiből keresztidősík-jellemzők készülnek
+        self.timeframes = timeframes or [Client.KLINE_INTERVAL_5MINUTE]
+        # Szimbólumonként ennyi gyertyán tanul; archívummal több ezer is lehet
+        self.limit = limit
+        self.param_dir = "params"
+        os.makedirs(self.param_dir, exist_ok=True)
+        self.models = model_manager or ModelManager(self.param_dir)
+        self.tuning = TuningStore(self.param_dir)
+        self.auto_tune = auto_tune
+        self.model_scope = model_scope     # "symbol": szimbólumonkénti modell, "pooled": egy közös modell
+
+    def fetch_arrays(self, symbol, interval):
+        # KlineView: típusos OHLCV tömbök, a cache-ből másolás nélkül
+        if self.kline_cache is not None:
+            return self.kline_cache.get_arrays(symbol, interval, self.limit)
+        return KlineBuffer.from_klines(self.client.get_klines(symbol=symbol, interval=interval, limit=self.limit)).window()
+
+    def fetch_klines(self, symbol, interval):
+        df = self.fetch_arrays(symbol, interval).to_dataframe()
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    def prepare_features(self, df, higher=None):
+        # higher: {idősík: fetch_klines DataFrame}; a legutolsó lezárt gyertyájuk jellemzői kerülnek a sorokhoz
+        df['return'] = df['close'].pct_change()
+        df['ma5'] = df['close'].rolling(window=5).mean()
+        df['ma10'] = df['close'].rolling(window=10).mean()
+        df['volatility'] = df['close'].rolling(window=5).std()
+        df['rsi'] = self.compute_rsi(df['close'], window=14)
+
+        # MACD
+        ema12 = df['close'].ewm(span=12, adjust=False).mean()
+        ema26 = df['close'].ewm(span=26, adjust=False).mean()
+        df['macd'] = ema12 - ema26
+
+        # Bollinger szalag
+        df['bollinger_middle'] = df['close'].rolling(window=20).mean()
+        df['bollinger_std'] = df['close'].rolling(window=20).std()
+        df['bollinger_upper'] = df['bollinger_middle'] + 2 * df['bollinger_std']
+        df['bollinger_lower'] = df['bollinger_middle'] - 2 * df['bollinger_std']
+
+        # Stochastic Oscillator
+        low14 = df['low'].rolling(window=14).min()
+        high14 = df['high'].rolling(window=14).max()
+        df['stochastic_k'] = 100 * ((df['close'] - low14) / (high14 - low14))
+
+        # Új indikátorok
+        df['ema20'] = df['close'].ewm(span=20, adjust=False).mean()
+        df['momentum'] = df['close'] - df['close'].shift(10)
+
+        for tf, hdf in (higher or {}).items():
+            cross = pd.DataFrame({
+                'close_time': hdf['close_time'].astype('int64'),
+                f'{tf}_return': hdf['close'].pct_change(),
+                f'{tf}_rsi': self.compute_rsi(hdf['close'], window=14),
+                f'{tf}_trend': hdf['close'] / hdf['close'].rolling(window=10).mean() - 1,
+            })
+            df['close_time'] = df['close_time'].astype('int64')
+            df = pd.merge_asof(df, cross, on='close_time', direction='backward')
+
+        df['target'] = (df['close'].shift(-1) - df['close']) / df['close']
+        return df.dropna()
+
+    def compute_rsi(self, series, window=14):
+        return compute_rsi(series, window)
+
+    def dynamic_sl_tp(self, price, volatility):
+        return volatility_sl_tp(price, volatility)
+
+    def request_tuning(self, symbol):
+        # A hangolás külön folyamatban fut, a döntési ciklust nem tartja fel
+        if not self.auto_tune or symbol in _tuning_started:
+            return
+        _tuning_started.add(symbol)
+        print(f"[{symbol}] Nincs hangolt paraméter, háttér-hangolás indítva")
+        subprocess.Popen([sys.executable, "-m", "prediction.Tuner", "--symbols", symbol])
+
+    def build_model(self, symbol, X, y):
+        best_params = self.tuning.best_params(symbol)
+        if best_params is None:
+            self.request_tuning(symbol)
+            best_params = DEFAULT_PARAMS
+        print(f"[{symbol}] Hiperparaméterek: {best_params}")
+        model = XGBRegressor(**best_params)
+        model.fit(X, y)
+        return model
+
+    def signal_from_prediction(self, prediction):
+        if prediction > 0.0005:
+            return 'BUY'
+        elif prediction < -0.0005:
+            return 'SELL'
+        return 'HOLD'
+
+    def feature_arrays(self):
+        """
+        Minden szimbólum gyertyáiból (symbol x time x feature) jellemzőtömb, a 13
+        jellemző egy vektorizált menetben; további idősíkok esetén ezek lezárt
+        gyertyáinak jellemzői is a sorokhoz kerülnek. A visszatérési érték (F, target,
+        valid); a Tuner is ezen hangol.
+        """
+        views = [self.fetch_arrays(symbol, self.timeframes[0]) for symbol in self.symbols]
+        with metrics.timer("features_batch"):
+            timestamps, close, high, low = stack_arrays(views, self.limit, INTERVAL_MS[self.timeframes[0]])
+            F, target, valid = compute_features(close, high, low)
+        for tf in self.timeframes[1:]:
+            # KlineCache base_interval esetén ezek memóriában újramintázott gyertyák, nincs új letöltés
+            higher = [self.fetch_arrays(symbol, tf) for symbol in self.symbols]
+            with metrics.timer("features_batch"):
+                cross = cross_timeframe_features(timestamps, INTERVAL_MS[self.timeframes[0]], higher, INTERVAL_MS[tf], self.limit)
+                F = np.concatenate([F, cross], axis=2)
+                valid &= np.isfinite(cross).all(axis=2)
+        return F, target, valid
+
+    def generate_signals(self):
+        # Jellemzők minden szimbólumra egyszerre, majd modellcsoportonként predikció
+        F, target, valid = self.feature_arrays()
+        signals = {symbol: 'HOLD' for symbol in self.symbols}
+
+        if self.model_scope == "pooled":
+            F = normalize_prices(F)
+            ready = [s for s in range(len(self.symbols)) if valid[s].sum() >= 20]
+            if not ready:
+                return signals
+            X_train = np.concatenate([F[s][valid[s]][:-1] for s in ready])
+            y_train = np.concatenate([target[s][valid[s]][:-1] for s in ready])
+            X_pred = np.stack([F[s][valid[s]][-1] for s in ready])
+            build = lambda X_, y_: XGBRegressor(**DEFAULT_PARAMS).fit(X_, y_)
+            predictions = self.models.predict_batch("ml", "POOLED", X_train, y_train, X_pred, build)
+            for s, prediction in zip(ready, predictions):
+                signals[self.symbols[s]] = self.signal_from_prediction(prediction)
+            return signals
+
+        for s, symbol in enumerate(self.symbols):
+            X = F[s][valid[s]]
+            y = target[s][valid[s]]
+            if len(X) < 20:
+                continue
+            prediction = self.models.predict("ml", symbol, X, y, lambda X_train, y_train: self.build_model(symbol, X_train, y_train),
+                                             version=self.tuning.version(symbol))
+            signals[symbol] = self.signal_from_prediction(prediction)
+        return signals
@@ -0,0 +1,118 @@
+# model_manager.py
+
+import json
+import os
+import threading
+import time
+import numpy as np
+from Metrics import metrics
+
+
+class ModelManager:
+    """
+    Szimbólumonként egy betanított modellt tart és csak predict-tel szolgál ki.
+    Újratanítás csak ütemezetten (retrain_sec) vagy jellemző-drift esetén történik;
+    a modellek a params/best_params_*.json mellé mentődnek, így újraindításkor nem kell tanítani.
+    """
+
+    def __init__(self, model_dir: str = "params", retrain_sec: float = 3600, drift_z: float = 3.0):
+        self.model_dir = model_dir
+        self.retrain_sec = retrain_sec
+        self.drift_z = drift_z
+        self._models = {}   # kulcs: (név, szimbólum), érték: {'model', 'trained_at', 'mean', 'std'}
+        self._locks = {}
+        self._guard = threading.Lock()
+        os.makedirs(self.model_dir, exist_ok=True)
+
+    def _paths(self, name, symbol):
+        base = os.path.join(self.model_dir, f"model_{name}_{symbol}")
+        return base + ".json", base + ".meta.json"
+
+    def _lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def predict(self, name, symbol, X, y, build, version=None):
+        """
+        X[-1] sorra ad predikciót, a modell X[:-1]-en tanul. A build(X, y) függvény
+        egy betanított modellt ad vissza; csak akkor hívódik, ha nincs modell, lejárt, drift van, vagy
+        megváltozott a paraméterkészlet verziója.
+        """
+        return self.predict_batch(name, symbol, X[:-1], y[:-1], X[-1:], build, version)[0]
+
+    def predict_batch(self, name, symbol, X_train, y_train, X_pred, build, version=None):
+        # Több sor egy predict hívással (pl. közös modell minden szimbólumra)
+        key = (name, symbol)
+        with self._lock(key):
+            entry = self._models.get(key) or self._load(name, symbol)
+            reason = self._retrain_reason(entry, X_pred, version)
+            if reason:
+                print(f"[{symbol}] Modell újratanítás ({name}): {reason}")
+                with metrics.timer("model_fit", symbol):
+                    entry = self._train(name, symbol, X_train, y_train, build, version)
+            self._models[key] = entry
+            with metrics.timer("model_predict", symbol):
+                return entry['model'].predict(X_pred)
+
+    def _retrain_reason(self, entry, X_pred, version=None):
+        if entry is None:
+            return "nincs modell"
+        if entry.get('version') != version:
+            return "új hiperparaméterek"
+        if len(entry['mean']) != X_pred.shape[1]:
+            return "megváltozott jellemzők"
+        if time.time() - entry['trained_at'] >= self.retrain_sec:
+            return "ütemezett"
+        # Drift: a predikciós sorok átlagos z-értéke a tanítási eloszláshoz képest
+        z = np.abs((X_pred - entry['mean']) / entry['std'])
+        if np.nanmean(z) > self.drift_z:
+            return f"drift (z={np.nanmean(z):.2f})"
+        return None
+
+    def _train(self, name, symbol, X, y, build, version=None):
+        model = build(X, y)
+        std = X.std(axis=0)
+        entry = {
+            'model': model,
+            'trained_at': time.time(),
+            'mean': X.mean(axis=0),
+            'std': np.where(std > 0, std, 1.0),
+            'version': version,
+        }
+        self._save(name, symbol, entry)
+        return entry
+
+    def _save(self, name, symbol, entry):
+        model_path, meta_path = self._paths(name, symbol)
+        try:
+            entry['model'].save_model(model_path)
+            with open(meta_path, 'w') as f:
+                json.dump({
+                    'trained_at': entry['trained_at'],
+                    'mean': entry['mean'].tolist(),
+                    'std': entry['std'].tolist(),
+                    'version': entry['version'],
+                }, f, indent=4)
+        except Exception as e:
+            print(f"[{symbol}] Modell mentése sikertelen: {e}")
+
+    def _load(self, name, symbol):
+        model_path, meta_path = self._paths(name, symbol)
+        if not (os.path.exists(model_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            from xgboost import XGBRegressor
+            model = XGBRegressor()
+            model.load_model(model_path)
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            return {
+                'model': model,
+                'trained_at': meta['trained_at'],
+                'mean': np.array(meta['mean']),
+                'std': np.array(meta['std']),
+                'version': meta.get('version'),
+            }
+        except Exception as e:
+            print(f"[{symbol}] Modell betöltése sikertelen: {e}")
+            return None
@@ -0,0 +1,95 @@
+# tuner.py
+# Hiperparaméter-hangolás külön folyamatban, párhuzamosan:
+#   python -m prediction.Tuner --symbols BTCUSDT ETHUSDT --limit 1000
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.stats import loguniform, randint, uniform
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingRandomSearchCV, TimeSeriesSplit
+from xgboost import XGBRegressor
+from binance.client import Client
+from market.Indicator_Engine import FEATURES
+from market.Kline_Archive import KlineArchive
+from market.Kline_Cache import KlineCache
+from market.Rest_Gateway import RestGateway
+from prediction.Batch_Features import cross_feature_names
+from prediction.MI_Strategy import MLStrategy
+from prediction.Tuning_Store import TuningStore
+
+SEARCH_SPACE = {
+    'n_estimators': randint(30, 400),
+    'max_depth': randint(2, 8),
+    'learning_rate': loguniform(0.01, 0.3),
+    'subsample': uniform(0.6, 0.4),
+    'colsample_bytree': uniform(0.6, 0.4),
+    'min_child_weight': randint(1, 10),
+}
+
+
+def tune(X, y, n_candidates=64, n_jobs=-1, random_state=0):
+    # Successive halving: sok jelölt kevés mintán, a legjobbak egyre több mintán
+    search = HalvingRandomSearchCV(
+        XGBRegressor(n_jobs=1), SEARCH_SPACE, n_candidates=n_candidates, factor=3,
+        resource='n_samples', cv=TimeSeriesSplit(n_splits=3), scoring='neg_mean_squared_error',
+        n_jobs=n_jobs, random_state=random_state, verbose=0)
+    search.fit(X, y)
+    best_params = {k: (v.item() if isinstance(v, np.generic) else v) for k, v in search.best_params_.items()}
+    ranked = np.argsort(search.cv_results_['rank_test_score'])[:10]
+    cv_results = [{
+        'params': {k: (v.item() if isinstance(v, np.generic) else v) for k, v in search.cv_results_['params'][i].items()},
+        'mean_test_score': float(search.cv_results_['mean_test_score'][i]),
+        'std_test_score': float(search.cv_results_['std_test_score'][i]),
+        'n_resources': int(search.cv_results_['n_resources'][i]),
+    } for i in ranked]
+    return best_params, float(search.best_score_), cv_results
+
+
+def tune_symbol(symbol, config, limit=1000, n_candidates=64, n_jobs=-1, param_dir="params", weight_limit=None):
+    client = Client(config.get("api_key", ""), config.get("api_secret", ""))
+    client.API_URL = config.get("api_url", 'https://testnet.binance.vision/api')
+    # A súlykeret az IP-hez tartozik, amin a kereskedő folyamat is osztozik
+    client = RestGateway(client, weight_limit=weight_limit or config.get("rest_weight_limit", 6000))
+    # Az előzmény a lemezes archívumból, a hálózatról csak az azóta nyílt gyertyák
+    kline_cache = KlineCache(client, archive=KlineArchive(config.get("archive_dir", "data/archive")))
+    strategy = MLStrategy(client, [symbol], kline_cache=kline_cache, limit=limit,
+                          timeframes=config.get("ml_timeframes"))
+    # Ugyanazok a sorok és oszlopok, amiken az élő modell tanul (a valid már kizárja a target nélküli utolsót)
+    F, target, valid = strategy.feature_arrays()
+    X, y = F[0][valid[0]], target[0][valid[0]]
+    best_params, best_score, cv_results = tune(X, y, n_candidates, n_jobs)
+    features = FEATURES + cross_feature_names(strategy.timeframes[1:])
+    version = TuningStore(param_dir).save(symbol, best_params, best_score, cv_results,
+                                          {'n_samples': len(X), 'limit': limit, 'features': features})
+    print(f"[{symbol}] Hangolás kész (v{version}): {best_params}, CV MSE: {-best_score:.3e}")
+    return symbol, version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="XGBoost hiperparaméter-hangolás")
+    parser.add_argument("--symbols", nargs="*")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--candidates", type=int, default=64)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with open("config.json", "r") as f:
+        config = json.load(f)
+    symbols = args.symbols or config["symbols"]
+
+    # Több szimbólum: szimbólumonként egy folyamat; egy szimbólum: a CV fut párhuzamosan
+    if len(symbols) > 1:
+        workers = min(len(symbols), args.jobs)
+        per_search = max(1, args.jobs // workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # A párhuzamos folyamatok a perces súlykeret egy-egy részén osztoznak
+            weight_limit = config.get("rest_weight_limit", 6000) // workers
+            futures = [pool.submit(tune_symbol, s, config, args.limit, args.candidates, per_search, "params", weight_limit)
+                       for s in symbols]
+            for future in futures:
+                future.result()
+    else:
+        tune_symbol(symbols[0], config, args.limit, args.candidates, args.jobs)
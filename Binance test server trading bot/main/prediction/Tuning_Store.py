@@ -0,0 +1,70 @@
+# tuning_store.py
+
+import glob
+import hashlib
+import json
+import os
+import time
+
+
+class TuningStore:
+    """
+    Verziózott hangolási eredmények: params/tuning/{symbol}/v{N}.json (paraméterek,
+    CV pontszámok), és a params/best_params_{symbol}.json, amit az élő stratégia olvas.
+    Ez utóbbi {"version": N, "params": {...}} alakú: a verziószám a fájlban utazik,
+    így másolás vagy visszaállítás után is ugyanazt a paraméterkészletet azonosítja.
+    Az élő oldal csak olvas; írni a Tuner folyamat ír.
+    """
+
+    def __init__(self, param_dir: str = "params"):
+        self.param_dir = param_dir
+        self.tuning_dir = os.path.join(param_dir, "tuning")
+
+    def best_params_path(self, symbol):
+        return os.path.join(self.param_dir, f"best_params_{symbol}.json")
+
+    def _read(self, symbol):
+        path = self.best_params_path(symbol)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if 'params' not in data:
+            # Régi formátum (csak a paraméterek): a tartalom hash-e a verzió
+            digest = hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()[:12]
+            data = {'version': digest, 'params': data}
+        return data
+
+    def best_params(self, symbol):
+        data = self._read(symbol)
+        return data['params'] if data else None
+
+    def version(self, symbol):
+        # A fájlba írt verziószám azonosítja a paraméterkészletet
+        data = self._read(symbol)
+        return data['version'] if data else None
+
+    def history(self, symbol):
+        files = glob.glob(os.path.join(self.tuning_dir, symbol, "v*.json"))
+        return sorted(files, key=lambda p: int(os.path.basename(p)[1:-5]))
+
+    def save(self, symbol, best_params, best_score, cv_results, meta=None):
+        os.makedirs(os.path.join(self.tuning_dir, symbol), exist_ok=True)
+        version = len(self.history(symbol)) + 1
+        record = {
+            'version': version,
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'best_params': best_params,
+            'best_score': best_score,
+            'cv_results': cv_results,
+        }
+        record.update(meta or {})
+        with open(os.path.join(self.tuning_dir, symbol, f"v{version}.json"), 'w') as f:
+            json.dump(record, f, indent=4)
+
+        # Atomikus csere, hogy az élő oldal sose olvasson félig írt fájlt
+        path = self.best_params_path(symbol)
+        with open(path + ".tmp", 'w') as f:
+            json.dump({'version': version, 'params': best_params}, f, indent=4)
+        os.replace(path + ".tmp", path)
+        return version
@@ -0,0 +1,8 @@
+# conftest.py
+# A modulok a main/ könyvtárból importálnak (pl. from Metrics import metrics):
+#   cd main && python -m pytest -q
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+# test_backtester.py
+
+import numpy as np
+import pandas as pd
+from backtest.Backtester import align_signals, simulate
+
+STEP = 300_000
+
+
+def frame(candles):
+    # candles: (open, high, low, close) sorok
+    opens, highs, lows, closes = (np.array(c, dtype=float) for c in zip(*candles))
+    return pd.DataFrame({'timestamp': np.arange(len(candles), dtype=np.int64) * STEP, 'open': opens,
+                         'high': highs, 'low': lows, 'close': closes})
+
+
+def run(df, entry_at=0, sl=0.01, tp=0.02):
+    n = len(df)
+    entries = np.zeros(n, dtype=bool)
+    entries[entry_at] = True
+    return simulate(df, entries, np.zeros(n, dtype=bool), np.full(n, sl), np.full(n, tp), 0.0, 100.0)
+
+
+def test_stop_loss_hits_on_candle_low():
+    # A záróár a szint felett marad, a mélypont alatta: az élő trigger itt eladna
+    df = frame([(100, 100, 100, 100), (100, 100.5, 98.5, 99.8), (99.8, 99.9, 99.5, 99.6)])
+    trade, = run(df)
+    assert (trade['reason'], trade['exit'], trade['exit_time']) == ("STOP-LOSS", 99.0, STEP)
+
+
+def test_take_profit_gap_fills_at_open():
+    df = frame([(100, 100, 100, 100), (103, 104, 102.5, 103.5)])
+    trade, = run(df)
+    assert (trade['reason'], trade['exit']) == ("TAKE-PROFIT", 103.0)
+
+
+def test_candle_touching_both_levels_counts_as_stop_loss():
+    df = frame([(100, 100, 100, 100), (100, 102.5, 98.0, 101.0)])
+    trade, = run(df)
+    assert (trade['reason'], trade['exit']) == ("STOP-LOSS", 99.0)
+
+
+def test_align_signals_by_open_time():
+    timestamps = np.arange(6, dtype=np.int64) * STEP
+    signals = np.array([False, True, False, True, False, True])
+    # A szimbólum később indul, és a 3. gyertyája hiányzik
+    open_times = np.array([1, 2, 4, 5], dtype=np.int64) * STEP
+    assert align_signals(signals, timestamps, open_times).tolist() == [True, False, True, True]
+    assert align_signals(signals[:4], timestamps[:4], open_times[:1]).tolist() == [True]
@@ -0,0 +1,64 @@
+# test_batch_features.py
+
+import numpy as np
+import pytest
+from backtest.Benchmark import synthetic_klines
+from market.Indicator_Engine import FEATURES
+from market.Kline_Buffer import KlineBuffer
+from market.Kline_Cache import klines_to_dataframe
+from prediction.Batch_Features import stack_arrays, compute_features, _ffill
+from prediction.MI_Strategy import MLStrategy
+
+STEP = 300_000
+
+
+def pandas_features(klines):
+    # Az MLStrategy pandas útja a referencia
+    df = klines_to_dataframe(klines)
+    for col in ['close', 'high', 'low']:
+        df[col] = df[col].astype(float)
+    return MLStrategy.__new__(MLStrategy).prepare_features(df)
+
+
+@pytest.fixture
+def symbols():
+    return [synthetic_klines(300, STEP, seed, price=10.0 + 50 * seed) for seed in range(3)]
+
+
+def test_batch_features_match_pandas(symbols):
+    views = [KlineBuffer.from_klines(k).window() for k in symbols]
+    timestamps, close, high, low = stack_arrays(views, 300, STEP)
+    F, target, valid = compute_features(close, high, low)
+    assert timestamps.tolist() == [k[0] for k in symbols[0]]
+    for s, klines in enumerate(symbols):
+        df = pandas_features(klines)
+        assert valid[s].sum() == len(df)
+        assert np.allclose(F[s][valid[s]], df[FEATURES].values, rtol=1e-9, atol=1e-9)
+        assert np.allclose(target[s][valid[s]], df['target'].values)
+
+
+def test_stack_arrays_aligns_shorter_and_lagging_symbols(symbols):
+    full = KlineBuffer.from_klines(symbols[0]).window()
+    lagging = KlineBuffer.from_klines(symbols[1][:-2]).window()
+    _, close, _, _ = stack_arrays([full, lagging], 10, STEP)
+    assert np.isfinite(close[0]).all()
+    # A lemaradt szimbólum utolsó két gyertyája hiányzik, nem az utolsó ismert ár ismétlődik
+    assert np.isfinite(close[1][:-2]).all() and np.isnan(close[1][-2:]).all()
+
+
+def test_stack_arrays_without_candles():
+    empty = KlineBuffer(10).window()
+    one = KlineBuffer.from_klines(synthetic_klines(1, STEP, 0)).window()
+    timestamps, close, _, _ = stack_arrays([empty, empty], 5)
+    assert close.shape == (2, 5) and np.isnan(close).all()
+    _, close, _, _ = stack_arrays([one, empty], 5)
+    assert np.isnan(close).all()
+    _, close, _, _ = stack_arrays([one, empty], 5, STEP)
+    assert close[0, -1] == pytest.approx(float(one.close[0])) and np.isnan(close[1]).all()
+
+
+def test_ffill_only_inside_observed_range():
+    x = np.array([[np.nan, 1.0, np.nan, 2.0, np.nan], [np.nan] * 5])
+    out = _ffill(x)
+    assert np.array_equal(out[0], [np.nan, 1.0, 1.0, 2.0, np.nan], equal_nan=True)
+    assert np.isnan(out[1]).all()
@@ -0,0 +1,41 @@
+# test_history_store.py
+
+import glob
+import threading
+from datetime import datetime
+import pytest
+
+pytest.importorskip("pyarrow")
+import History_Store
+from History_Store import HistoryStore
+
+
+def row(symbol):
+    return {'timestamp': '2026-10-18 10:00:00', 'symbol': symbol, 'current_price': 1.0, 'action': 'BUY',
+            'balance': 100.0, 'quantity': 1.0, 'profit': 0.0}
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_concurrent_appends_start_one_flusher(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(History_Store.atexit, 'register', registered.append)
+    store = HistoryStore(str(tmp_path), flush_interval=3600)
+    run_threads(lambda i: [store.append('trades', row(f"S{i}USDT")) for _ in range(50)], 8)
+    assert registered == [store.flush]
+
+
+def test_concurrent_parts_get_distinct_names(tmp_path, monkeypatch):
+    # Azonos ezredmásodpercben írt partok: csak a sorszám különbözteti meg őket
+    monkeypatch.setattr(History_Store.time, 'time', lambda: 1_760_000_000.0)
+    store = HistoryStore(str(tmp_path), flush_interval=3600)
+    table = History_Store.pa.Table.from_pylist([dict(row("BTCUSDT"), timestamp=datetime(2026, 10, 18, 10))],
+                                               schema=History_Store._arrow_schema('trades'))
+    run_threads(lambda i: store._write_part('trades', "BTCUSDT", "2026-10-18", table), 16)
+    assert len(glob.glob(str(tmp_path / "trades" / "*" / "*" / "*.arrow"))) == 16
@@ -0,0 +1,73 @@
+# test_indicator_engine.py
+
+import numpy as np
+import pytest
+from backtest.Benchmark import synthetic_klines
+from market.Indicator_Engine import IndicatorEngine, FEATURES
+from market.Kline_Buffer import KlineBuffer
+from market.Kline_Cache import klines_to_dataframe
+from prediction.MI_Strategy import MLStrategy
+from trade.Symbol_Trader import prepare_features as trader_features
+
+WINDOW = 100
+STEP = 300_000
+
+
+def pandas_features(klines):
+    # Az MLStrategy pandas útja a referencia, ugyanarra az ablakra
+    df = klines_to_dataframe(klines)
+    for col in ['close', 'high', 'low']:
+        df[col] = df[col].astype(float)
+    return MLStrategy.__new__(MLStrategy).prepare_features(df)
+
+
+@pytest.fixture
+def klines():
+    return synthetic_klines(400, STEP, 3, price=250.0)
+
+
+def test_frame_matches_pandas_while_streaming(klines):
+    engine = IndicatorEngine(history=WINDOW)
+    buffer = KlineBuffer(WINDOW)
+    for end in range(1, len(klines) + 1):
+        buffer.merge(klines[end - 1:end])                   # gyertyánként, mint az élő ciklus
+        if end < 40 or end % 9:
+            engine.sync_view(buffer.window())
+            continue
+        frame = engine.frame(buffer.window())
+        reference = pandas_features(klines[max(0, end - WINDOW):end])
+        assert len(frame) == len(reference)
+        assert np.allclose(frame[FEATURES].values, reference[FEATURES].values, rtol=1e-9, atol=1e-9)
+
+
+def test_trader_columns_match_pandas_while_streaming(klines):
+    # Kevesebb oszlopnál az RSI bemelegedése (14. sor) is a kimenetbe kerül
+    columns = ['close', 'return', 'ma5', 'ma10', 'volatility', 'rsi']
+    engine = IndicatorEngine(history=WINDOW)
+    buffer = KlineBuffer(WINDOW)
+    for end in range(1, len(klines) + 1):
+        buffer.merge(klines[end - 1:end])
+        frame = engine.frame(buffer.window(), columns)
+        if end < 20 or end % 5:
+            continue
+        reference = trader_features(klines_to_dataframe(klines[max(0, end - WINDOW):end]))
+        assert len(frame) == len(reference)
+        assert np.allclose(frame[columns].values, reference[columns].values, rtol=1e-9, atol=1e-9)
+
+
+def test_sync_view_matches_pandas_for_open_candle(klines):
+    engine = IndicatorEngine(history=WINDOW)
+    for end in range(WINDOW, len(klines), 13):
+        window = klines[end - WINDOW:end]
+        row = engine.sync_view(KlineBuffer.from_klines(window).window())
+        # A következő gyertyával a nyitott gyertya sora is kap targetet; a korábbi sorokat nem érinti
+        reference = pandas_features(window + [klines[end]]).iloc[-1]
+        assert row['timestamp'] == window[-1][0]
+        for name in FEATURES:
+            assert row[name] == pytest.approx(reference[name], rel=1e-9, abs=1e-9), name
+
+
+def test_update_rows_hide_internal_state(klines):
+    engine = IndicatorEngine()
+    row = engine.update(klines[0][0], klines[0][2], klines[0][3], klines[0][4])
+    assert not [name for name in row if name.startswith('_')]
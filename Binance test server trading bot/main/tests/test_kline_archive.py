@@ -0,0 +1,101 @@
+# test_kline_archive.py
+
+import os
+import numpy as np
+import pytest
+from backtest.Benchmark import synthetic_klines
+from backtest.Mock_Client import MockClient
+from market.Kline_Archive import KlineArchive, RECORD, backfill
+
+STEP = 300_000
+START = 1_699_999_800_000       # 5 perces határra igazítva
+
+
+@pytest.fixture
+def klines():
+    return synthetic_klines(200, STEP, 1, start_ms=START)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return KlineArchive(str(tmp_path / "archive"))
+
+
+def opens(archive, symbol="BTCUSDT"):
+    return archive.load(symbol, "5m").window().open_time.tolist()
+
+
+def index_ranges(ranges):
+    return [((a - START) // STEP, (b - START) // STEP) for a, b in ranges]
+
+
+def test_append_skips_open_and_known_candles(archive, klines):
+    now = klines[99][0] + STEP // 2             # a 99. gyertya még nyitott
+    assert archive.append("BTCUSDT", "5m", klines[:100], now_ms=now) == 99
+    assert archive.append("BTCUSDT", "5m", klines[:100], now_ms=now) == 0
+    assert archive.append("BTCUSDT", "5m", klines[90:120], now_ms=klines[120][0]) == 21
+    assert opens(archive) == [k[0] for k in klines[:120]]
+
+
+def test_load_returns_latest_candles(archive, klines):
+    archive.append("BTCUSDT", "5m", klines, now_ms=klines[-1][6] + 1)
+    view = archive.load("BTCUSDT", "5m", limit=50).window()
+    assert view.open_time.tolist() == [k[0] for k in klines[-50:]]
+    assert np.allclose(view.close, [float(k[4]) for k in klines[-50:]])
+    assert archive.count("BTCUSDT", "5m") == 200
+
+
+def test_gaps_before_inside_and_after(archive, klines):
+    archive.append("BTCUSDT", "5m", klines[10:50], now_ms=klines[-1][6] + 1)
+    archive.write("BTCUSDT", "5m", klines[60:100], now_ms=klines[-1][6] + 1)
+    gaps = archive.gaps("BTCUSDT", "5m", klines[0][0], klines[119][0])
+    assert index_ranges(gaps) == [(0, 9), (50, 59), (100, 119)]
+    assert archive.gaps("BTCUSDT", "5m", klines[20][0], klines[40][0]) == []
+
+
+def test_write_merges_into_the_middle(archive, klines):
+    now = klines[-1][6] + 1
+    archive.append("BTCUSDT", "5m", klines[:50] + klines[80:], now_ms=now)
+    assert archive.write("BTCUSDT", "5m", klines[40:90], now_ms=now) == 30
+    assert opens(archive) == [k[0] for k in klines]
+    assert archive.gaps("BTCUSDT", "5m", klines[0][0], klines[-1][0]) == []
+
+
+def test_append_truncates_torn_record(archive, klines):
+    now = klines[-1][6] + 1
+    archive.append("BTCUSDT", "5m", klines[:10], now_ms=now)
+    with open(archive.path("BTCUSDT", "5m"), 'ab') as f:
+        f.write(b'\0' * 17)                     # megszakadt írás maradéka
+    assert opens(archive) == [k[0] for k in klines[:10]]
+    assert archive.append("BTCUSDT", "5m", klines[10:20], now_ms=now) == 10
+    assert os.path.getsize(archive.path("BTCUSDT", "5m")) == 20 * RECORD.itemsize
+    assert opens(KlineArchive(archive.root)) == [k[0] for k in klines[:20]]
+
+
+def test_backfill_fills_only_missing_pages(archive):
+    klines = synthetic_klines(2500, STEP, 2, start_ms=START)
+    client = MockClient(os.devnull, interval="5m")
+    client.add_klines("BTCUSDT", "5m", klines)
+    now = klines[-1][0] + STEP // 2
+    client.set_time(now)
+    pages = []
+    get_klines = client.get_klines
+    client.get_klines = lambda **kw: pages.append(kw) or get_klines(**kw)
+    log = lambda line: None
+
+    assert backfill(client, archive, ["BTCUSDT"], ["5m"], candles=2400, now_ms=now, log=log) == {("BTCUSDT", "5m"): 2400}
+    assert len(pages) == 3 and opens(archive) == [k[0] for k in klines[-2401:-1]]
+
+    # Egygyertyás hézag: egy lap, amelynek első és utolsó nyitása azonos
+    path = archive.path("BTCUSDT", "5m")
+    records = np.fromfile(path, dtype=RECORD)
+    np.concatenate([records[:500], records[501:]]).tofile(path)
+    archive = KlineArchive(archive.root)
+    pages.clear()
+    assert backfill(client, archive, ["BTCUSDT"], ["5m"], candles=2400, now_ms=now, log=log) == {("BTCUSDT", "5m"): 1}
+    assert len(pages) == 1
+    assert opens(archive) == [k[0] for k in klines[-2401:-1]]
+
+    pages.clear()
+    assert backfill(client, archive, ["BTCUSDT"], ["5m"], candles=2400, now_ms=now, log=log) == {}
+    assert pages == []
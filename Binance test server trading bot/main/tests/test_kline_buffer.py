@@ -0,0 +1,66 @@
+# test_kline_buffer.py
+
+import numpy as np
+from market.Kline_Buffer import KlineBuffer
+
+STEP = 300_000
+
+
+def kline(i, close=None):
+    close = float(i) if close is None else close
+    return [i * STEP, close, close + 1, close - 1, close, 1.0, (i + 1) * STEP - 1, 0.0, 0, 0.0, 0.0, "0"]
+
+
+def test_merge_overwrites_open_candle_and_appends():
+    buffer = KlineBuffer.from_klines([kline(i) for i in range(5)], capacity=10)
+    buffer.merge([kline(4, close=40.0), kline(5), kline(6)])
+    view = buffer.window()
+    assert view.open_time.tolist() == [i * STEP for i in range(7)]
+    assert view.close.tolist() == [0.0, 1.0, 2.0, 3.0, 40.0, 5.0, 6.0]
+
+
+def test_merge_from_older_candle_replaces_the_tail():
+    buffer = KlineBuffer.from_klines([kline(i) for i in range(5)], capacity=10)
+    buffer.merge([kline(2, close=20.0)])
+    assert buffer.window().close.tolist() == [0.0, 1.0, 20.0]
+    assert buffer.last_open == 2 * STEP
+
+
+def test_capacity_keeps_latest_candles():
+    buffer = KlineBuffer.from_klines([kline(i) for i in range(30)], capacity=8)
+    assert len(buffer) == 8
+    assert buffer.window().open_time.tolist() == [i * STEP for i in range(22, 30)]
+    assert buffer.window(3).close.tolist() == [27.0, 28.0, 29.0]
+
+
+def test_compaction_keeps_earlier_views_valid():
+    buffer = KlineBuffer.from_klines([kline(i) for i in range(8)], capacity=8)
+    view = buffer.window()
+    before = np.array(view.close)
+    for i in range(8, 40):
+        buffer.append(kline(i))
+    # Az átmásolás új tömbbe ír, a régi nézet nem íródik felül
+    assert np.array_equal(view.close, before)
+    assert buffer.window().close.tolist() == [float(i) for i in range(32, 40)]
+    assert buffer.row(-1) == kline(39)
+
+
+def test_since_returns_candles_from_open_time():
+    buffer = KlineBuffer.from_klines([kline(i) for i in range(6)])
+    assert [k[0] for k in buffer.since(3 * STEP)] == [3 * STEP, 4 * STEP, 5 * STEP]
+    assert buffer.since(10 * STEP) == []
+
+
+def test_merge_does_not_overwrite_earlier_views():
+    buffer = KlineBuffer.from_klines([kline(i) for i in range(5)], capacity=10)
+    view = buffer.window()
+    buffer.merge([kline(4, close=40.0), kline(5)])
+    buffer.pop()
+    buffer.append(kline(5, close=50.0))
+    # A nyitott gyertya felülírása új tömbbe kerül, a korábbi nézet változatlan
+    assert view.close.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert buffer.window().close.tolist() == [0.0, 1.0, 2.0, 3.0, 40.0, 50.0]
+    later = buffer.window()
+    buffer.clear()
+    buffer.extend([kline(9)])
+    assert later.close.tolist() == [0.0, 1.0, 2.0, 3.0, 40.0, 50.0]
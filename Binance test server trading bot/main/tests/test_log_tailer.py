@@ -0,0 +1,33 @@
+# test_log_tailer.py
+
+import os
+from Log_Tailer import LogTailer
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+def test_reads_only_new_complete_lines(tmp_path):
+    path = tmp_path / "live_trade_log_BTCUSDT.csv"
+    write(path, "timestamp,profit\n1,0.5\n2,0.")
+    tailer = LogTailer(str(tmp_path / "live_trade_log_*.csv"))
+    assert [r['profit'] for r in tailer.poll()] == ["0.5"]
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        f.write("25\n")
+    assert [r['profit'] for r in tailer.poll()] == ["0.25"]
+    assert tailer.poll() == []
+
+
+def test_rotation_to_larger_file_is_detected(tmp_path):
+    path = tmp_path / "live_trade_log_BTCUSDT.csv"
+    write(path, "timestamp,profit\n1,0.5\n")
+    tailer = LogTailer(str(tmp_path / "live_trade_log_*.csv"))
+    assert len(tailer.poll()) == 1
+
+    # Új fájl a régi helyére (új inode), a méret nem csökken
+    rotated = tmp_path / "new.tmp"
+    write(rotated, "timestamp,profit\n10,1.5\n11,2.5\n")
+    os.replace(rotated, path)
+    assert [r['timestamp'] for r in tailer.poll()] == ["10", "11"]
@@ -0,0 +1,51 @@
+# test_market_stream.py
+
+import threading
+import time
+from market.Market_Stream import MarketStream
+
+
+def test_slow_listener_does_not_block_price_updates():
+    release = threading.Event()
+    seen = []
+
+    def listener(symbol, price):
+        seen.append(price)
+        release.wait(5)
+
+    stream = MarketStream(None, ["BTCUSDT"])
+    stream.add_listener(listener)
+    stream._set_price("BTCUSDT", 100.0)
+    deadline = time.time() + 5
+    while not seen and time.time() < deadline:
+        time.sleep(0.01)
+    started = time.perf_counter()
+    for price in (101.0, 102.0, 103.0):
+        stream._set_price("BTCUSDT", price)
+    assert time.perf_counter() - started < 0.5
+    assert stream._prices["BTCUSDT"][0] == 103.0
+    release.set()
+    deadline = time.time() + 5
+    while stream._pending and time.time() < deadline:
+        time.sleep(0.01)
+    # Az első ár futása közben érkezettekből csak a legfrissebb jut a listenerhez
+    assert seen == [100.0, 103.0]
+    stream.stop()
+
+
+def test_listener_errors_are_contained():
+    calls = []
+
+    def failing(symbol, price):
+        calls.append(price)
+        raise ValueError("hiba")
+
+    stream = MarketStream(None, ["BTCUSDT", "ETHUSDT"])
+    stream.add_listener(failing)
+    stream._set_price("BTCUSDT", 1.0)
+    stream._set_price("ETHUSDT", 2.0)
+    deadline = time.time() + 5
+    while len(calls) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert sorted(calls) == [1.0, 2.0]
+    stream.stop()
@@ -0,0 +1,88 @@
+# test_order_manager.py
+
+import json
+import pytest
+import requests
+from binance.exceptions import BinanceAPIException
+from trade.Order_Manager import OrderManager, ORDER_NOT_FOUND
+
+
+def filled(params, status='FILLED', qty='0.5'):
+    return {'symbol': params['symbol'], 'clientOrderId': params['newClientOrderId'], 'orderId': 1,
+            'status': status, 'executedQty': qty if status == 'FILLED' else '0', 'cummulativeQuoteQty': '10.0',
+            'fills': [{'price': '20.0', 'qty': qty, 'commission': '0.01', 'commissionAsset': 'USDT'}]
+            if status == 'FILLED' else []}
+
+
+class FakeClient:
+    """A send_outcomes sorban: 'timeout', 'ack' vagy 'filled'; get_order a known halmaz alapján."""
+
+    def __init__(self, send_outcomes, known=()):
+        self.send_outcomes = list(send_outcomes)
+        self.known = set(known)     # 'sent': minden elküldött azonosítót ismer
+        self.sent = []
+        self.lookups = []
+
+    def order_market_buy(self, **params):
+        self.sent.append(params)
+        outcome = self.send_outcomes.pop(0)
+        if outcome == 'timeout':
+            raise requests.exceptions.ReadTimeout()
+        return filled(params, 'NEW' if outcome == 'ack' else 'FILLED')
+
+    order_market_sell = order_market_buy
+
+    def get_order(self, symbol, origClientOrderId):
+        self.lookups.append(origClientOrderId)
+        if 'sent' not in self.known:
+            raise BinanceAPIException(None, 400, json.dumps({'code': ORDER_NOT_FOUND, 'msg': 'Order does not exist.'}))
+        return filled({'symbol': symbol, 'newClientOrderId': origClientOrderId})
+
+
+def manager(client):
+    return OrderManager(client, max_retries=2, reconcile_delay_sec=0)
+
+
+def test_filled_response_needs_no_reconcile():
+    client = FakeClient(['filled'])
+    result = manager(client).market_order("BTCUSDT", "BUY", quantity=0.5)
+    assert result.filled and result.quantity == 0.5 and result.avg_price == pytest.approx(20.0)
+    assert client.lookups == []
+
+
+def test_timeout_reconciles_executed_order_without_resending():
+    client = FakeClient(['timeout'], known={'sent'})
+    result = manager(client).market_order("BTCUSDT", "BUY", quantity=0.5)
+    assert result.filled
+    assert len(client.sent) == 1
+    assert client.lookups == [client.sent[0]['newClientOrderId']]
+
+
+def test_timeout_with_unknown_order_resends_same_client_order_id():
+    client = FakeClient(['timeout', 'filled'])
+    result = manager(client).market_order("BTCUSDT", "SELL", quantity=0.5)
+    assert result.filled
+    ids = {params['newClientOrderId'] for params in client.sent}
+    assert len(client.sent) == 2 and len(ids) == 1
+
+
+def test_gives_up_after_max_retries():
+    client = FakeClient(['timeout'] * 3)
+    with pytest.raises(requests.exceptions.Timeout):
+        manager(client).market_order("BTCUSDT", "BUY", quote_quantity=10)
+    assert len(client.sent) == 3 and len(client.lookups) == 3
+
+
+def test_ack_response_is_reconciled_to_final_state():
+    client = FakeClient(['ack'], known={'sent'})
+    result = manager(client).market_order("BTCUSDT", "BUY", quote_quantity=10)
+    assert result.status == 'FILLED' and result.quantity == 0.5
+    assert len(client.lookups) == 1
+
+
+def test_other_api_errors_are_raised_from_reconcile():
+    client = FakeClient([])
+    client.get_order = lambda **kw: (_ for _ in ()).throw(
+        BinanceAPIException(None, 400, json.dumps({'code': -1021, 'msg': 'Timestamp outside recvWindow'})))
+    with pytest.raises(BinanceAPIException):
+        manager(client).reconcile("BTCUSDT", "x")
@@ -0,0 +1,73 @@
+# test_rest_gateway.py
+
+import time
+import pytest
+from binance.client import Client
+from binance.exceptions import BinanceAPIException
+from market.Fake_Rest_Server import FakeRestServer
+from market.Rest_Gateway import RestGateway, WEIGHTS
+
+
+@pytest.fixture
+def server():
+    server = FakeRestServer(port=0, retry_after=0.3).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def gateway(server):
+    client = Client("key", "secret", ping=False)
+    client.API_URL = f"http://127.0.0.1:{server.port}/api"
+    # Megbízási tartalék nélkül a 429 utáni újratöltés csak a kérés súlyáig tart (2 súly, 20/s)
+    return RestGateway(client, weight_limit=1200, order_reserve=0.0, max_retries=2)
+
+
+def test_tokens_follow_server_weight_and_throttle(server, gateway):
+    gateway.get_klines(symbol="BTCUSDT", interval="5m", limit=10)
+    assert gateway.used_weight == server.used == 2
+    # Kimerült keret: a következő olvasás a súlyáig töltődésig vár
+    gateway.tokens = 0.0
+    started = time.monotonic()
+    gateway.get_symbol_ticker(symbol="BTCUSDT")
+    assert time.monotonic() - started >= 0.08
+    assert gateway.stats['requests'] == 2
+
+
+def test_every_request_method_is_weighted(server, gateway):
+    assert gateway.stream_get_listen_key() == "fake-listen-key"
+    gateway.stream_keepalive("fake-listen-key")
+    assert gateway.stats['requests'] == 2
+    assert server.hits['/api/v3/userDataStream'] == 2
+    assert WEIGHTS['stream_keepalive'] == 2
+    # A helyi segédmetódusok nem kérések
+    assert gateway.uuid22 == gateway._client.uuid22
+
+
+def test_429_backs_off_and_retries(server, gateway):
+    server.inject(429)
+    started = time.monotonic()
+    klines = gateway.get_klines(symbol="BTCUSDT", interval="5m", limit=3)
+    assert len(klines) == 3
+    assert time.monotonic() - started >= 0.25
+    assert gateway.stats['rate_limited'] == 1
+    assert server.hits['/api/v3/klines'] == 2
+
+
+def test_429_gives_up_after_max_retries(server, gateway):
+    server.inject(429, count=3)
+    with pytest.raises(BinanceAPIException) as error:
+        gateway.ping()
+    assert error.value.status_code == 429
+    assert server.hits['/api/v3/ping'] == 3
+
+
+def test_418_blocks_every_request_until_ban_expires(server, gateway):
+    server.inject(418)
+    with pytest.raises(BinanceAPIException) as error:
+        gateway.get_symbol_ticker(symbol="BTCUSDT")
+    assert error.value.status_code == 418
+    assert gateway.stats['banned'] == 1
+    started = time.monotonic()
+    gateway.ping()
+    assert time.monotonic() - started >= 0.25
@@ -0,0 +1,45 @@
+# test_trade_executor.py
+
+import pytest
+from trade.Order_Manager import OrderResult
+from trade.Position_Book import PositionBook, OPEN
+from trade.Trade_executor import TradeExecutor
+
+
+class FakeOrders:
+    def __init__(self, status, quantity, price=110.0):
+        self.response = {'symbol': 'BTCUSDT', 'status': status, 'executedQty': str(quantity),
+                         'cummulativeQuoteQty': str(quantity * price)}
+
+    def market_order(self, symbol, side, quantity=None, quote_quantity=None):
+        return OrderResult(self.response, side)
+
+
+@pytest.fixture
+def book(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    book = PositionBook(path=str(tmp_path / "positions"))
+    book.open("BTCUSDT", 2.0, 100.0, sl_price=95.0, tp_price=105.0)
+    return book
+
+
+def executor(book, orders):
+    return TradeExecutor(None, "BTCUSDT", order_manager=orders, book=book)
+
+
+def test_unfilled_sell_keeps_position_open(book):
+    executor(book, FakeOrders('EXPIRED', 0.0)).close_position()
+    position = book.get("BTCUSDT")
+    assert position.status == OPEN and position.quantity == 2.0
+    assert book.triggers.get("BTCUSDT") is not None
+
+
+def test_partial_sell_reduces_position(book):
+    executor(book, FakeOrders('EXPIRED', 0.5)).close_position()
+    position = book.get("BTCUSDT")
+    assert position.status == OPEN and position.quantity == pytest.approx(1.5)
+
+
+def test_filled_sell_removes_position(book):
+    executor(book, FakeOrders('FILLED', 2.0)).close_position()
+    assert book.get("BTCUSDT") is None
@@ -0,0 +1,65 @@
+# test_trigger_engine.py
+
+import pytest
+from trade.Trigger_Engine import TriggerEngine, STOP_LOSS, TAKE_PROFIT, volatility_sl_tp, levels_from_percent
+
+
+def test_stop_loss_fires_at_or_below_level():
+    engine = TriggerEngine()
+    engine.set("a", "BTCUSDT", sl_price=95.0, tp_price=110.0)
+    assert engine.on_price("BTCUSDT", 96.0) == []
+    fired = engine.on_price("BTCUSDT", 95.0)
+    assert [(t.key, kind) for t, kind in fired] == [("a", STOP_LOSS)]
+    assert len(engine) == 0
+
+
+def test_take_profit_fires_and_cancels_stop():
+    engine = TriggerEngine()
+    engine.set("a", "BTCUSDT", sl_price=95.0, tp_price=110.0)
+    assert [(t.key, kind) for t, kind in engine.on_price("BTCUSDT", 111.0)] == [("a", TAKE_PROFIT)]
+    # OCO: a párja is törlődött, később már nem sül el
+    assert engine.on_price("BTCUSDT", 90.0) == []
+
+
+def test_only_crossed_triggers_of_the_symbol_fire():
+    engine = TriggerEngine()
+    engine.set("a", "BTCUSDT", sl_price=95.0, tp_price=110.0)
+    engine.set("b", "BTCUSDT", sl_price=90.0, tp_price=120.0)
+    engine.set("c", "ETHUSDT", sl_price=1000.0, tp_price=2000.0)
+    assert [t.key for t, _ in engine.on_price("BTCUSDT", 94.0)] == ["a"]
+    assert engine.get("b") is not None and engine.get("c") is not None
+
+
+def test_remove_drops_both_levels():
+    engine = TriggerEngine()
+    engine.set("a", "BTCUSDT", sl_price=95.0, tp_price=110.0)
+    assert engine.remove("a").key == "a"
+    assert engine.on_price("BTCUSDT", 50.0) == []
+    assert engine.on_price("BTCUSDT", 500.0) == []
+
+
+def test_trailing_stop_follows_new_peaks():
+    engine = TriggerEngine()
+    trigger = engine.set("a", "BTCUSDT", sl_price=95.0, trail_pct=0.01, price=100.0)
+    assert trigger.sl_price == pytest.approx(99.0)
+    assert engine.on_price("BTCUSDT", 110.0) == []
+    assert engine.get("a").sl_price == pytest.approx(108.9)
+    # Visszaesés a csúcs alá, de az emelt szint fölött: nem sül el, a szint nem csökken
+    assert engine.on_price("BTCUSDT", 109.0) == []
+    assert engine.get("a").sl_price == pytest.approx(108.9)
+    assert [kind for _, kind in engine.on_price("BTCUSDT", 108.0)] == [STOP_LOSS]
+
+
+def test_trailing_stop_never_lowered_by_set():
+    engine = TriggerEngine()
+    engine.set("a", "BTCUSDT", sl_price=95.0, trail_pct=0.01, price=100.0)
+    engine.on_price("BTCUSDT", 120.0)
+    assert engine.set("a", "BTCUSDT", sl_price=90.0, trail_pct=0.01).sl_price == pytest.approx(118.8)
+
+
+def test_volatility_levels_are_fractions_of_price():
+    sl, tp = volatility_sl_tp(20000.0, 40.0)
+    assert (sl, tp) == (pytest.approx(0.0024), pytest.approx(0.004))
+    low, high = levels_from_percent(20000.0, sl, tp)
+    assert (low, high) == (pytest.approx(19952.0), pytest.approx(20080.0))
+    assert volatility_sl_tp(0.0, 1.0) == (0.0, 0.0)
@@ -0,0 +1,56 @@
+# account_state.py
+
+import threading
+import time
+from binance.client import Client
+
+
+class AccountState:
+    """
+    A teljes számlaállapotot egy get_account hívással tölti le ciklusonként,
+    a saját kötéseink után helyben könyveli a változást, és olcsó balance(asset)
+    lekérdezést ad. A user-data stream eseményeivel is frissen tartható.
+    """
+
+    def __init__(self, client: Client, max_age_sec: float = 60, quote_asset: str = "USDT"):
+        self.client = client
+        self.max_age_sec = max_age_sec
+        self.quote_asset = quote_asset
+        self._balances = {}     # kulcs: eszköz, érték: [free, locked]
+        self._fetched_at = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        with self._lock:
+            if not force and time.time() - self._fetched_at < self.max_age_sec:
+                return
+            account = self.client.get_account()
+            self._balances = {b['asset']: [float(b['free']), float(b['locked'])] for b in account['balances']}
+            self._fetched_at = time.time()
+
+    def balance(self, asset):
+        self.refresh()
+        return self._balances.get(asset, [0.0, 0.0])[0]
+
+    def locked(self, asset):
+        self.refresh()
+        return self._balances.get(asset, [0.0, 0.0])[1]
+
+    def apply_fill(self, symbol, side, quantity, quote_quantity, commission=0.0, commission_asset=None):
+        # Saját kötés helyi könyvelése a következő frissítésig
+        base = symbol[:-len(self.quote_asset)] if symbol.endswith(self.quote_asset) else symbol
+        sign = 1 if side == "BUY" else -1
+        with self._lock:
+            self._balances.setdefault(base, [0.0, 0.0])[0] += sign * quantity
+            self._balances.setdefault(self.quote_asset, [0.0, 0.0])[0] -= sign * quote_quantity
+            if commission and commission_asset:
+                self._balances.setdefault(commission_asset, [0.0, 0.0])[0] -= commission
+
+    def apply_account_event(self, event):
+        # user-data stream: outboundAccountPosition
+        if event.get('e') != 'outboundAccountPosition':
+            return
+        with self._lock:
+            for b in event['B']:
+                self._balances[b['a']] = [float(b['f']), float(b['l'])]
+            self._fetched_at = time.time()
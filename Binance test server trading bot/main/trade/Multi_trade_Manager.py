@@ -1,48 +1,64 @@
-﻿# multi_trade_manager.py
-
-from binance.client import Client
-import datetime
-import time
-from trade.Trade_executor import TradeExecutor
-
-class MultiTradeManager:
-    def __init__(self, client: Client, symbols: list, max_positions: int = 3):
-        self.client = client
-        self.symbols = symbols
-        self.max_positions = max_positions
-        self.active_positions = {}  # kulcs: szimbólum, érték: TradeExecutor példány
-
-    def can_open_new_position(self):
-        return len(self.active_positions) < self.max_positions
-
-    def update_trades(self, signals: dict):
-        """
-        signals példa:
-        {
-            'BTCUSDT': 'BUY',
-            'ETHUSDT': 'HOLD',
-            'LTCUSDT': 'SELL'
-        }
-        """
-        for symbol, signal in signals.items():
-            if symbol not in self.symbols:
-                continue
-
-            executor = self.active_positions.get(symbol)
-
-            if executor:
-                if signal == 'SELL' or signal == 'STOP':
-                    executor.close_position()
-                    del self.active_positions[symbol]
-                else:
-                    executor.update_position()  # lehet profit update vagy SL/TP kontroll
-            elif signal == 'BUY' and self.can_open_new_position():
-                new_executor = TradeExecutor(self.client, symbol)
-                new_executor.open_position()
-                self.active_positions[symbol] = new_executor
-
-    def summary(self):
-        print("[TradeManager] Aktív pozíciók:")
-        for symbol, executor in self.active_positions.items():
-            print(f"  - {symbol}: {executor.position_summary()}")
-
+# multi_trade_manager.py
+
+from binance.client import Client
+import datetime
+import time
+from trade.Trade_executor import TradeExecutor
+from trade.Position_Book import position_book
+
+class MultiTradeManager:
+    def __init__(self, client: Client, symbols: list, max_positions: int = 3, market_stream=None, exchange_info=None,
+                 order_manager=None, book=None):
+        self.client = client
+        self.symbols = symbols
+        self.market_stream = market_stream
+        self.exchange_info = exchange_info
+        self.order_manager = order_manager
+        # A pozíciók a közös könyvben élnek; a korlát a Symbol_Trader nyitásaira is érvényes
+        self.book = book or position_book
+        self.book.max_positions = max_positions
+        self.executors = {}  # kulcs: szimbólum, érték: TradeExecutor példány (állapot nélkül)
+
+    @property
+    def max_positions(self):
+        return self.book.max_positions
+
+    def can_open_new_position(self):
+        return self.book.count() < self.max_positions
+
+    def executor(self, symbol):
+        if symbol not in self.executors:
+            self.executors[symbol] = TradeExecutor(self.client, symbol, market_stream=self.market_stream,
+                                                   exchange_info=self.exchange_info,
+                                                   order_manager=self.order_manager, book=self.book)
+        return self.executors[symbol]
+
+    def update_trades(self, signals: dict):
+        """
+        signals példa:
+        {
+            'BTCUSDT': 'BUY',
+            'ETHUSDT': 'HOLD',
+            'LTCUSDT': 'SELL'
+        }
+        """
+        for symbol, signal in signals.items():
+            if symbol not in self.symbols:
+                continue
+
+            if self.book.is_open(symbol):
+                if signal == 'SELL' or signal == 'STOP':
+                    self.executor(symbol).close_position()
+            elif signal == 'BUY' and self.can_open_new_position():
+                self.executor(symbol).open_position()
+
+        # SL/TP: csak a szinthez közeli pozíciók kapnak friss árat
+        for position in self.book.near_trigger():
+            if position.source == "manager":
+                self.executor(position.symbol).update_position()
+
+    def summary(self):
+        print("[TradeManager] Aktív pozíciók:")
+        for position in self.book.positions():
+            print(f"  - {position.symbol}: Entry: {position.entry_price}, Qty: {position.quantity}, "
+                  f"SL: {position.sl_price}, TP: {position.tp_price} ({position.source})")
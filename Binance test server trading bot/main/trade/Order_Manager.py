@@ -0,0 +1,117 @@
+# order_manager.py
+
+import itertools
+import os
+import threading
+import time
+import requests
+from binance.exceptions import BinanceAPIException
+from Metrics import metrics
+
+ORDER_NOT_FOUND = -2013     # Binance: "Order does not exist."
+
+
+class OrderResult:
+    __slots__ = ('symbol', 'side', 'client_order_id', 'order_id', 'status', 'quantity', 'quote_quantity',
+                 'avg_price', 'commission', 'commission_asset')
+
+    def __init__(self, response, side=None):
+        self.symbol = response['symbol']
+        self.side = response.get('side', side)
+        self.client_order_id = response.get('clientOrderId')
+        self.order_id = response.get('orderId')
+        self.status = response.get('status')
+        fills = response.get('fills') or []
+        self.quantity = float(response.get('executedQty', 0.0))
+        self.quote_quantity = float(response.get('cummulativeQuoteQty', 0.0))
+        if fills and not self.quote_quantity:
+            self.quantity = sum(float(f['qty']) for f in fills)
+            self.quote_quantity = sum(float(f['price']) * float(f['qty']) for f in fills)
+        self.avg_price = self.quote_quantity / self.quantity if self.quantity else 0.0
+        # A jutalék a fills-ből jön (get_order válaszában nincs); vegyes eszköz esetén az elsőé számít
+        self.commission_asset = fills[0]['commissionAsset'] if fills else None
+        self.commission = sum(float(f['commission']) for f in fills if f['commissionAsset'] == self.commission_asset)
+
+    @property
+    def filled(self):
+        return self.status == 'FILLED' or (self.status == 'PARTIALLY_FILLED' and self.quantity > 0)
+
+    def fee_in_quote(self, quote_asset="USDT"):
+        if self.commission_asset == quote_asset:
+            return self.commission
+        if self.commission_asset and self.symbol.startswith(self.commission_asset):
+            return self.commission * self.avg_price
+        return 0.0
+
+    def __repr__(self):
+        return (f"OrderResult({self.symbol} {self.side} {self.quantity}@{self.avg_price:.8f}, "
+                f"{self.status}, id={self.client_order_id})")
+
+
+class OrderManager:
+    """
+    Piaci megbízások egyedi newClientOrderId-vel. A választ a tényleges kötésekre bontja
+    (átlagár, jutalék), és ha a küldés időtúllépéssel vagy kapcsolati hibával elakad,
+    a clientOrderId alapján get_order-rel egyezteti, mielőtt ugyanazzal az azonosítóval
+    újraküldené — így újrapróbálás sem nyithat dupla pozíciót.
+    """
+
+    def __init__(self, client, account=None, prefix: str = "bot", max_retries: int = 2, reconcile_delay_sec: float = 1.0):
+        self.client = client
+        self.account = account
+        self.prefix = prefix
+        self.max_retries = max_retries
+        self.reconcile_delay_sec = reconcile_delay_sec
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def new_client_order_id(self, symbol, side):
+        # Binance: legfeljebb 36 karakter, [.A-Z:/a-z0-9_-]
+        with self._lock:
+            seq = next(self._seq)
+        return f"{self.prefix}{os.getpid() % 100000:05d}{int(time.time() * 1000):x}{seq % 4096:03x}{side[0]}"[:36]
+
+    def market_order(self, symbol, side, quantity=None, quote_quantity=None):
+        """Piaci megbízás mennyiségre vagy (quote_quantity) USDT összegre; OrderResult-ot ad."""
+        # Küldéstől a végleges (egyeztetett) kötésig mért idő
+        with metrics.timer("order", symbol):
+            return self._market_order(symbol, side, quantity, quote_quantity)
+
+    def _market_order(self, symbol, side, quantity, quote_quantity):
+        params = {'symbol': symbol, 'newClientOrderId': self.new_client_order_id(symbol, side)}
+        if quote_quantity is not None:
+            params['quoteOrderQty'] = quote_quantity
+        else:
+            params['quantity'] = quantity
+        send = self.client.order_market_buy if side == "BUY" else self.client.order_market_sell
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = OrderResult(send(**params), side)
+                break
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                metrics.inc("order_reconciles_total", symbol=symbol)
+                print(f"[ORDER] {symbol} {side} válasz nélkül ({type(e).__name__}), egyeztetés: {params['newClientOrderId']}")
+                time.sleep(self.reconcile_delay_sec)
+                result = self.reconcile(symbol, params['newClientOrderId'], side)
+                if result is not None:
+                    break
+                if attempt == self.max_retries:
+                    raise
+        if not result.filled:
+            # ACK/NEW válasz esetén a végső állapot lekérése
+            result = self.reconcile(symbol, result.client_order_id, side) or result
+        if self.account is not None and result.quantity:
+            self.account.apply_fill(symbol, side, result.quantity, result.quote_quantity,
+                                    result.commission, result.commission_asset)
+        return result
+
+    def reconcile(self, symbol, client_order_id, side=None):
+        # None, ha a tőzsde nem ismeri a megbízást (tehát biztonságosan újraküldhető)
+        try:
+            response = self.client.get_order(symbol=symbol, origClientOrderId=client_order_id)
+        except BinanceAPIException as e:
+            if e.code == ORDER_NOT_FOUND:
+                return None
+            raise
+        return OrderResult(response, side)
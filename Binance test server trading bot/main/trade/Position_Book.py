@@ -0,0 +1,271 @@
+# position_book.py
+
+import json
+import os
+import threading
+import time
+from trade.Trigger_Engine import TriggerEngine
+
+PENDING = "PENDING"     # helyfoglalás: a nyitó megbízás úton van
+OPEN = "OPEN"
+CLOSING = "CLOSING"     # a záró megbízás úton van; más szál már nem zárhatja
+STATUSES = (PENDING, OPEN, CLOSING)
+
+
+class Position:
+    __slots__ = ('symbol', 'status', 'quantity', 'entry_price', 'sl_price', 'tp_price', 'last_price',
+                 'opened_at', 'source', 'client_order_id')
+
+    def __init__(self, symbol, status=PENDING, quantity=0.0, entry_price=None, sl_price=None, tp_price=None,
+                 last_price=None, opened_at=None, source=None, client_order_id=None):
+        self.symbol = symbol
+        self.status = status
+        self.quantity = quantity
+        self.entry_price = entry_price
+        self.sl_price = sl_price
+        self.tp_price = tp_price
+        self.last_price = last_price
+        self.opened_at = opened_at
+        self.source = source
+        self.client_order_id = client_order_id
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"Position({self.symbol} {self.status} {self.quantity}@{self.entry_price}, SL={self.sl_price}, TP={self.tp_price})"
+
+
+class PositionBook:
+    """
+    Az egyetlen pozíciónyilvántartás a Symbol_Trader és a MultiTradeManager számára.
+    Szimbólum és státusz szerint indexelt; a max_positions korlát a foglaláskor
+    (reserve) atomikusan, globálisan érvényesül. A SL/TP szinthez near_pct-nél közelebbi
+    pozíciók halmaza minden árfrissítéskor O(1)-ben frissül; a tényleges SL/TP elsütést
+    a rendezett szinteket tartó TriggerEngine végzi (trail_pct esetén trailing stoppal).
+    Minden változás egy journal sorba kerül, snapshot_every művelet után pillanatkép készül;
+    induláskor a load() a pillanatképből és a journal visszajátszásából állítja vissza.
+    """
+
+    def __init__(self, path: str = "logs/positions", max_positions: int = None, near_pct: float = 0.005,
+                 snapshot_every: int = 100, trail_pct: float = None):
+        self.path = path
+        self.trail_pct = trail_pct
+        self.triggers = TriggerEngine()
+        self.max_positions = max_positions
+        self.near_pct = near_pct
+        self.snapshot_every = snapshot_every
+        self._by_symbol = {}
+        self._by_status = {status: set() for status in STATUSES}
+        self._near = set()
+        self._lock = threading.RLock()
+        self._journal = None
+        self._ops = 0
+
+    # --- Lekérdezés
+
+    def get(self, symbol):
+        return self._by_symbol.get(symbol)
+
+    def is_open(self, symbol):
+        position = self._by_symbol.get(symbol)
+        return position is not None and position.status == OPEN
+
+    def symbols(self, status=OPEN):
+        return set(self._by_status[status])
+
+    def positions(self, status=OPEN):
+        with self._lock:
+            return [self._by_symbol[s] for s in self._by_status[status]]
+
+    def count(self):
+        # A folyamatban lévő nyitások és zárások is foglalják a keretet
+        return len(self._by_symbol)
+
+    def near_trigger(self):
+        with self._lock:
+            return [self._by_symbol[s] for s in self._near if s in self._by_status[OPEN]]
+
+    # --- Változtatás
+
+    def reserve(self, symbol, source=None):
+        """Helyfoglalás nyitás előtt; False, ha a szimbólumon már van pozíció vagy betelt a keret."""
+        with self._lock:
+            if symbol in self._by_symbol:
+                return False
+            if self.max_positions is not None and self.count() >= self.max_positions:
+                return False
+            self._set(Position(symbol, PENDING, source=source))
+            return True
+
+    def open(self, symbol, quantity, entry_price, sl_price=None, tp_price=None, source=None, client_order_id=None):
+        # Foglalás nélkül is hívható (pl. induláskori szinkronizálás); a kereten felül is rögzít
+        with self._lock:
+            position = self._by_symbol.get(symbol) or Position(symbol, source=source)
+            position.quantity = quantity
+            position.entry_price = position.last_price = entry_price
+            position.sl_price, position.tp_price = sl_price, tp_price
+            position.opened_at = time.time()
+            position.source = source or position.source
+            position.client_order_id = client_order_id
+            position.status = OPEN
+            self._set(position)
+            return position
+
+    def set_levels(self, symbol, sl_price, tp_price):
+        with self._lock:
+            position = self._by_symbol.get(symbol)
+            if position is None or position.status != OPEN:
+                return
+            if self.trail_pct and position.sl_price is not None:
+                sl_price = max(sl_price, position.sl_price)     # a trailing stop nem csúszhat vissza
+            if (position.sl_price, position.tp_price) != (sl_price, tp_price):
+                position.sl_price, position.tp_price = sl_price, tp_price
+                self._set(position)
+
+    def begin_close(self, symbol):
+        """OPEN -> CLOSING; csak egy hívó kapja meg a pozíciót, a többi None-t."""
+        with self._lock:
+            position = self._by_symbol.get(symbol)
+            if position is None or position.status != OPEN:
+                return None
+            position.status = CLOSING
+            self._set(position)
+            return position
+
+    def abort_close(self, symbol):
+        # Sikertelen záró megbízás után a pozíció újra nyitott
+        with self._lock:
+            position = self._by_symbol.get(symbol)
+            if position is not None and position.status == CLOSING:
+                position.status = OPEN
+                self._set(position)
+
+    def reduce(self, symbol, quantity):
+        # Részleges zárás után: a teljesült mennyiség levonva, a maradék újra nyitott (a szintjei újra élesek)
+        with self._lock:
+            position = self._by_symbol.get(symbol)
+            if position is None:
+                return None
+            position.quantity = max(position.quantity - quantity, 0.0)
+            position.status = OPEN
+            self._set(position)
+            return position
+
+    def remove(self, symbol):
+        # Zárás vagy meghiúsult nyitás után
+        with self._lock:
+            position = self._by_symbol.pop(symbol, None)
+            if position is None:
+                return None
+            self._by_status[position.status].discard(symbol)
+            self._near.discard(symbol)
+            self.triggers.remove(symbol)
+            self._record({'op': 'remove', 'symbol': symbol})
+            return position
+
+    def update_price(self, symbol, price):
+        """Új ár a szimbólumra; STOP-LOSS/TAKE-PROFIT, ha a pozíció egyik szintjét keresztezte, különben None."""
+        # A near_trigger() és a többi módosító más szálakról, ugyanezen a záron át olvas/ír
+        with self._lock:
+            position = self._by_symbol.get(symbol)
+            if position is None:
+                return None
+            position.last_price = price
+            fired = self.triggers.on_price(symbol, price)
+            trigger = self.triggers.get(symbol)
+            if trigger is not None:
+                position.sl_price = trigger.sl_price    # trailing stop emelkedése (journal nélkül)
+            near = position.status == OPEN and any(
+                level is not None and abs(price - level) <= price * self.near_pct
+                for level in (position.sl_price, position.tp_price))
+            if near:
+                self._near.add(symbol)
+            else:
+                self._near.discard(symbol)
+            return fired[0][1] if fired else None
+
+    def _set(self, position):
+        for status, members in self._by_status.items():
+            if status != position.status:
+                members.discard(position.symbol)
+        self._by_status[position.status].add(position.symbol)
+        self._by_symbol[position.symbol] = position
+        if position.status == OPEN and (position.sl_price is not None or position.tp_price is not None):
+            trigger = self.triggers.set(position.symbol, position.symbol, position.sl_price, position.tp_price,
+                                        self.trail_pct, price=position.last_price)
+            position.sl_price = trigger.sl_price
+        else:
+            self.triggers.remove(position.symbol)
+        self._record({'op': 'set', 'position': position.to_dict()})
+
+    # --- Tartósság
+
+    def _record(self, entry):
+        if self._journal is None:
+            return
+        self._journal.write(json.dumps(entry) + "\n")
+        self._journal.flush()
+        self._ops += 1
+        if self._ops >= self.snapshot_every:
+            self.snapshot()
+
+    def _apply(self, entry):
+        if entry['op'] == 'set':
+            position = Position(**entry['position'])
+            self._by_symbol[position.symbol] = position
+        elif entry['op'] == 'remove':
+            self._by_symbol.pop(entry['symbol'], None)
+
+    def load(self):
+        """Pillanatkép + journal visszajátszása, majd a journal megnyitása írásra."""
+        os.makedirs(self.path, exist_ok=True)
+        snapshot_path = os.path.join(self.path, "snapshot.json")
+        journal_path = os.path.join(self.path, "journal.jsonl")
+        with self._lock:
+            self._by_symbol.clear()
+            if os.path.exists(snapshot_path):
+                with open(snapshot_path, 'r') as f:
+                    for data in json.load(f):
+                        self._apply({'op': 'set', 'position': data})
+            if os.path.exists(journal_path):
+                with open(journal_path, 'r') as f:
+                    for line in f:
+                        try:
+                            self._apply(json.loads(line))
+                        except (ValueError, KeyError, TypeError):
+                            break   # csonka utolsó sor összeomlás után
+            for members in self._by_status.values():
+                members.clear()
+            self._near.clear()
+            for position in self._by_symbol.values():
+                if position.status == PENDING:
+                    # Ismeretlen kimenetelű nyitás: a következő szinkronizálás dönt róla
+                    continue
+                if position.status == CLOSING:
+                    position.status = OPEN
+                self._by_status[position.status].add(position.symbol)
+                if position.sl_price is not None or position.tp_price is not None:
+                    self.triggers.set(position.symbol, position.symbol, position.sl_price, position.tp_price,
+                                      self.trail_pct, price=position.last_price)
+            for symbol in [s for s, p in self._by_symbol.items() if p.status == PENDING]:
+                del self._by_symbol[symbol]
+            self._journal = open(journal_path, 'a')
+            self.snapshot()
+        return self
+
+    def snapshot(self):
+        if self._journal is None:
+            return
+        with self._lock:
+            snapshot_path = os.path.join(self.path, "snapshot.json")
+            with open(snapshot_path + ".tmp", 'w') as f:
+                json.dump([p.to_dict() for p in self._by_symbol.values()], f)
+            os.replace(snapshot_path + ".tmp", snapshot_path)
+            self._journal.seek(0)
+            self._journal.truncate()
+            self._ops = 0
+
+
+# Közös példány: minden kereskedő komponens ezt használja
+position_book = PositionBook()
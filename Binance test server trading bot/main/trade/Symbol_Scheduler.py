@@ -0,0 +1,69 @@
+# symbol_scheduler.py
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from trade.Symbol_Trader import trade_symbol
+from Metrics import metrics
+
+
+def share_session(client, pool_size):
+    # Egy közös HTTP session, a szálak számához méretezett kapcsolat-poollal
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+
+
+class SymbolScheduler:
+    """
+    A szimbólumokat párhuzamosan, korlátos szálkészleten futtatja.
+    Egy ciklus legfeljebb deadline_sec ideig vár; a késő szimbólum nem tartja fel
+    a többit, és amíg fut, a következő ciklusban nem indul újra.
+    """
+
+    def __init__(self, client, symbols: list, max_workers: int = 8, deadline_sec: float = 45, kline_cache=None, account=None, exchange_info=None,
+                 order_manager=None):
+        self.client = client
+        self.symbols = symbols
+        self.deadline_sec = deadline_sec
+        self.kline_cache = kline_cache
+        self.account = account
+        self.exchange_info = exchange_info
+        self.order_manager = order_manager
+        self.max_workers = max(1, min(max_workers, len(symbols)))
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="symbol")
+        self._running = {}  # kulcs: szimbólum, érték: Future
+        share_session(client, self.max_workers)
+
+    def run_cycle(self):
+        if self.account is not None:
+            # Egy számlalekérés ciklusonként a 2N get_asset_balance helyett
+            try:
+                with metrics.timer("balance"):
+                    self.account.refresh(force=True)
+            except Exception as e:
+                print(f"[ACCOUNT] Frissítés sikertelen: {e}")
+        submitted = []
+        for symbol in self.symbols:
+            future = self._running.get(symbol)
+            if future is not None and not future.done():
+                print(f"[{symbol}] Előző ciklus még fut, kihagyva")
+                metrics.inc("skipped_total", symbol=symbol)
+                continue
+            future = self.pool.submit(trade_symbol, symbol, self.client, self.kline_cache, self.account, self.exchange_info,
+                                      self.order_manager)
+            self._running[symbol] = future
+            submitted.append(future)
+
+        _, late = wait(submitted, timeout=self.deadline_sec)
+        for symbol, future in list(self._running.items()):
+            if future.done():
+                del self._running[symbol]
+                if future.exception() is not None:
+                    print(f"[{symbol}] Hiba: {future.exception()}")
+            elif future in late:
+                print(f"[{symbol}] Határidő túllépés ({self.deadline_sec}s)")
+                metrics.inc("deadline_missed_total", symbol=symbol)
+        return [s for s in self.symbols if s not in self._running]
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -1,155 +1,252 @@
-# trade/Symbol_Trader.py (SYNC verzió - automatikus pozíció szinkronizálás)
-
-from binance.client import Client
-import pandas as pd
-from xgboost import XGBRegressor
-import numpy as np
-import datetime
-import os
-import json
-import math
-from prediction.MI_Strategy import MLStrategy
-
-
-
-def prepare_features(df):
-    df['close'] = df['close'].astype(float)
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-    df['return'] = df['close'].pct_change()
-    df['ma5'] = df['close'].rolling(window=5).mean()
-    df['ma10'] = df['close'].rolling(window=10).mean()
-    df['volatility'] = df['close'].rolling(window=5).std()
-    df['rsi'] = compute_rsi(df['close'], window=14)
-    df['target'] = (df['close'].shift(-1) - df['close']) / df['close']
-    return df.dropna()
-
-
-def compute_rsi(series, window=14):
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
-
-def adjust_quantity_to_step(quantity, step_size_str):
-    step_size = float(step_size_str)
-    precision = int(round(-math.log10(step_size)))
-    return round(math.floor(quantity / step_size) * step_size, precision)
-
-
-with open("config.json", "r") as f:
-    config = json.load(f)
-
-fixed_trade_usd = config.get("fixed_trade_usd", 10)
-fee_percent = config.get("fee_percent", 0.001)
-interval = Client.KLINE_INTERVAL_5MINUTE
-limit = 100
-
-positions = {}
-entry_prices = {}
-
-
-def trade_symbol(symbol, client):
-    global positions, entry_prices
-    log_file = f"logs/live_trade_log_{symbol}.csv"
-    feedback_log_file = f"logs/feedback_log_{symbol}.csv"
-
-    if not os.path.exists("logs"):
-        os.makedirs("logs")
-    if not os.path.exists(log_file):
-        with open(log_file, 'w') as f:
-            f.write("timestamp,current_price,action,balance,quantity,profit\n")
-    if not os.path.exists(feedback_log_file):
-        with open(feedback_log_file, 'w') as f:
-            f.write("timestamp,symbol,predicted_return,action,profit\n")
-
-    try:
-        klines = client.get_klines(symbol=symbol, interval=interval, limit=limit)
-        df = pd.DataFrame(klines, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_asset_volume', 'num_trades',
-            'taker_buy_base_volume', 'taker_buy_quote_volume', 'ignore'])
-        df = prepare_features(df)
-
-        current_price = df['close'].iloc[-1]
-        now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-        trend_ok = df['ma5'].iloc[-1] > df['ma10'].iloc[-1] and df['rsi'].iloc[-1] < 70
-        balance = float(client.get_asset_balance(asset='USDT')['free'])
-        asset = symbol.replace("USDT", "")
-        asset_balance = float(client.get_asset_balance(asset=asset)['free'])
-
-        symbol_info = client.get_symbol_info(symbol)
-        step_size = None
-        for f in symbol_info['filters']:
-            if f['filterType'] == 'LOT_SIZE':
-                step_size = f['stepSize']
-                break
-
-        quantity = fixed_trade_usd / current_price
-        if step_size:
-            quantity = adjust_quantity_to_step(quantity, step_size)
-
-        strategy = MLStrategy(client, [symbol])
-        sl_percent, tp_percent = strategy.dynamic_sl_tp(current_price, df['volatility'].iloc[-1])
-
-        if symbol not in positions:
-            if asset_balance > 0:
-                positions[symbol] = "LONG"
-                entry_prices[symbol] = current_price
-                print(f"[SYNC] {symbol} – pozíció szinkronizálva")
-            else:
-                positions[symbol] = None
-                entry_prices[symbol] = None
-
-        features = ['close', 'return', 'ma5', 'ma10', 'volatility', 'rsi']
-        X = df[features].values
-        y = df['target'].values
-        model = XGBRegressor(n_estimators=30, max_depth=3, learning_rate=0.05)
-        model.fit(X, y)
-        predicted_return = model.predict(df[features].iloc[-1].values.reshape(1, -1))[0]
-
-        with open(f"logs/prediction_log_{symbol}.csv", 'a') as f:
-            f.write(f"{now},{current_price},{predicted_return}\n")
-
-        action = "HOLD"
-        profit = 0
-
-        if positions[symbol] == "LONG":
-            entry_price = entry_prices[symbol]
-            if current_price <= entry_price * (1 - sl_percent):
-                client.order_market_sell(symbol=symbol, quantity=asset_balance)
-                action = "STOP-LOSS"
-                print(f"[EXIT] {symbol} zárva (STOP-LOSS)")
-                profit = (current_price * (1 - fee_percent)) - (entry_price * (1 + fee_percent))
-                positions[symbol] = None
-                entry_prices[symbol] = None
-                with open(feedback_log_file, 'a') as f:
-                    f.write(f"{now},{symbol},{predicted_return:.6f},{action},{profit:.4f}\n")
-
-            elif current_price >= entry_price * (1 + tp_percent):
-                client.order_market_sell(symbol=symbol, quantity=asset_balance)
-                action = "TAKE-PROFIT"
-                print(f"[EXIT] {symbol} zárva (TAKE-PROFIT)")
-                profit = (current_price * (1 - fee_percent)) - (entry_price * (1 + fee_percent))
-                positions[symbol] = None
-                entry_prices[symbol] = None
-                with open(feedback_log_file, 'a') as f:
-                    f.write(f"{now},{symbol},{predicted_return:.6f},{action},{profit:.4f}\n")
-
-        elif positions[symbol] is None:
-            if trend_ok:
-                response = client.order_market_buy(symbol=symbol, quantity=quantity)
-                action = "BUY"
-                print(f"[BUY] {symbol} nyitva ({quantity})")
-                positions[symbol] = "LONG"
-                entry_prices[symbol] = current_price
-
-        with open(log_file, 'a') as f:
-            f.write(f"{now},{current_price},{action},{balance},{quantity},{profit:.4f}\n")
-
-        print(f"[{symbol}] {now} | Művelet: {action} | Ár: {current_price:.2f} | Profit: {profit:.4f}")
-
-    except Exception as e:
+# trade/Symbol_Trader.py (SYNC verzió - automatikus pozíció szinkronizálás)
+
+import datetime
+import math
+import threading
+import time
+from market.Kline_Buffer import KlineBuffer
+from market.Indicator_Engine import compute_rsi
+from trade.Order_Manager import OrderManager
+from trade.Position_Book import position_book
+from trade.Trigger_Engine import levels_from_percent, volatility_sl_tp
+from prediction.Model_Manager import ModelManager
+from Log_Writer import log_writer
+from History_Store import history_store
+from Analytics_Channel import analytics
+from Metrics import metrics
+
+
+
+def prepare_features(df):
+    import pandas as pd
+    df['close'] = df['close'].astype(float)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df['return'] = df['close'].pct_change()
+    df['ma5'] = df['close'].rolling(window=5).mean()
+    df['ma10'] = df['close'].rolling(window=10).mean()
+    df['volatility'] = df['close'].rolling(window=5).std()
+    df['rsi'] = compute_rsi(df['close'], window=14)
+    df['target'] = (df['close'].shift(-1) - df['close']) / df['close']
+    return df.dropna()
+
+
+def adjust_quantity_to_step(quantity, step_size_str):
+    step_size = float(step_size_str)
+    precision = int(round(-math.log10(step_size)))
+    return round(math.floor(quantity / step_size) * step_size, precision)
+
+
+def fit_trader_model(X, y):
+    from xgboost import XGBRegressor
+    model = XGBRegressor(n_estimators=30, max_depth=3, learning_rate=0.05)
+    model.fit(X, y)
+    return model
+
+
+# Alapértékek; a main.py a már betöltött config.json-nal a configure()-t hívja
+fixed_trade_usd = 10
+fee_percent = 0.001
+interval = "5m"
+limit = 100
+
+model_manager = ModelManager()
+
+
+def configure(config):
+    global fixed_trade_usd, fee_percent
+    fixed_trade_usd = config.get("fixed_trade_usd", fixed_trade_usd)
+    fee_percent = config.get("fee_percent", fee_percent)
+    model_manager.retrain_sec = config.get("model_retrain_sec", model_manager.retrain_sec)
+    model_manager.drift_z = config.get("model_drift_z", model_manager.drift_z)
+
+
+TRADE_LOG_HEADER = "timestamp,current_price,action,balance,quantity,profit"
+FEEDBACK_LOG_HEADER = "timestamp,symbol,predicted_return,action,profit"
+
+synced = set()          # szimbólumok, amelyek egyenlegét már összevetettük a pozíciókönyvvel
+last_predictions = {}
+
+# Szimbólumonkénti zár: egy szimbólum tickjei sosem futnak párhuzamosan
+_symbol_locks = {}
+_locks_guard = threading.Lock()
+
+
+def symbol_lock(symbol):
+    with _locks_guard:
+        return _symbol_locks.setdefault(symbol, threading.Lock())
+
+
+def get_balance(client, account, asset):
+    if account is not None:
+        return account.balance(asset)
+    return float(client.get_asset_balance(asset=asset)['free'])
+
+
+def check_exit(symbol, client, current_price, asset_balance=None, account=None, exchange_info=None, order_manager=None):
+    # SL/TP ellenőrzés egy árra; (action, profit) a visszatérési érték
+    # A trigger engine csak keresztezett szintnél ad vissza műveletet
+    position = position_book.get(symbol)
+    action = position_book.update_price(symbol, current_price)
+    if action is None:
+        return "HOLD", 0
+    if position_book.begin_close(symbol) is None:
+        return "HOLD", 0    # más szál már zárja
+    entry_price = position.entry_price
+
+    try:
+        # Csak a pozíció mennyisége: a más pozícióhoz vagy a felhasználóhoz tartozó coinok maradnak
+        quantity = position.quantity
+        if asset_balance is not None:
+            quantity = min(quantity, asset_balance)     # a jutalék miatt kevesebb lehet szabadon
+        if exchange_info is not None:
+            quantity = exchange_info.round_quantity(symbol, quantity)
+            if not exchange_info.is_tradable(symbol, quantity, current_price):
+                # A minimum alatti maradék nem adható el: kikerül a könyvből, különben minden tick újrapróbálná
+                position_book.remove(symbol)
+                print(f"[{symbol}] {action}: {quantity} a tőzsdei minimum alatt, nem adható el")
+                return "HOLD", 0
+        order_manager = order_manager or OrderManager(client, account)
+        fill = order_manager.market_order(symbol, "SELL", quantity=quantity)
+    except Exception:
+        position_book.abort_close(symbol)
+        raise
+    if fill.quantity <= 0:
+        # EXPIRED/REJECTED: semmi nem kelt el, a pozíció a tőzsdén és a könyvben is nyitva marad
+        position_book.abort_close(symbol)
+        print(f"[{symbol}] {action}: SELL nem teljesült ({fill.status})")
+        return "HOLD", 0
+    if fill.quantity < quantity:
+        position_book.reduce(symbol, fill.quantity)
+        print(f"[{symbol}] {action}: részleges zárás, {fill.quantity}/{quantity}")
+    else:
+        position_book.remove(symbol)
+    exit_price = fill.avg_price or current_price
+    print(f"[EXIT] {symbol} zárva ({action}) @ {exit_price}")
+    profit = (exit_price * (1 - fee_percent)) - (entry_price * (1 + fee_percent))
+    now = datetime.datetime.fromtimestamp(time.time()).strftime('%Y-%m-%d %H:%M:%S')
+    log_writer.write(f"logs/feedback_log_{symbol}.csv",
+                     f"{now},{symbol},{last_predictions.get(symbol, 0.0):.6f},{action},{profit:.4f}",
+                     header=FEEDBACK_LOG_HEADER)
+    history_store.append('feedback', {'timestamp': now, 'symbol': symbol, 'predicted_return': float(last_predictions.get(symbol, 0.0)),
+                                      'action': action, 'profit': float(profit)})
+    analytics.publish("exit", symbol=symbol, action=action, price=float(exit_price), profit=float(profit))
+    return action, profit
+
+
+def on_price_update(symbol, price, client, account=None, exchange_info=None, order_manager=None):
+    # A market stream hívja minden árfrissítésre. Ha a szimbólum épp feldolgozás
+    # alatt van, kihagyjuk: a következő frissítés úgyis ellenőriz.
+    lock = symbol_lock(symbol)
+    if not lock.acquire(blocking=False):
+        return
+    try:
+        check_exit(symbol, client, price, account=account, exchange_info=exchange_info, order_manager=order_manager)
+    except Exception as e:
+        metrics.inc("errors_total", stage="exit_check", symbol=symbol)
+        print(f"[{symbol}] Hiba (SL/TP): {e}")
+    finally:
+        lock.release()
+
+
+def trade_symbol(symbol, client, kline_cache=None, account=None, exchange_info=None, order_manager=None):
+    with symbol_lock(symbol), metrics.timer("trade_symbol", symbol):
+        _trade_symbol(symbol, client, kline_cache, account, exchange_info, order_manager)
+
+
+def _trade_symbol(symbol, client, kline_cache=None, account=None, exchange_info=None, order_manager=None):
+    log_file = f"logs/live_trade_log_{symbol}.csv"
+
+    try:
+        features = ['close', 'return', 'ma5', 'ma10', 'volatility', 'rsi']
+        if kline_cache is not None:
+            df = kline_cache.get_features(symbol, interval, limit, columns=features)
+        else:
+            with metrics.timer("kline_fetch", symbol):
+                klines = client.get_klines(symbol=symbol, interval=interval, limit=limit)
+            with metrics.timer("features", symbol):
+                df = prepare_features(KlineBuffer.from_klines(klines).window().to_dataframe())
+
+        current_price = df['close'].iloc[-1]
+        now = datetime.datetime.fromtimestamp(time.time()).strftime('%Y-%m-%d %H:%M:%S')
+
+        trend_ok = df['ma5'].iloc[-1] > df['ma10'].iloc[-1] and df['rsi'].iloc[-1] < 70
+        asset = symbol.replace("USDT", "")
+        with metrics.timer("balance", symbol):
+            balance = get_balance(client, account, 'USDT')
+            asset_balance = get_balance(client, account, asset)
+
+        quantity = fixed_trade_usd / current_price
+        if exchange_info is not None:
+            quantity = exchange_info.round_quantity(symbol, quantity)
+        else:
+            symbol_info = client.get_symbol_info(symbol)
+            step_size = None
+            for f in symbol_info['filters']:
+                if f['filterType'] == 'LOT_SIZE':
+                    step_size = f['stepSize']
+                    break
+            if step_size:
+                quantity = adjust_quantity_to_step(quantity, step_size)
+
+        sl_percent, tp_percent = volatility_sl_tp(current_price, df['volatility'].iloc[-1])
+
+        if symbol not in synced:
+            synced.add(symbol)
+            if asset_balance > 0 and position_book.get(symbol) is None:
+                position_book.open(symbol, asset_balance, current_price, source="sync")
+                print(f"[SYNC] {symbol} – pozíció szinkronizálva")
+        position = position_book.get(symbol)
+        if position is not None and position.source != "manager":
+            # A kereskedő által kezelt pozíciók SL/TP szintje a volatilitással együtt mozog
+            position_book.set_levels(symbol, *levels_from_percent(position.entry_price, sl_percent, tp_percent))
+
+        X = df[features].values
+        y = df['target'].values
+        predicted_return = model_manager.predict("trader", symbol, X, y, fit_trader_model)
+        last_predictions[symbol] = predicted_return
+
+        log_writer.write(f"logs/prediction_log_{symbol}.csv", f"{now},{current_price},{predicted_return}")
+        history_store.append('predictions', {'timestamp': now, 'symbol': symbol, 'current_price': float(current_price),
+                                             'predicted_return': float(predicted_return)})
+
+        action = "HOLD"
+        profit = 0
+
+        if position is not None:
+            action, profit = check_exit(symbol, client, current_price, asset_balance, account, exchange_info, order_manager)
+
+        elif trend_ok and exchange_info is not None and not exchange_info.is_tradable(symbol, quantity, current_price):
+            print(f"[{symbol}] BUY kihagyva: {quantity} @ {current_price} a tőzsdei minimum alatt")
+
+        elif trend_ok and position_book.reserve(symbol, source="trader"):
+            try:
+                order_manager = order_manager or OrderManager(client, account)
+                fill = order_manager.market_order(symbol, "BUY", quantity=quantity)
+            except Exception:
+                position_book.remove(symbol)
+                raise
+            if fill.quantity <= 0:
+                # Lejárt/elutasított megbízás: nincs pozíció, a foglalás felszabadul
+                position_book.remove(symbol)
+                print(f"[{symbol}] BUY nem teljesült ({fill.status})")
+            else:
+                action = "BUY"
+                quantity = fill.quantity
+                entry_price = fill.avg_price or current_price
+                position_book.open(symbol, quantity, entry_price, *levels_from_percent(entry_price, sl_percent, tp_percent),
+                                   source="trader", client_order_id=fill.client_order_id)
+                print(f"[BUY] {symbol} nyitva ({quantity} @ {entry_price})")
+
+        log_writer.write(log_file, f"{now},{current_price},{action},{balance},{quantity},{profit:.4f}",
+                         header=TRADE_LOG_HEADER)
+        history_store.append('trades', {'timestamp': now, 'symbol': symbol, 'current_price': float(current_price),
+                                        'action': action, 'balance': float(balance), 'quantity': float(quantity),
+                                        'profit': float(profit)})
+        analytics.publish("tick", symbol=symbol, action=action, price=float(current_price),
+                          predicted_return=float(predicted_return), profit=float(profit))
+
+        print(f"[{symbol}] {now} | Művelet: {action} | Ár: {current_price:.2f} | Profit: {profit:.4f}")
+
+    except Exception as e:
+        metrics.inc("errors_total", stage="trade_symbol", symbol=symbol)
         print(f"[{symbol}] Hiba: {e}")
\ No newline at end of file
@@ -1,67 +1,126 @@
-﻿# trade_executor.py
-
-from binance.client import Client
-import datetime
-import os
-
-class TradeExecutor:
-    def __init__(self, client: Client, symbol: str, usd_amount: float = 10.0):
-        self.client = client
-        self.symbol = symbol
-        self.usd_amount = usd_amount
-        self.position = None
-        self.entry_price = None
-        self.quantity = None
-        self.sl_threshold = None  # dinamikus lesz
-        self.tp_threshold = None
-        self.log_file = f"live_trade_log_{symbol}.csv"
-
-        if not os.path.exists(self.log_file):
-            with open(self.log_file, 'w') as f:
-                f.write("timestamp,action,price,quantity,profit\n")
-
-    def get_price(self):
-        ticker = self.client.get_symbol_ticker(symbol=self.symbol)
-        return float(ticker['price'])
-
-    def calculate_sl_tp(self, current_price):
-        sl = 0.005 * current_price  # 0.5% le
-        tp = 0.00001 * current_price   # 1% fel
-        self.sl_threshold = (current_price - sl) / current_price
-        self.tp_threshold = (current_price + tp) / current_price
-
-    def open_position(self):
-        price = self.get_price()
-        self.calculate_sl_tp(price)
-        self.quantity = round(self.usd_amount / price, 6)
-        self.client.order_market_buy(symbol=self.symbol, quantity=self.quantity)
-        self.entry_price = price
-        self.position = "LONG"
-        self._log("BUY", price, 0)
-
-    def close_position(self):
-        if self.position != "LONG":
-            return
-        price = self.get_price()
-        self.client.order_market_sell(symbol=self.symbol, quantity=self.quantity)
-        profit = (price - self.entry_price) * self.quantity
-        self._log("SELL", price, profit)
-        self.position = None
-
-    def update_position(self):
-        if self.position == "LONG":
-            current_price = self.get_price()
-            if current_price <= self.entry_price * self.sl_threshold:
-                print(f"[{self.symbol}] [STOP-LOSS] zárás aktiválva")
-                self.close_position()
-            elif current_price >= self.entry_price * self.tp_threshold:
-                print(f"[{self.symbol}] [TAKE-PROFIT] zárás aktiválva")
-                self.close_position()
-
-    def position_summary(self):
-        return f"Entry: {self.entry_price}, Qty: {self.quantity}, State: {self.position}"
-
-    def _log(self, action, price, profit):
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.log_file, 'a') as f:
-            f.write(f"{now},{action},{price},{self.quantity},{profit:.4f}\n")
+# trade_executor.py
+
+from binance.client import Client
+import datetime
+import time
+from Log_Writer import log_writer
+from trade.Order_Manager import OrderManager
+from trade.Position_Book import position_book
+
+class TradeExecutor:
+    def __init__(self, client: Client, symbol: str, usd_amount: float = 10.0, market_stream=None, exchange_info=None,
+                 order_manager=None, book=None):
+        self.client = client
+        self.symbol = symbol
+        self.usd_amount = usd_amount
+        self.market_stream = market_stream
+        self.exchange_info = exchange_info
+        self.order_manager = order_manager or OrderManager(client)
+        self.book = book or position_book
+        self.sl_threshold = None  # dinamikus lesz
+        self.tp_threshold = None
+        self.log_file = f"live_trade_log_{symbol}.csv"
+
+    # A pozíció állapota a közös pozíciókönyvben él
+    @property
+    def position(self):
+        return "LONG" if self.book.is_open(self.symbol) else None
+
+    @property
+    def entry_price(self):
+        position = self.book.get(self.symbol)
+        return position.entry_price if position else None
+
+    @property
+    def quantity(self):
+        position = self.book.get(self.symbol)
+        return position.quantity if position else None
+
+    def get_price(self):
+        if self.market_stream is not None:
+            return self.market_stream.price(self.symbol)
+        ticker = self.client.get_symbol_ticker(symbol=self.symbol)
+        return float(ticker['price'])
+
+    def calculate_sl_tp(self, current_price):
+        sl = 0.005 * current_price  # 0.5% le
+        tp = 0.00001 * current_price   # 1% fel
+        self.sl_threshold = (current_price - sl) / current_price
+        self.tp_threshold = (current_price + tp) / current_price
+
+    def open_position(self):
+        # USDT összegre szóló megbízás: nincs előzetes ticker lekérés, a belépési ár a tényleges kötésből jön
+        if self.exchange_info is not None and self.usd_amount < self.exchange_info.get(self.symbol).min_notional:
+            print(f"[{self.symbol}] BUY kihagyva: {self.usd_amount} USDT a MIN_NOTIONAL alatt")
+            return False
+        if not self.book.reserve(self.symbol, source="manager"):
+            return False
+        try:
+            fill = self.order_manager.market_order(self.symbol, "BUY", quote_quantity=self.usd_amount)
+        except Exception:
+            self.book.remove(self.symbol)
+            raise
+        if fill.quantity <= 0:
+            # Lejárt/elutasított megbízás: nincs mit nyilvántartani, a foglalás felszabadul
+            self.book.remove(self.symbol)
+            print(f"[{self.symbol}] BUY nem teljesült ({fill.status})")
+            return False
+        price = fill.avg_price
+        self.calculate_sl_tp(price)
+        quantity = fill.quantity
+        if fill.commission_asset and self.symbol.startswith(fill.commission_asset):
+            quantity -= fill.commission     # az alapeszközben levont jutalék nem eladható
+        if self.exchange_info is not None:
+            quantity = self.exchange_info.round_quantity(self.symbol, quantity)
+        self.book.open(self.symbol, quantity, price, price * self.sl_threshold, price * self.tp_threshold,
+                       source="manager", client_order_id=fill.client_order_id)
+        self._log("BUY", price, 0)
+        return True
+
+    def close_position(self):
+        position = self.book.begin_close(self.symbol)
+        if position is None:
+            return
+        price = position.last_price or position.entry_price
+        if self.exchange_info is not None and not self.exchange_info.is_tradable(self.symbol, position.quantity, price):
+            # A minimum alatti maradék nem adható el: kikerül a könyvből
+            self.book.remove(self.symbol)
+            print(f"[{self.symbol}] {position.quantity} a tőzsdei minimum alatt, nem adható el")
+            return
+        quantity = position.quantity
+        try:
+            fill = self.order_manager.market_order(self.symbol, "SELL", quantity=quantity)
+        except Exception:
+            self.book.abort_close(self.symbol)
+            raise
+        if fill.quantity <= 0:
+            # EXPIRED/REJECTED: a pozíció nyitva marad, a következő frissítés újra próbálja
+            self.book.abort_close(self.symbol)
+            print(f"[{self.symbol}] SELL nem teljesült ({fill.status})")
+            return
+        if fill.quantity < quantity:
+            self.book.reduce(self.symbol, fill.quantity)
+        else:
+            self.book.remove(self.symbol)
+        profit = (fill.avg_price - position.entry_price) * fill.quantity
+        self._log("SELL", fill.avg_price, profit, fill.quantity)
+
+    def update_position(self, current_price=None):
+        position = self.book.get(self.symbol)
+        if position is None or position.status != "OPEN":
+            return
+        if current_price is None:
+            current_price = self.get_price()
+        action = self.book.update_price(self.symbol, current_price)
+        if action is not None:
+            print(f"[{self.symbol}] [{action}] zárás aktiválva")
+            self.close_position()
+
+    def position_summary(self):
+        return f"Entry: {self.entry_price}, Qty: {self.quantity}, State: {self.position}"
+
+    def _log(self, action, price, profit, quantity=None):
+        now = datetime.datetime.fromtimestamp(time.time()).strftime("%Y-%m-%d %H:%M:%S")
+        quantity = self.quantity if quantity is None else quantity
+        log_writer.write(self.log_file, f"{now},{action},{price},{quantity},{profit:.4f}",
+                         header="timestamp,action,price,quantity,profit")
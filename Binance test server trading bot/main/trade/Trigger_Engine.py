@@ -0,0 +1,140 @@
+# trigger_engine.py
+
+import bisect
+import threading
+
+STOP_LOSS = "STOP-LOSS"
+TAKE_PROFIT = "TAKE-PROFIT"
+
+
+class Trigger:
+    __slots__ = ('key', 'symbol', 'sl_price', 'tp_price', 'trail_pct', 'peak')
+
+    def __init__(self, key, symbol, sl_price, tp_price, trail_pct=None, peak=None):
+        self.key = key
+        self.symbol = symbol
+        self.sl_price = sl_price
+        self.tp_price = tp_price
+        self.trail_pct = trail_pct
+        self.peak = peak
+
+
+def volatility_sl_tp(price, volatility):
+    # SL/TP arányok a záróár szórásából (a szórás az árral normálva): 1.2x és 2.0x
+    relative = volatility / price if price else 0.0
+    return round(relative * 1.2, 5), round(relative * 2.0, 5)
+
+
+def levels_from_percent(entry_price, sl_percent, tp_percent):
+    # A volatility_sl_tp arányaiból (pl. 0.004 = 0.4%) abszolút árszintek
+    return entry_price * (1 - sl_percent), entry_price * (1 + tp_percent)
+
+
+class TriggerEngine:
+    """
+    Szimbólumonként ár szerint rendezett SL és TP szintek. Egy árfrissítés csak a
+    keresztezett triggereket adja vissza (bisect: O(log n + k)), a többi pozícióhoz
+    nem nyúl és REST hívást sem végez. Egy kulcs SL és TP szintje OCO-ként viselkedik:
+    bármelyik sül el, mindkettő törlődik. Trailing stop esetén az SL szint az új
+    csúcsokkal emelkedik (csak felfelé), ehhez a szimbólum trailing triggereit járja be.
+    """
+
+    def __init__(self):
+        self._triggers = {}     # kulcs -> Trigger
+        self._stops = {}        # szimbólum -> ([rendezett szintek], [kulcsok])
+        self._targets = {}      # szimbólum -> ([rendezett szintek], [kulcsok])
+        self._trailing = {}     # szimbólum -> {kulcs}
+        self._peaks = {}        # szimbólum -> a trailing triggerek legkisebb csúcsa; felette emelni kell
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._triggers)
+
+    def get(self, key):
+        return self._triggers.get(key)
+
+    def set(self, key, symbol, sl_price=None, tp_price=None, trail_pct=None, price=None):
+        """Trigger felvétele vagy módosítása. Trailing stop szintje sosem csökken."""
+        with self._lock:
+            old = self._triggers.get(key)
+            if old is not None and old.trail_pct and sl_price is not None and old.sl_price is not None:
+                sl_price = max(sl_price, old.sl_price)
+            peak = old.peak if old is not None else price
+            self._remove(key)
+            trigger = Trigger(key, symbol, sl_price, tp_price, trail_pct, peak)
+            if trail_pct and peak is not None and sl_price is not None:
+                trigger.sl_price = max(sl_price, peak * (1 - trail_pct))
+            self._insert(trigger)
+            return trigger
+
+    def remove(self, key):
+        with self._lock:
+            return self._remove(key)
+
+    def on_price(self, symbol, price):
+        """A keresztezett triggerek (Trigger, STOP_LOSS/TAKE_PROFIT) listája; ezek törlődnek."""
+        with self._lock:
+            if self._trailing.get(symbol) and price > self._peaks.get(symbol, float('-inf')):
+                self._ratchet(symbol, price)
+            fired = {}
+            levels, keys = self._stops.get(symbol, ((), ()))
+            for key in keys[bisect.bisect_left(levels, price):]:        # SL: szint >= ár
+                fired[key] = STOP_LOSS
+            levels, keys = self._targets.get(symbol, ((), ()))
+            for key in keys[:bisect.bisect_right(levels, price)]:       # TP: szint <= ár
+                fired.setdefault(key, TAKE_PROFIT)
+            return [(self._remove(key), kind) for key, kind in fired.items()]
+
+    # --- Belső indexkezelés (a zár alatt hívandó)
+
+    @staticmethod
+    def _index_add(index, symbol, level, key):
+        levels, keys = index.setdefault(symbol, ([], []))
+        i = bisect.bisect_right(levels, level)
+        levels.insert(i, level)
+        keys.insert(i, key)
+
+    @staticmethod
+    def _index_remove(index, symbol, level, key):
+        levels, keys = index[symbol]
+        i = bisect.bisect_left(levels, level)
+        while keys[i] != key:
+            i += 1
+        del levels[i], keys[i]
+
+    def _insert(self, trigger):
+        self._triggers[trigger.key] = trigger
+        if trigger.sl_price is not None:
+            self._index_add(self._stops, trigger.symbol, trigger.sl_price, trigger.key)
+        if trigger.tp_price is not None:
+            self._index_add(self._targets, trigger.symbol, trigger.tp_price, trigger.key)
+        if trigger.trail_pct:
+            self._trailing.setdefault(trigger.symbol, set()).add(trigger.key)
+            peak = trigger.peak if trigger.peak is not None else float('-inf')
+            self._peaks[trigger.symbol] = min(self._peaks.get(trigger.symbol, peak), peak)
+
+    def _remove(self, key):
+        trigger = self._triggers.pop(key, None)
+        if trigger is None:
+            return None
+        if trigger.sl_price is not None:
+            self._index_remove(self._stops, trigger.symbol, trigger.sl_price, key)
+        if trigger.tp_price is not None:
+            self._index_remove(self._targets, trigger.symbol, trigger.tp_price, key)
+        self._trailing.get(trigger.symbol, set()).discard(key)
+        return trigger
+
+    def _ratchet(self, symbol, price):
+        # Új csúcs: a szimbólum trailing szintjeinek emelése; _peaks a legkisebb csúcs marad
+        for key in self._trailing[symbol]:
+            trigger = self._triggers[key]
+            if trigger.peak is not None and price <= trigger.peak:
+                continue
+            trigger.peak = price
+            level = price * (1 - trigger.trail_pct)
+            if trigger.sl_price is None or level > trigger.sl_price:
+                if trigger.sl_price is not None:
+                    self._index_remove(self._stops, symbol, trigger.sl_price, key)
+                trigger.sl_price = level
+                self._index_add(self._stops, symbol, level, key)
+        self._peaks[symbol] = min(self._triggers[key].peak for key in self._trailing[symbol])